@@ -2,13 +2,23 @@
 # flake8: noqa
 # pylint: skip-file
 
+from .async_web import AsyncWebClient
+from .balancer import Endpoint, LoadBalancer
+from .cache import CachedResponse, ResponseCache
+from .circuit_breaker import CircuitBreaker, CircuitBreakers, CircuitState
+from .coalesce import RequestCoalescer
+from .compression import CompressedBody, RequestCompressor
+from .deadline import Deadline
+from .decoding import JSONDecoder
 from .exceptions import (
     ClientAuthenticationError,
     ClientAuthorizationError,
+    ClientCircuitOpenError,
     ClientConnectionError,
     ClientError,
     ClientException,
     ClientHTTPError,
+    ClientRateLimitError,
     ClientTimeout,
     ClientTokenRefreshError,
     ClientURLError,
@@ -18,11 +28,24 @@ from .exceptions import (
     CredentialKeyFileError,
     CredentialURLError,
 )
+from .hedging import RequestHedger
+from .metrics import LatencyHistogram, RequestMetrics, RequestTiming
+from .pagination import CursorPaginator, LinkHeaderPaginator, OffsetPaginator, Paginator
+from .prepared import PreparedEndpoint
+from .rate_limit import RateLimiter
+from .replay import ReplayTransport
+from .retry import RetryPolicy
+from .standin import StandInServer
+from .tls import ResumingSSLContext, SSLContextCache
+from .token_store import FileTokenStore, MemoryTokenStore, TokenStore
+from .transport import AiohttpTransport, ClientCertAdapter, HttpxTransport, Transport
+from .upload import MultipartUpload, UploadBody
 from .web import (
     AuthorizationType,
     BasicAuthCredentials,
     OAuth2Credentials,
     WebClient,
+    WebClientBase,
     WebCredentials,
     X509Credentials,
 )
@@ -0,0 +1,408 @@
+#!/usr/bin/python3
+"""
+pywrapid asynchronous web client base
+
+Event loop based counterpart of the WebClient, built on httpx.
+Shares authorization types, credentials and token handling with the blocking client.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import Any, AsyncIterator, Optional, Type
+
+from pywrapid.config import WrapidConfig
+from pywrapid.utils.exceptions import DependencyError
+
+from .exceptions import ClientConnectionError, ClientError, ClientHTTPError, ClientTimeout
+from .tls import SSLContextCache
+from .token_store import TokenStore
+from .transport import cookieless_policy
+from .web import SESSION_OPTIONS, AuthorizationType, WebClientBase, WebCredentials
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+# client_options keys consumed by the httpx client rather than passed on per request
+ASYNC_SESSION_OPTIONS = SESSION_OPTIONS + (
+    "max_connections",
+    "max_keepalive_connections",
+    "keepalive_expiry",
+    "verify",
+    "cert",
+    "trust_env",
+    "proxy",
+)
+
+
+class AsyncWebClient(WebClientBase):
+    """Asynchronous Web Client base
+
+    Event loop based version of the WebClient, for running thousands of concurrent
+    requests in one process without thread pools. Wraps httpx and adds generic exceptions.
+
+    Uses the same authorization types, credentials and token handling as the WebClient.
+    Request options are passed transparently to httpx, client level settings such as
+    verify, cert, proxy, http2 and the max_connections, max_keepalive_connections and
+    keepalive_expiry pool limits are read from client_options when the client is created.
+    A client certificate or key file changed on disk gives a new httpx client.
+
+    Call aclose() or use the client as an async context manager to release connections.
+    """
+
+    _session_option_keys = ASYNC_SESSION_OPTIONS
+
+    def __init__(
+        self,
+        authorization_type: AuthorizationType = AuthorizationType.NONE,
+        credentials: Optional[Type[WebCredentials]] = None,
+        dict_config: Optional[dict] = None,
+        wrapid_config: Optional[Type[WrapidConfig]] = None,
+        token_store: Optional[TokenStore] = None,
+    ):
+        """Init function for async web client class
+
+        See WebClientBase for arguments.
+
+        Raises:
+            ClientException
+            DependencyError
+        """
+        if httpx is None:
+            raise DependencyError("AsyncWebClient requires httpx, install pywrapid[httpx]")
+
+        super().__init__(authorization_type, credentials, dict_config, wrapid_config, token_store)
+        self._cert = self._credential_options.pop(
+            "cert", self._config.get("client_options", {}).get("cert")
+        )
+        self._tls_contexts = SSLContextCache()
+        self._session_context: Any = None
+        self._replaced_sessions: list = []
+        self._session: httpx.AsyncClient = self._create_session()
+        self._session_lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "AsyncWebClient":
+        if self._config.get("background_token_refresh", False):
+            self.start_token_refresh()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def _create_session(self) -> "httpx.AsyncClient":
+        """Create an httpx client with a connection pool limited from client_options
+
+        Client certificates from the credentials are moved to the client since httpx
+        does not accept them per request, loaded into an SSLContext resuming TLS sessions.
+
+        Returns:
+            httpx.AsyncClient: Pooled asynchronous client
+        """
+        client_options = self._config.get("client_options", {})
+        session_options = {
+            key: client_options[key]
+            for key in ("http2", "verify", "trust_env", "proxy")
+            if key in client_options
+        }
+        if self._cert:
+            self._session_context = self._tls_contexts.get(
+                self._cert, session_options.get("verify", True)
+            )
+            session_options["verify"] = self._session_context
+
+        default_limits = httpx.Limits()
+        limits = httpx.Limits(
+            max_connections=client_options.get("max_connections", default_limits.max_connections),
+            max_keepalive_connections=client_options.get(
+                "max_keepalive_connections", default_limits.max_keepalive_connections
+            ),
+            keepalive_expiry=client_options.get(
+                "keepalive_expiry", default_limits.keepalive_expiry
+            ),
+        )
+
+        session = httpx.AsyncClient(limits=limits, **session_options)
+        session.cookies.jar.set_policy(cookieless_policy())
+
+        return session
+
+    def _current_session(self) -> "httpx.AsyncClient":
+        """Client for the next request, recreated when the client certificate files change
+
+        Returns:
+            httpx.AsyncClient: Pooled asynchronous client
+        """
+        if not self._cert:
+            return self._session
+
+        verify = self._config.get("client_options", {}).get("verify", True)
+        if self._tls_contexts.get(self._cert, verify) is not self._session_context:
+            # Closed with the client, responses may still be streaming
+            self._replaced_sessions.append(self._session)
+            self._session = self._create_session()
+
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the client and release pooled connections"""
+        await self.stop_token_refresh()
+        for session in [*self._replaced_sessions, self._session]:
+            await session.aclose()
+        self._replaced_sessions = []
+
+    def start_token_refresh(self) -> None:
+        """Start renewing the access token in a background task ahead of expiry
+
+        Must be called from a running event loop. The task authenticates right away and
+        then renews the token at token_refresh_ratio of its lifetime, so calls never wait
+        for authentication. Stopped by stop_token_refresh() or aclose().
+        """
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        self._refresh_task = asyncio.get_running_loop().create_task(
+            self._background_token_refresh()
+        )
+
+    async def stop_token_refresh(self) -> None:
+        """Stop the background token refresh task"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    async def _background_token_refresh(self) -> None:
+        """Background task loop renewing the token ahead of expiry"""
+        minimum_delay = 0.0
+        while True:
+            await asyncio.sleep(max(self._seconds_until_renewal(), minimum_delay))
+            try:
+                async with self._get_session_lock(), self._token_store_lock():
+                    # Another client sharing the token store may have renewed already
+                    if not self._load_tokens() or self._seconds_until_renewal() <= 0:
+                        await self._renew_session()
+                minimum_delay = 1.0  # Avoid spinning on tokens without a known lifetime
+            except ClientError as error:
+                log.warning("Background token refresh failed: %s", error)
+                minimum_delay = self._config.get("token_refresh_retry", 10)
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Background token refresh failed unexpectedly")
+                minimum_delay = self._config.get("token_refresh_retry", 10)
+
+    def _get_session_lock(self) -> asyncio.Lock:
+        """Session lock, created on first use to bind to the running event loop"""
+        if self._session_lock is None:
+            self._session_lock = asyncio.Lock()
+
+        return self._session_lock
+
+    @asynccontextmanager
+    async def _token_store_lock(self) -> AsyncIterator[None]:
+        """Hold the token store renewal lock without blocking the event loop
+
+        The lock is taken in a worker thread that can not be interrupted, when the
+        waiting task is cancelled the lock is released as soon as the thread has it.
+        """
+        lock = self._token_store.lock(self._token_key)
+        acquire = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+
+        def release_acquired(future: asyncio.Future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                lock.__exit__(None, None, None)
+
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            acquire.add_done_callback(release_acquired)
+            raise
+        try:
+            yield
+        finally:
+            lock.__exit__(None, None, None)
+
+    async def generate_session(self, method: str = "POST", **options: Any) -> None:
+        """Authenticate and generate new token
+
+        Args:
+            method (str, optional): HTTP Method to use. Defaults to "POST".
+
+        Raises:
+            ClientAuthenticationError
+        """
+        login_options = self._login_options(**options)
+
+        response = await self.call(
+            method,
+            str(self._login_url),
+            raise_for_status=False,
+            skip_authentication=True,
+            **login_options,
+        )
+
+        self._validate_login_response(response)
+
+    async def _ensure_session(self) -> None:
+        """Generate a new session if the current one has expired
+
+        Single-flight: one task authenticates while concurrent callers wait for its token.
+        """
+        if not self.session_expired():
+            return
+
+        async with self._get_session_lock(), self._token_store_lock():
+            if not self._adopt_renewed_tokens():
+                await self._renew_session()
+
+    async def _renew_session(self) -> None:
+        """Authenticate and replace the current token, caller must hold the session lock"""
+        if not await self.refresh_session():
+            await self.generate_session(**self._renewal_options())
+        self._session_renewed()
+
+    async def refresh_session(self) -> bool:
+        """Renew the access token with the OAuth2 refresh token grant
+
+        Uses the stored refresh token against the credentials token_url. A rejected
+        refresh token is discarded so the next renewal performs a full login, on
+        timeouts and connection errors it is kept for the next attempt.
+
+        Raises:
+            ClientTimeout
+            ClientError
+
+        Returns:
+            bool: True if the token was renewed, False if a full login is needed
+        """
+        refresh_options = self._refresh_grant_options()
+        if not refresh_options:
+            return False
+
+        response = await self.call(
+            "POST",
+            self._token_url,
+            raise_for_status=False,
+            skip_authentication=True,
+            **refresh_options,
+        )
+
+        return self._refresh_granted(response)
+
+    async def json(self, response: "httpx.Response") -> Any:
+        """Decoded json body of a response using the configured json backend
+
+        Bodies of json_offload_size bytes or more are decoded in a worker thread to
+        keep the event loop responsive.
+
+        Args:
+            response (httpx.Response): Response to decode
+
+        Raises:
+            ClientError
+
+        Returns:
+            Any: Decoded json
+        """
+        try:
+            return await self._json_decoder.decode_async(response)
+        except ValueError as error:
+            raise ClientError(f"Unable to decode json response: {error}") from error
+
+    async def call(
+        self,
+        method: str,
+        url: str,
+        raise_for_status: bool = False,
+        skip_authentication: bool = False,
+        deadline: Optional[float] = None,
+        **options: Any,
+    ) -> "httpx.Response":
+        """Send web request to the target url
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            raise_for_status (bool): Raise for non 2xx repsonses
+            skip_authentication (bool): Skip authentication and skip token refresh controls
+            deadline (float, optional): Seconds the call may take including authentication,
+                the call is cancelled when exceeded
+            **options (dict): httpx request options, and rate_limit_block (bool) to wait for
+                rate limiter tokens or fail fast regardless of the rate_limit block setting
+
+        Raises:
+            ClientHTTPError
+            ClientTimeout
+            ClientConnectionError
+            ClientException
+            ClientAuthenticationError
+            ClientRateLimitError
+            ClientCircuitOpenError
+
+        Returns:
+            Response: httpx.Response object
+        """
+        if deadline is None:
+            return await self._call(method, url, raise_for_status, skip_authentication, options)
+
+        try:
+            return await asyncio.wait_for(
+                self._call(method, url, raise_for_status, skip_authentication, options), deadline
+            )
+        except asyncio.TimeoutError as error:
+            raise ClientTimeout(f"Deadline of {deadline}s exceeded") from error
+
+    async def _call(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        raise_for_status: bool,
+        skip_authentication: bool,
+        options: dict,
+    ) -> "httpx.Response":
+        """Send web request, see call()"""
+        if not skip_authentication:
+            await self._ensure_session()
+
+        options = self._request_options(options)
+        try:
+            block, options = self._rate_limit_block(options)
+            wait = self._rate_limit_wait(url, block)
+            if wait:
+                await asyncio.sleep(wait)
+            breaker = self._circuit_breaker(url)
+            started = monotonic()
+            with self._circuit_failures(breaker, started):
+                response = await self._current_session().request(method, url, **options)
+            self._circuit_record(breaker, started, response)
+
+            if raise_for_status:
+                response.raise_for_status()
+        except httpx.HTTPStatusError as error:
+            raise ClientHTTPError(error) from error
+        except httpx.TimeoutException as error:
+            raise ClientTimeout(error) from error
+        except httpx.TooManyRedirects as error:
+            raise ClientConnectionError(error) from error
+        except httpx.HTTPError as error:
+            raise ClientError(error) from error
+
+        return response
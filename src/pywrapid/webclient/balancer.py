@@ -0,0 +1,269 @@
+#!/usr/bin/python3
+"""
+pywrapid web client load balancing
+
+Client side load balancing of requests over replicated endpoints of a service with
+round-robin, least outstanding requests or EWMA latency selection, passive ejection of
+failing endpoints and active background health probes.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import itertools
+import logging
+import threading
+from time import monotonic
+from typing import Callable, Iterable, Optional
+
+from .exceptions import ClientError
+
+log = logging.getLogger(__name__)
+
+STRATEGIES = ("round_robin", "least_outstanding", "ewma")
+
+
+class Endpoint:  # pylint: disable=too-many-instance-attributes
+    """Endpoint state, a base URL serving the balanced service"""
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.ewma = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.consecutive_failures = 0
+        self.ejected_until: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        """True unless ejected, or when the ejection has expired without active probing"""
+        return self.ejected_until is None or monotonic() >= self.ejected_until
+
+    def to_dict(self) -> dict:
+        """Endpoint state as a dict"""
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "ewma": self.ewma,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+        }
+
+
+class LoadBalancer:  # pylint: disable=too-many-instance-attributes
+    """Load balancer over endpoints serving the same service
+
+    Requests to a relative URL, or to a URL below any of the endpoints, are sent to
+    the endpoint picked by the strategy:
+
+    round_robin: healthy endpoints in turn.
+    least_outstanding: the healthy endpoint with the fewest requests in flight.
+    ewma: the healthy endpoint with the lowest latency average weighted by its requests
+    in flight, endpoints without measurements are tried first.
+
+    An endpoint failing failure_threshold consecutive requests is ejected. With a
+    probe, ejected endpoints are probed every probe_interval seconds in a background
+    thread and return when a probe succeeds, without one they return on trial after
+    ejection_duration seconds. When every endpoint is ejected all of them are used.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        endpoints: Iterable[str],
+        strategy: str = "round_robin",
+        failure_threshold: int = 3,
+        failure_statuses: Iterable[int] = (502, 503, 504),
+        ejection_duration: float = 30,
+        ewma_alpha: float = 0.3,
+        probe_interval: float = 10,
+        probe: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        """Init function for load balancer
+
+        Args:
+            endpoints (Iterable[str]): Base URLs of the service replicas
+            strategy (str, optional): round_robin, least_outstanding or ewma.
+                Defaults to "round_robin".
+            failure_threshold (int, optional): Consecutive failures ejecting an endpoint.
+                Defaults to 3.
+            failure_statuses (Iterable[int], optional): Response status codes counted as
+                failures. Defaults to 502, 503 and 504.
+            ejection_duration (float, optional): Seconds an endpoint stays ejected without
+                a probe. Defaults to 30.
+            ewma_alpha (float, optional): Weight of the latest latency in the average.
+                Defaults to 0.3.
+            probe_interval (float, optional): Seconds between probes. Defaults to 10.
+            probe (Callable, optional): Takes an endpoint URL and returns True if healthy
+
+        Raises:
+            ClientError
+        """
+        self.endpoints = [Endpoint(url) for url in endpoints]
+        if not self.endpoints:
+            raise ClientError("Load balancer requires at least one endpoint")
+        if strategy not in STRATEGIES:
+            raise ClientError(
+                f"Unknown balancing strategy {strategy}, expected one of {STRATEGIES}"
+            )
+
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.failure_statuses = tuple(failure_statuses)
+        self.ejection_duration = ejection_duration
+        self.ewma_alpha = ewma_alpha
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._probe_stop = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    def balances(self, url: str) -> bool:
+        """Check if a URL is sent to the balanced endpoints"""
+        return url.startswith("/") or self._base(url) is not None
+
+    def _base(self, url: str) -> Optional[str]:
+        """Endpoint base URL a URL starts with"""
+        return next(
+            (
+                endpoint.url
+                for endpoint in self.endpoints
+                if url == endpoint.url or url.startswith((endpoint.url + "/", endpoint.url + "?"))
+            ),
+            None,
+        )
+
+    def url(self, url: str, endpoint: Endpoint) -> str:
+        """URL of a balanced request on an endpoint"""
+        base = self._base(url)
+        return endpoint.url + (url[len(base) :] if base else url)
+
+    def acquire(self) -> Endpoint:
+        """Pick an endpoint for a request and count it as in flight
+
+        Returns:
+            Endpoint: Endpoint to send the request to, pass it to release() when done,
+                or to cancel() when the request was not sent
+        """
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+            if not candidates:
+                log.warning("All endpoints are ejected, balancing over all of them")
+                candidates = self.endpoints
+
+            turn = next(self._turn)
+            if self.strategy == "round_robin":
+                endpoint = candidates[turn % len(candidates)]
+            else:
+                # Rotated so ties are spread instead of always going to the first endpoint
+                start = turn % len(candidates)
+                rotated = candidates[start:] + candidates[:start]
+                if self.strategy == "least_outstanding":
+                    endpoint = min(rotated, key=lambda endpoint: endpoint.outstanding)
+                else:
+                    endpoint = min(
+                        rotated, key=lambda endpoint: endpoint.ewma * (endpoint.outstanding + 1)
+                    )
+
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+            return endpoint
+
+    def release(self, endpoint: Endpoint, seconds: float, failed: bool) -> None:
+        """Record the outcome of a request sent to an endpoint
+
+        Args:
+            endpoint (Endpoint): Endpoint returned by acquire()
+            seconds (float): Request duration
+            failed (bool): True if the request failed
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not failed:
+                endpoint.consecutive_failures = 0
+                endpoint.ejected_until = None
+                endpoint.ewma = (
+                    seconds
+                    if not endpoint.ewma
+                    else self.ewma_alpha * seconds + (1 - self.ewma_alpha) * endpoint.ewma
+                )
+                return
+
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures < self.failure_threshold or not endpoint.healthy:
+                return
+            # A returned endpoint failing again is ejected on its first failure
+            endpoint.consecutive_failures = self.failure_threshold - 1
+            endpoint.ejections += 1
+            endpoint.ejected_until = monotonic() + (
+                float("inf") if self.probe else self.ejection_duration
+            )
+            log.warning("Ejected endpoint %s after repeated failures", endpoint.url)
+
+        if self.probe:
+            self._start_probing()
+
+    def cancel(self, endpoint: Endpoint) -> None:
+        """Give back an endpoint acquired for a request that was not sent
+
+        Args:
+            endpoint (Endpoint): Endpoint returned by acquire()
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests -= 1
+
+    def _start_probing(self) -> None:
+        """Start the probe thread if it is not running"""
+        with self._lock:
+            if self._probe_thread and self._probe_thread.is_alive():
+                return
+            self._probe_stop.clear()
+            self._probe_thread = threading.Thread(
+                target=self._probe_ejected, name="pywrapid-balancer-probe", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_ejected(self) -> None:
+        """Background thread loop probing ejected endpoints until none are left"""
+        while not self._probe_stop.wait(self.probe_interval):
+            with self._lock:
+                ejected = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+            for endpoint in ejected:
+                try:
+                    healthy = self.probe(endpoint.url)  # type: ignore[misc]
+                except Exception as error:  # pylint: disable=broad-except
+                    log.debug("Probe of %s failed: %s", endpoint.url, error)
+                    healthy = False
+                if healthy:
+                    with self._lock:
+                        endpoint.ejected_until = None
+                    log.info("Endpoint %s returned after a successful probe", endpoint.url)
+            with self._lock:
+                if all(endpoint.healthy for endpoint in self.endpoints):
+                    self._probe_thread = None
+                    return
+
+    def close(self) -> None:
+        """Stop the probe thread"""
+        self._probe_stop.set()
+        thread = self._probe_thread
+        if thread and thread is not threading.current_thread():
+            thread.join()
+
+    @property
+    def stats(self) -> dict:
+        """Endpoint state per endpoint URL"""
+        with self._lock:
+            return {endpoint.url: endpoint.to_dict() for endpoint in self.endpoints}
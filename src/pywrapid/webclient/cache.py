@@ -0,0 +1,421 @@
+#!/usr/bin/python3
+"""
+pywrapid web client response cache
+
+HTTP response cache for GET/HEAD requests with an in-memory LRU tier limited by size,
+an optional disk tier, Cache-Control max-age freshness and ETag/Last-Modified revalidation.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Any, Optional
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from pywrapid.utils import is_directory_writable
+
+from .exceptions import ClientError
+from .keys import request_digest
+
+log = logging.getLogger(__name__)
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_DISK_CACHE_SIZE = 256 * 1024 * 1024
+
+
+def cache_control(headers: Any) -> dict:
+    """Parse a Cache-Control header into a dict of directives
+
+    Args:
+        headers (Any): Response headers
+
+    Returns:
+        dict: Lower case directive names mapped to their value, or True for flags
+    """
+    directives: dict = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+
+    return directives
+
+
+class CachedResponse:
+    """Cached response data
+
+    Holds what is needed to rebuild a requests.Response together with its freshness.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        status_code: int,
+        headers: dict,
+        content: bytes,
+        url: str = "",
+        reason: str = "",
+        encoding: Optional[str] = None,
+        stored_at: float = 0,
+    ) -> None:
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.url = url
+        self.reason = reason
+        self.encoding = encoding
+        self.stored_at = stored_at or time()
+
+    @classmethod
+    def from_response(cls, response: Response) -> "CachedResponse":
+        """Create cache data from a requests response"""
+        return cls(
+            response.status_code,
+            dict(response.headers),
+            response.content,
+            response.url,
+            response.reason,
+            response.encoding,
+        )
+
+    @property
+    def size(self) -> int:
+        """Approximate size in bytes"""
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    @property
+    def max_age(self) -> float:
+        """Seconds the response is fresh for after being stored, from Cache-Control"""
+        directives = cache_control(self.headers)
+        if "no-cache" in directives:
+            return 0
+        try:
+            return float(directives.get("max-age", 0))
+        except ValueError:
+            return 0
+
+    @property
+    def fresh(self) -> bool:
+        """True if the response can be served without revalidation"""
+        return time() < self.stored_at + self.max_age
+
+    @property
+    def validators(self) -> dict:
+        """Conditional request headers revalidating this response"""
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+
+        return validators
+
+    def revalidated(self, response: Response) -> "CachedResponse":
+        """Cache data refreshed by a 304 Not Modified response
+
+        Args:
+            response (Response): 304 response to the conditional request
+
+        Returns:
+            CachedResponse: Cached data with updated headers and freshness
+        """
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-length", "content-encoding", "transfer-encoding")
+        }
+
+        return CachedResponse(
+            self.status_code,
+            {**self.headers, **headers},
+            self.content,
+            self.url,
+            self.reason,
+            self.encoding,
+        )
+
+    def response(self) -> Response:
+        """Build a requests response from the cached data"""
+        response = Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content  # pylint: disable=protected-access
+        # pylint: disable-next=protected-access
+        response._content_consumed = True  # type: ignore[attr-defined]
+        response.raw = io.BytesIO(self.content)
+        response.url = self.url
+        response.reason = self.reason
+        response.encoding = self.encoding
+
+        return response
+
+    def to_dict(self) -> dict:
+        """Metadata for disk storage, content excluded"""
+        return {
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "url": self.url,
+            "reason": self.reason,
+            "encoding": self.encoding,
+            "stored_at": self.stored_at,
+        }
+
+
+class ResponseCache:  # pylint: disable=too-many-instance-attributes
+    """Response cache
+
+    Keeps responses in an in-memory LRU limited to max_bytes. When a path is given,
+    responses are also written to a disk tier and loaded from it on memory misses. The
+    disk tier is an LRU limited to disk_max_bytes, entries already in the directory are
+    taken over by last use on start. Thread safe, hit/miss/revalidation counters are
+    available in stats.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_SIZE,
+        path: str = "",
+        disk_max_bytes: int = DEFAULT_DISK_CACHE_SIZE,
+    ) -> None:
+        """Init function for response cache
+
+        Args:
+            max_bytes (int, optional): Memory tier size limit. Defaults to 64 MiB.
+            path (str, optional): Directory for the disk tier. Defaults to no disk tier.
+            disk_max_bytes (int, optional): Disk tier size limit. Defaults to 256 MiB.
+
+        Raises:
+            ClientError
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._disk_entries: OrderedDict = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidations": 0, "stores": 0, "evictions": 0}
+
+        if path:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            if not is_directory_writable(path):
+                raise ClientError(f"Response cache directory is not writable: {path}")
+            self._scan()
+
+    @property
+    def stats(self) -> dict:
+        """Cache counters"""
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "disk_entries": len(self._disk_entries),
+                "disk_bytes": self._disk_size,
+            }
+
+    @staticmethod
+    def key(method: str, url: str, options: dict, identity: str = "", token: str = "") -> str:
+        """Cache key for a request
+
+        Responses are told apart by the credential identity and by the credentials the
+        request is sent with, hashed so secrets never end up in keys. The clients own
+        token is left out since it changes on renewal and the identity covers it.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            options (dict): request options
+            identity (str, optional): Credential identity, e.g. the clients token store key
+            token (str, optional): Authorization header value of the clients own token
+
+        Returns:
+            str: Cache key
+        """
+        return request_digest(method, url, options, identity, token)
+
+    def count(self, stat: str) -> None:
+        """Increment a cache counter"""
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Get a cached response from memory, or from disk promoting it to memory
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            CachedResponse|None: Cached data, None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read(key)
+        if entry:
+            self._remember(key, entry)
+
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """Store a cached response
+
+        Args:
+            key (str): Cache key
+            entry (CachedResponse): Data to cache
+        """
+        self._remember(key, entry)
+        self._write(key, entry)
+        self.count("stores")
+
+    def store(self, key: str, response: Response) -> bool:
+        """Store a response if it is cacheable
+
+        Only successful responses that are fresh for a while or can be revalidated,
+        and do not forbid storing with no-store, are cached.
+
+        Args:
+            key (str): Cache key
+            response (Response): Response to cache
+
+        Returns:
+            bool: True if the response was stored
+        """
+        if response.status_code != 200 or "no-store" in cache_control(response.headers):
+            return False
+
+        entry = CachedResponse.from_response(response)
+        if not entry.max_age and not entry.validators:
+            return False
+
+        self.set(key, entry)
+
+        return True
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        """Add to the memory tier and evict least recently used entries above max_bytes"""
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self._stats["evictions"] += 1
+
+    def _file(self, key: str, suffix: str) -> str:
+        """Path of a disk tier file of an entry"""
+        return os.path.join(self.path, f"{key}.{suffix}")
+
+    def _scan(self) -> None:
+        """Take over the entries in the disk tier directory, least recently used first"""
+        entries = []
+        for name in os.listdir(self.path):
+            key, _, suffix = name.partition(".")
+            if suffix != "body":
+                continue
+            try:
+                stat = os.stat(self._file(key, "body"))
+                size = stat.st_size + os.path.getsize(self._file(key, "json"))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, key, size))
+
+        for _, key, size in sorted(entries):
+            self._disk_entries[key] = size
+            self._disk_size += size
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used disk entries above disk_max_bytes"""
+        evicted = []
+        with self._lock:
+            while self._disk_size > self.disk_max_bytes and self._disk_entries:
+                key, size = self._disk_entries.popitem(last=False)
+                self._disk_size -= size
+                self._stats["evictions"] += 1
+                evicted.append(key)
+
+        for key in evicted:
+            for suffix in ("json", "body"):
+                try:
+                    os.remove(self._file(key, suffix))
+                except FileNotFoundError:
+                    pass
+                except OSError as error:
+                    log.warning("Unable to remove response cache entry %s: %s", key, error)
+
+    def _read(self, key: str) -> Optional[CachedResponse]:
+        """Read an entry from the disk tier"""
+        if not self.path:
+            return None
+
+        try:
+            with open(self._file(key, "json"), encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            with open(self._file(key, "body"), "rb") as body_file:
+                entry = CachedResponse(content=body_file.read(), **meta)
+            # Modification time orders entries by last use for the next start
+            os.utime(self._file(key, "body"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as error:
+            log.warning("Unable to read response cache entry %s: %s", key, error)
+            return None
+
+        with self._lock:
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+
+        return entry
+
+    def _write(self, key: str, entry: CachedResponse) -> None:
+        """Write an entry to the disk tier"""
+        if not self.path:
+            return
+
+        meta = json.dumps(entry.to_dict())
+        size = len(entry.content) + len(meta.encode("utf-8"))
+        if size > self.disk_max_bytes:
+            return
+
+        temp_suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(self._file(key, f"body.{temp_suffix}"), "wb") as body_file:
+                body_file.write(entry.content)
+            with open(self._file(key, f"json.{temp_suffix}"), "w", encoding="utf-8") as meta_file:
+                meta_file.write(meta)
+            os.replace(self._file(key, f"body.{temp_suffix}"), self._file(key, "body"))
+            os.replace(self._file(key, f"json.{temp_suffix}"), self._file(key, "json"))
+        except OSError as error:
+            log.warning("Unable to write response cache entry %s: %s", key, error)
+            return
+
+        with self._lock:
+            self._disk_size += size - self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = size
+        self._evict_disk()
@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""
+pywrapid web client circuit breaker
+
+Per host circuit breakers failing requests fast while an upstream is degraded,
+driven by error rate and slow call rate over a sliding window of recent calls.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+import threading
+from collections import deque
+from enum import Enum
+from time import monotonic
+from urllib.parse import urlparse
+
+log = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Circuit breaker state enum"""
+
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """Circuit breaker
+
+    Closed: calls pass and their outcome is recorded in a sliding window.
+    Open: calls are rejected until open_duration has passed.
+    Half-open: up to half_open_calls probe calls pass, a successful probe closes
+    the circuit and a failed probe opens it again.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = 0,
+        slow_call_rate: float = 1.0,
+        window: int = 20,
+        minimum_calls: int = 10,
+        open_duration: float = 30,
+        half_open_calls: int = 1,
+    ) -> None:
+        """Init function for circuit breaker
+
+        Args:
+            failure_rate (float, optional): Failed call share opening the circuit.
+                Defaults to 0.5.
+            slow_call_duration (float, optional): Seconds after which a call counts as slow,
+                0 disables latency tracking. Defaults to 0.
+            slow_call_rate (float, optional): Slow call share opening the circuit.
+                Defaults to 1.0.
+            window (int, optional): Number of recent calls evaluated. Defaults to 20.
+            minimum_calls (int, optional): Calls needed in the window before the circuit
+                can open. Defaults to 10.
+            open_duration (float, optional): Seconds to stay open before probing.
+                Defaults to 30.
+            half_open_calls (int, optional): Concurrent probe calls when half-open.
+                Defaults to 1.
+        """
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self._calls: deque = deque(maxlen=window)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once open_duration has passed"""
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def stats(self) -> dict:
+        """Breaker state and counters for monitoring"""
+        with self._lock:
+            failed = sum(1 for failure, _ in self._calls if failure)
+            slow = sum(1 for _, is_slow in self._calls if is_slow)
+            return {
+                "state": self._current_state().name,
+                "calls": len(self._calls),
+                "failed": failed,
+                "slow": slow,
+                "rejected": self._rejected,
+            }
+
+    def _current_state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and monotonic() - self._opened_at >= self.open_duration
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+            log.info("Circuit half-open, probing upstream")
+
+        return self._state
+
+    def allow(self) -> bool:
+        """Check if a call may pass, counting it as a probe when half-open
+
+        Returns:
+            bool: True if the call may be sent
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+
+            self._rejected += 1
+            return False
+
+    def release(self) -> None:
+        """Give back the probe slot of an allowed call that ended without an outcome
+
+        For calls abandoned before completing, e.g. cancelled, so a half-open circuit
+        keeps probing.
+        """
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record(self, failed: bool, duration: float = 0) -> None:
+        """Record the outcome of a call that was allowed
+
+        Args:
+            failed (bool): True if the call failed
+            duration (float, optional): Call duration in seconds
+        """
+        slow = bool(self.slow_call_duration) and duration >= self.slow_call_duration
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._state = CircuitState.CLOSED
+                    self._calls.clear()
+                    log.info("Circuit closed after successful probe")
+                return
+
+            self._calls.append((failed, slow))
+            if state == CircuitState.CLOSED and len(self._calls) >= self.minimum_calls:
+                failed_share = sum(1 for failure, _ in self._calls if failure) / len(self._calls)
+                slow_share = sum(1 for _, is_slow in self._calls if is_slow) / len(self._calls)
+                if failed_share >= self.failure_rate or (
+                    self.slow_call_duration and slow_share >= self.slow_call_rate
+                ):
+                    self._open()
+
+    def _open(self) -> None:
+        """Open the circuit, caller must hold the lock"""
+        self._state = CircuitState.OPEN
+        self._opened_at = monotonic()
+        log.warning("Circuit opened for %ss", self.open_duration)
+
+
+class CircuitBreakers:
+    """Circuit breakers per upstream origin (scheme, host and port)
+
+    Breakers are created on first use with the settings given at instantiation.
+    """
+
+    def __init__(self, failure_statuses: tuple = (), **settings: float) -> None:
+        """Init function for circuit breaker registry
+
+        Args:
+            failure_statuses (tuple, optional): Response status codes counted as failures.
+                Defaults to all 5xx responses.
+            **settings: CircuitBreaker arguments used for every breaker
+        """
+        self.failure_statuses = tuple(failure_statuses) or tuple(range(500, 600))
+        self._settings = settings
+        self._breakers: dict = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def origin(url: str) -> str:
+        """Breaker key for a URL"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Breaker for the origin of a URL"""
+        origin = self.origin(url)
+        with self._lock:
+            if origin not in self._breakers:
+                self._breakers[origin] = CircuitBreaker(**self._settings)  # type: ignore
+            return self._breakers[origin]
+
+    @property
+    def stats(self) -> dict:
+        """Breaker stats per origin"""
+        with self._lock:
+            breakers = dict(self._breakers)
+
+        return {origin: breaker.stats for origin, breaker in breakers.items()}
@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+"""
+pywrapid web client request coalescing
+
+Single-flight for identical idempotent requests, concurrent callers share one in-flight
+upstream request and each receive a copy of its response.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import copy
+import logging
+import threading
+from typing import Callable, Iterable, Optional
+
+from requests import Response, Timeout
+from requests.structures import CaseInsensitiveDict
+
+from .deadline import Deadline
+from .exceptions import ClientTimeout
+from .keys import request_digest
+
+log = logging.getLogger(__name__)
+
+COALESCE_METHODS = ("GET", "HEAD")
+
+# Request options giving a request a body or a streamed response, never coalesced
+_UNSHARED_OPTIONS = ("data", "json", "files", "stream")
+
+# Failures caused by the deadline or timeout of the caller sending the shared request
+_LEADER_ERRORS = (ClientTimeout, Timeout)
+
+
+class _Flight:  # pylint: disable=too-few-public-methods
+    """In-flight request shared by its callers"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: Optional[Response] = None
+        self.error: Optional[BaseException] = None
+
+
+def shared_response(response: Response) -> Response:
+    """Copy of a response for another caller, with its own headers
+
+    The body is read, the copy has no connection and can be used after the original
+    is closed.
+    """
+    shared = copy.copy(response)
+    shared.headers = CaseInsensitiveDict(response.headers)
+
+    return shared
+
+
+class RequestCoalescer:
+    """Request coalescing
+
+    Concurrent identical requests are sent once, the first caller sends the request and
+    later callers wait for its response or exception. Requests are identical when method,
+    URL, params, headers other than ignore_headers, the credential identity and the
+    credentials sent with the request match. Requests with a body or a streamed response
+    are always sent on their own. Waiting callers wait within their own deadline, when
+    the shared request fails on a timeout or deadline of its sender they send again.
+    """
+
+    def __init__(
+        self, methods: Iterable[str] = COALESCE_METHODS, ignore_headers: Iterable[str] = ()
+    ) -> None:
+        """Init function for request coalescing
+
+        Args:
+            methods (Iterable[str], optional): Methods to coalesce. Defaults to GET and HEAD.
+            ignore_headers (Iterable[str], optional): Headers not telling requests apart,
+                e.g. request id headers
+        """
+        self.methods = tuple(method.upper() for method in methods)
+        self.ignore_headers = {"authorization", *(name.lower() for name in ignore_headers)}
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "coalesced": 0}
+
+    @property
+    def stats(self) -> dict:
+        """Requests sent and requests served by another callers request"""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._flights)}
+
+    def coalescable(self, method: str, options: dict) -> bool:
+        """Check if a request can share an in-flight request"""
+        return method.upper() in self.methods and not any(
+            options.get(option) for option in _UNSHARED_OPTIONS
+        )
+
+    def key(
+        self, method: str, url: str, options: dict, identity: str = "", token: str = ""
+    ) -> str:
+        """Key of identical requests
+
+        Credentials sent with the request are hashed into the key, the clients own token
+        is left out since the identity covers it.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            options (dict): request options
+            identity (str, optional): Credential identity, e.g. the clients token store key
+            token (str, optional): Authorization header value of the clients own token
+
+        Returns:
+            str: Request key
+        """
+        return request_digest(method, url, options, identity, token, self.ignore_headers)
+
+    def send(
+        self, key: str, request: Callable[[], Response], deadline: Optional[Deadline] = None
+    ) -> Response:
+        """Send a request, or wait for the identical request in flight
+
+        Args:
+            key (str): Request key
+            request (Callable): Sends the request and returns its response
+            deadline (Deadline, optional): Deadline of the call waiting for the request
+
+        Raises:
+            ClientTimeout
+            Exception: The exception raised by the shared request
+
+        Returns:
+            Response: requests.Response object
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    self._stats["requests"] += 1
+                else:
+                    self._stats["coalesced"] += 1
+
+            if leader:
+                return self._lead(key, flight, request)
+
+            if not flight.done.wait(None if deadline is None else deadline.remaining()):
+                raise ClientTimeout("Deadline exceeded waiting for the coalesced request")
+            if flight.error is None:
+                return shared_response(flight.response)  # type: ignore[arg-type]
+            if isinstance(flight.error, Exception) and not isinstance(
+                flight.error, _LEADER_ERRORS
+            ):
+                raise flight.error
+            log.debug("Coalesced request failed for its sender, sending again: %s", flight.error)
+
+    def _lead(self, key: str, flight: _Flight, request: Callable[[], Response]) -> Response:
+        """Send the shared request of a flight and hand the outcome to waiting callers"""
+        try:
+            response = request()
+            # Copied while no caller holds it, waiting callers get copies of the copy
+            flight.response = shared_response(response)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return response
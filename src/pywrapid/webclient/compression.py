@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+"""
+pywrapid web client request compression
+
+Compression of request bodies above a size threshold with gzip, deflate, brotli or
+zstd, streaming for UploadBody bodies. Response decompression is done by the
+transports, which negotiate brotli and zstd themselves when the codecs are installed.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import json
+import logging
+import zlib
+from typing import Any, Iterator, Optional
+
+from pywrapid.utils.exceptions import DependencyError
+
+from .exceptions import ClientError
+from .upload import MultipartUpload, UploadBody
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 1024
+CONTENT_ENCODINGS = ("gzip", "deflate", "br", "zstd")
+
+
+def available_encodings() -> tuple:
+    """Content encodings with an installed codec"""
+    unavailable = {"br": brotli is None, "zstd": zstandard is None}
+    return tuple(encoding for encoding in CONTENT_ENCODINGS if not unavailable.get(encoding))
+
+
+class _BrotliCompressor:
+    """Brotli compressor with the zlib compressobj interface"""
+
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk, returning the output available so far"""
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """Finish the stream, returning the remaining output"""
+        return self._compressor.finish()
+
+
+def check_encoding(encoding: str) -> None:
+    """Check that a content encoding is known and its codec installed
+
+    Args:
+        encoding (str): Content encoding
+
+    Raises:
+        ClientError
+        DependencyError
+    """
+    if encoding not in CONTENT_ENCODINGS:
+        raise ClientError(
+            f"Unknown content encoding {encoding}, expected one of {CONTENT_ENCODINGS}"
+        )
+    if encoding not in available_encodings():
+        raise DependencyError(f"{encoding} compression requires pywrapid[compression]")
+
+
+def compressor(encoding: str, level: Optional[int] = None) -> Any:
+    """Streaming compressor with compress(data) and flush() methods
+
+    Args:
+        encoding (str): Content encoding, one of gzip, deflate, br or zstd
+        level (int, optional): Compression level. Defaults to a speed oriented level.
+
+    Raises:
+        ClientError
+        DependencyError
+
+    Returns:
+        Any: Compressor object
+    """
+    check_encoding(encoding)
+    if encoding == "br":
+        return _BrotliCompressor(5 if level is None else level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+
+    # wbits 31 writes a gzip container, 15 a zlib (deflate) stream
+    wbits = 31 if encoding == "gzip" else 15
+    return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, wbits)
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress data in one go
+
+    Args:
+        data (bytes): Data to compress
+        encoding (str): Content encoding, one of gzip, deflate, br or zstd
+        level (int, optional): Compression level
+
+    Returns:
+        bytes: Compressed data
+    """
+    stream = compressor(encoding, level)
+    return stream.compress(data) + stream.flush()
+
+
+class CompressedBody(UploadBody):
+    """UploadBody compressed chunk by chunk while it is sent
+
+    The compressed length is unknown up front, so it is sent with chunked transfer
+    encoding. Rewinding rewinds the wrapped body.
+    """
+
+    def __init__(self, body: UploadBody, encoding: str, level: Optional[int] = None) -> None:
+        """Init function for compressed upload body
+
+        Args:
+            body (UploadBody): Body to compress
+            encoding (str): Content encoding, one of gzip, deflate, br or zstd
+            level (int, optional): Compression level
+
+        Raises:
+            ClientError
+            DependencyError
+        """
+        check_encoding(encoding)
+        super().__init__(b"", chunk_size=body.chunk_size)
+        self.length = None
+        self.body = body
+        self.encoding = encoding
+        self.level = level
+
+    @property
+    def rewindable(self) -> bool:
+        return self.body.rewindable
+
+    def rewind(self) -> bool:
+        return self.body.rewind()
+
+    def __iter__(self) -> Iterator[bytes]:
+        stream = compressor(self.encoding, self.level)
+        for chunk in self.body:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.flush()
+
+
+class RequestCompressor:  # pylint: disable=too-few-public-methods
+    """Request body compression
+
+    Compresses bytes, str and json bodies of at least min_size bytes, and UploadBody
+    bodies of unknown length or at least min_size bytes, setting Content-Encoding.
+    Form data, files, multipart bodies and requests already carrying a Content-Encoding
+    are sent as is.
+    Only use it towards servers accepting compressed request bodies.
+    """
+
+    def __init__(
+        self, encoding: str = "gzip", min_size: int = DEFAULT_MIN_SIZE, level: Optional[int] = None
+    ) -> None:
+        """Init function for request compression
+
+        Args:
+            encoding (str, optional): Content encoding, one of gzip, deflate, br or zstd.
+                Defaults to "gzip".
+            min_size (int, optional): Smallest body in bytes to compress. Defaults to 1024.
+            level (int, optional): Compression level. Defaults to a speed oriented level.
+
+        Raises:
+            ClientError
+            DependencyError
+        """
+        check_encoding(encoding)
+        self.encoding = encoding
+        self.min_size = min_size
+        self.level = level
+
+    def apply(self, options: dict) -> dict:
+        """Compress the body of request options
+
+        Args:
+            options (dict): request options
+
+        Returns:
+            dict: request options with a compressed body, or the options unchanged
+        """
+        headers = options.get("headers") or {}
+        if any(name.lower() == "content-encoding" for name in headers):
+            return options
+
+        data = options.get("data")
+        extra_headers = {}
+        if data is None and options.get("json") is not None:
+            data = json.dumps(options["json"], allow_nan=False).encode()
+            if not any(name.lower() == "content-type" for name in headers):
+                extra_headers["Content-Type"] = "application/json"
+
+        if isinstance(data, str):
+            data = data.encode()
+        if isinstance(data, bytes) and len(data) >= self.min_size:
+            body: Any = compress(data, self.encoding, self.level)
+        elif (
+            isinstance(data, UploadBody)
+            and not isinstance(data, MultipartUpload)
+            and (data.length is None or data.length >= self.min_size)
+        ):
+            body = CompressedBody(data, self.encoding, self.level)
+        else:
+            return options
+
+        return {
+            **{key: value for key, value in options.items() if key != "json"},
+            "data": body,
+            "headers": {**extra_headers, **headers, "Content-Encoding": self.encoding},
+        }
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""
+pywrapid web client call deadlines
+
+Time budget of a call covering authentication, rate limiting, retries with their
+backoff and the requests, handing each step only the time that remains.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, Iterator, Optional
+
+from .exceptions import ClientTimeout
+
+log = logging.getLogger(__name__)
+
+
+class Deadline:
+    """Deadline of a call
+
+    Started when created. The same Deadline can be passed to several calls to share
+    one budget between them.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        """Init function for call deadlines
+
+        Args:
+            seconds (float): Time budget in seconds
+        """
+        self.seconds = seconds
+        self.expires = monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, 0 once expired"""
+        return max(0.0, self.expires - monotonic())
+
+    def allows(self, seconds: float) -> bool:
+        """Check if a wait of seconds ends before the deadline"""
+        return seconds < self.remaining()
+
+    def check(self, step: str) -> float:
+        """Seconds left for a step
+
+        Args:
+            step (str): Description of the step for the error message
+
+        Raises:
+            ClientTimeout
+
+        Returns:
+            float: Seconds left
+        """
+        remaining = self.remaining()
+        if not remaining:
+            raise ClientTimeout(f"Deadline of {self.seconds}s exceeded {step}")
+
+        return remaining
+
+    def timeout(self, timeout: Any = None) -> Any:
+        """Request timeout limited to the time left
+
+        Args:
+            timeout (Any, optional): requests style timeout, seconds or a (connect, read)
+                tuple, None for no timeout
+
+        Raises:
+            ClientTimeout
+
+        Returns:
+            Any: Timeout of the same form, no part longer than the time left
+        """
+        remaining = self.check("before sending the request")
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        if timeout is None:
+            return remaining
+
+        return min(timeout, remaining)
+
+
+@contextmanager
+def hold(lock: Any, timeout: Optional[float], message: str) -> Iterator[None]:
+    """Hold a threading lock, waiting no longer than timeout for it
+
+    Args:
+        lock (Any): threading Lock or RLock
+        timeout (float|None): Seconds to wait for the lock, None waits indefinitely
+        message (str): Error message when the lock is not acquired in time
+
+    Raises:
+        ClientTimeout
+    """
+    # Released below, a with block can not limit the wait for a lock
+    # pylint: disable-next=consider-using-with
+    if not lock.acquire(timeout=-1 if timeout is None else timeout):
+        raise ClientTimeout(message)
+    try:
+        yield
+    finally:
+        lock.release()
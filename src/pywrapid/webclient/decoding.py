@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+"""
+pywrapid web client json decoding
+
+Response body json decoding with the fastest installed backend (orjson, ujson or the
+standard library), decoded once per response and optionally off the event loop.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable
+
+from pywrapid.utils.exceptions import DependencyError
+
+from .exceptions import ClientError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+JSON_BACKENDS = ("orjson", "ujson", "json")
+DEFAULT_OFFLOAD_SIZE = 1024 * 1024
+
+# Response attribute holding the decoded body
+_DECODED = "_pywrapid_json"
+_MISSING = object()
+
+
+def json_backend(backend: str = "auto") -> tuple[str, Callable[[Any], Any]]:
+    """Resolve a json backend name to its loads function
+
+    Args:
+        backend (str, optional): orjson, ujson, json or auto for the fastest installed.
+            Defaults to "auto".
+
+    Raises:
+        ClientError
+        DependencyError
+
+    Returns:
+        tuple: Backend name and loads function taking bytes or str
+    """
+    modules = {"orjson": orjson, "ujson": ujson, "json": json}
+    if backend == "auto":
+        backend = next(name for name in JSON_BACKENDS if modules[name] is not None)
+    if backend not in modules:
+        raise ClientError(f"Unknown json backend {backend}, expected one of {JSON_BACKENDS}")
+    if modules[backend] is None:
+        raise DependencyError(f"json backend {backend} is not installed")
+
+    return backend, modules[backend].loads  # type: ignore[union-attr]
+
+
+class JSONDecoder:
+    """Response json decoder
+
+    The body is decoded on first use and kept on the response, later decodes of the
+    same response are free. Bodies in a UTF-8 compatible encoding are passed to the
+    backend as bytes without creating a str first.
+    """
+
+    def __init__(self, backend: str = "auto", offload_size: int = DEFAULT_OFFLOAD_SIZE) -> None:
+        """Init function for json decoder
+
+        Args:
+            backend (str, optional): orjson, ujson, json or auto for the fastest installed.
+                Defaults to "auto".
+            offload_size (int, optional): Body size in bytes from which decode_async
+                decodes in a worker thread, 0 disables. Defaults to 1 MiB.
+
+        Raises:
+            ClientError
+            DependencyError
+        """
+        self.backend, self.loads = json_backend(backend)
+        self.offload_size = offload_size
+
+    @staticmethod
+    def body(response: Any) -> Any:
+        """Response body as bytes, or str when it needs decoding from another charset"""
+        encoding = (response.encoding or "utf-8").lower().replace("-", "").replace("_", "")
+        if encoding in ("utf8", "ascii", "usascii"):
+            return response.content
+
+        return response.text
+
+    def decode(self, response: Any) -> Any:
+        """Decoded json body of a response
+
+        Args:
+            response (Any): requests or httpx response
+
+        Raises:
+            ValueError: Body is not valid json
+
+        Returns:
+            Any: Decoded json
+        """
+        decoded = response.__dict__.get(_DECODED, _MISSING)
+        if decoded is _MISSING:
+            decoded = self.loads(self.body(response))
+            setattr(response, _DECODED, decoded)
+
+        return decoded
+
+    async def decode_async(self, response: Any) -> Any:
+        """Decoded json body of a response, in a worker thread for large bodies
+
+        Args:
+            response (Any): Response with a read body
+
+        Raises:
+            ValueError: Body is not valid json
+
+        Returns:
+            Any: Decoded json
+        """
+        if (
+            _DECODED in response.__dict__
+            or not self.offload_size
+            or len(response.content) < self.offload_size
+        ):
+            return self.decode(response)
+
+        decoded = await asyncio.to_thread(self.loads, self.body(response))
+        setattr(response, _DECODED, decoded)
+
+        return decoded
+
+
+def response_json(response: Any) -> Any:
+    """Decoded json body of a response, reusing a body decoded by a client
+
+    Args:
+        response (Any): requests or httpx response
+
+    Raises:
+        ValueError: Body is not valid json
+
+    Returns:
+        Any: Decoded json
+    """
+    return _default_decoder.decode(response)
+
+
+_default_decoder = JSONDecoder()
@@ -61,6 +61,14 @@ class ClientURLError(ClientError):
     """Client URL Error Exception"""
 
 
+class ClientRateLimitError(ClientError):
+    """Client Rate Limit Error Exception"""
+
+
+class ClientCircuitOpenError(ClientError):
+    """Client Circuit Open Error Exception"""
+
+
 # Credentials
 class CredentialException(PywrapidException):
     """Credential Certificate Error Exception"""
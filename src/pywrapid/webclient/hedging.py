@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""
+pywrapid web client request hedging
+
+Hedged idempotent requests, a duplicate request is sent when a response is slower than
+a latency percentile of the upstream and the first response wins.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from time import monotonic
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+from requests import Response
+
+from .deadline import Deadline
+from .metrics import DEFAULT_BUCKETS, LatencyHistogram
+
+log = logging.getLogger(__name__)
+
+HEDGE_METHODS = ("GET", "HEAD")
+
+# Request options giving a request a body or a streamed response, never hedged
+_UNHEDGED_OPTIONS = ("data", "json", "files", "stream")
+
+
+def _close_response(future: Future) -> None:
+    """Close the response of a losing request once it arrives"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class RequestHedger:  # pylint: disable=too-many-instance-attributes
+    """Request hedging
+
+    A hedge, a duplicate of the request, is sent when no response has arrived after the
+    percentile latency of earlier requests to the host, or after delay seconds until
+    min_samples requests have been observed, counted from when the request starts. The
+    first response wins, a failed request waits for the others still in flight. Every
+    request gets a thread of its own for the first attempt, so the number of concurrent
+    requests is not limited, and hedges are sent from a pool of max_workers threads. A
+    losing request that already started can not be interrupted and its response is
+    closed, discarding the connection, when it arrives. No hedge is sent when the
+    deadline of the call ends before the hedge delay.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        delay: float = 0.1,
+        percentile: float = 95,
+        min_samples: int = 20,
+        max_hedges: int = 1,
+        max_workers: int = 32,
+        methods: Iterable[str] = HEDGE_METHODS,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Init function for request hedging
+
+        Args:
+            delay (float, optional): Seconds before hedging until enough latencies are
+                observed. Defaults to 0.1.
+            percentile (float, optional): Latency percentile to hedge after. Defaults to 95.
+            min_samples (int, optional): Observed requests to a host before the percentile
+                is used. Defaults to 20.
+            max_hedges (int, optional): Duplicates sent per request. Defaults to 1.
+            max_workers (int, optional): Threads sending hedges. Defaults to 32.
+            methods (Iterable[str], optional): Methods to hedge. Defaults to GET and HEAD.
+            buckets (Iterable[float], optional): Latency histogram bucket upper bounds,
+                the percentile resolves to a bucket bound. Defaults to 5ms to 10s.
+        """
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.methods = tuple(method.upper() for method in methods)
+        self.buckets = tuple(buckets)
+        self._histograms: dict = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pywrapid-hedge"
+        )
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedges": 0, "hedge_wins": 0}
+
+    @property
+    def stats(self) -> dict:
+        """Hedged requests, hedges sent and responses won by a hedge"""
+        with self._lock:
+            return dict(self._stats)
+
+    def hedgeable(self, method: str, options: dict) -> bool:
+        """Check if a request may be hedged"""
+        return method.upper() in self.methods and not any(
+            options.get(option) for option in _UNHEDGED_OPTIONS
+        )
+
+    def hedge_delay(self, url: str) -> float:
+        """Seconds to wait for a response to a URL before hedging"""
+        with self._lock:
+            histogram = self._histograms.get(urlparse(url).netloc)
+            if histogram is None or histogram.count < self.min_samples:
+                return self.delay
+            return histogram.percentile(self.percentile)
+
+    def observe(self, url: str, seconds: float) -> None:
+        """Add the latency of a response"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._histograms:
+                self._histograms[host] = LatencyHistogram(self.buckets)
+            self._histograms[host].observe(seconds)
+
+    def _timed(self, url: str, request: Callable[[], Response]) -> Response:
+        """Send a request, observing its latency"""
+        started = monotonic()
+        response = request()
+        self.observe(url, monotonic() - started)
+
+        return response
+
+    def _start(self, url: str, request: Callable[[], Response]) -> Future:
+        """Send the first request of a hedged request in a thread of its own
+
+        Returns:
+            Future: Future of the response, running once returned
+        """
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run() -> None:
+            try:
+                future.set_result(self._timed(url, request))
+            except BaseException as error:  # pylint: disable=broad-except
+                future.set_exception(error)
+
+        threading.Thread(target=run, name="pywrapid-hedge-primary", daemon=True).start()
+
+        return future
+
+    def send(
+        self, url: str, request: Callable[[], Response], deadline: Optional[Deadline] = None
+    ) -> Response:
+        """Send a request, hedging it when slow
+
+        Args:
+            url (str): Request URL
+            request (Callable): Sends the request and returns its response, called once
+                per hedge
+            deadline (Deadline, optional): Deadline of the call, no hedge is sent when
+                it ends before the hedge delay
+
+        Raises:
+            Exception: The first exception when every request failed
+
+        Returns:
+            Response: First response
+        """
+        delay = self.hedge_delay(url)
+        if deadline is not None and not deadline.allows(delay):
+            return self._timed(url, request)
+
+        with self._lock:
+            self._stats["requests"] += 1
+        primary = self._start(url, request)
+        hedge_at = monotonic() + delay
+        pending = {primary}
+        errors: list = []
+        hedges = 0
+
+        while pending:
+            timeout = max(0.0, hedge_at - monotonic()) if hedges < self.max_hedges else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedges += 1
+                hedge_at = monotonic() + delay
+                if deadline is not None and not deadline.allows(delay):
+                    # Further hedges would not be answered before the deadline
+                    hedges = self.max_hedges
+                with self._lock:
+                    self._stats["hedges"] += 1
+                log.debug("Hedging request to %s after %.3fs", url, delay)
+                pending.add(self._executor.submit(self._timed, url, request))
+                continue
+
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is None:
+                errors.extend(future.exception() for future in done)
+                continue
+
+            for loser in pending | (done - {winner}):
+                if not loser.cancel():
+                    loser.add_done_callback(_close_response)
+            if winner is not primary:
+                with self._lock:
+                    self._stats["hedge_wins"] += 1
+
+            return winner.result()
+
+        raise errors[0]
+
+    def close(self) -> None:
+        """Stop the hedging threads, waiting for hedges in flight"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+pywrapid web client keys
+
+Digests identifying credential sets and requests, used as token store, response cache
+and request coalescing keys. Values are hashed so secrets never end up in keys.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import hashlib
+import json
+from typing import Any, Iterable
+
+# Request options carrying credentials of their own
+CREDENTIAL_OPTIONS = ("auth", "cookies", "cert")
+
+
+def token_store_key(*identity: Any) -> str:
+    """Create a token store key from values identifying a credential set
+
+    The values are hashed so secrets in the identity are never stored as keys.
+
+    Args:
+        *identity (Any): Values identifying the credentials, e.g. login url and auth data
+
+    Returns:
+        str: Hex digest key
+    """
+    data = json.dumps(identity, sort_keys=True, default=str)
+
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def request_credentials(options: dict, token: str = "") -> str:
+    """Digest of the credentials a request is sent with
+
+    Covers the Authorization header and the auth, cookies and cert request options. An
+    Authorization header equal to token, the clients own token which is already told
+    apart by the credential identity, is left out so renewals do not change the digest.
+
+    Args:
+        options (dict): request options
+        token (str, optional): Authorization header value of the clients own token
+
+    Returns:
+        str: Hex digest of the credentials
+    """
+    authorization = next(
+        (
+            value
+            for name, value in (options.get("headers") or {}).items()
+            if name.lower() == "authorization"
+        ),
+        "",
+    )
+
+    return token_store_key(
+        "" if authorization == token else authorization,
+        *(options.get(option) for option in CREDENTIAL_OPTIONS),
+    )
+
+
+def request_digest(
+    method: str,
+    url: str,
+    options: dict,
+    identity: str = "",
+    token: str = "",
+    ignore_headers: Iterable[str] = (),
+) -> str:
+    """Digest telling requests and the credentials they are sent with apart
+
+    Covers method, URL, params, headers and request_credentials(), hashed so secrets
+    never end up in keys.
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL
+        options (dict): request options
+        identity (str, optional): Credential identity, e.g. the clients token store key
+        token (str, optional): Authorization header value of the clients own token
+        ignore_headers (Iterable[str], optional): Lower case names of headers left out
+
+    Returns:
+        str: Hex digest of the request
+    """
+    headers = {
+        name.lower(): value
+        for name, value in (options.get("headers") or {}).items()
+        if name.lower() != "authorization" and name.lower() not in ignore_headers
+    }
+
+    return token_store_key(
+        identity,
+        request_credentials(options, token),
+        method.upper(),
+        url,
+        options.get("params"),
+        headers,
+    )
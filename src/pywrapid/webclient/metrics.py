@@ -0,0 +1,269 @@
+#!/usr/bin/python3
+"""
+pywrapid web client request metrics
+
+Per request timings (time to first byte, total, connection reuse, sizes, status and
+retries) passed to hooks and aggregated into per host and per route latency histograms.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import bisect
+import logging
+import threading
+import weakref
+from time import time
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestTiming:  # pylint: disable=too-many-instance-attributes
+    """Timings and sizes of a single request attempt
+
+    ttfb is the time until the response headers were received and total the time until
+    the body was read, or the same as ttfb for streamed responses. reused is None when
+    the connection could not be inspected.
+    """
+
+    def __init__(self, method: str, url: str, attempt: int = 1) -> None:
+        self.method = method.upper()
+        self.url = url
+        self.attempt = attempt
+        self.started = time()
+        self.reused: Optional[bool] = None
+        self.ttfb: Optional[float] = None
+        self.total: Optional[float] = None
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    @property
+    def retries(self) -> int:
+        """Attempts made before this one"""
+        return self.attempt - 1
+
+    def to_dict(self) -> dict:
+        """Timing as a dict"""
+        return {
+            "method": self.method,
+            "url": self.url,
+            "started": self.started,
+            "attempt": self.attempt,
+            "reused": self.reused,
+            "ttfb": self.ttfb,
+            "total": self.total,
+            "status": self.status,
+            "error": self.error,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+        }
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed bucket upper bounds in seconds"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add a latency"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percentile: float) -> float:
+        """Upper bound of the bucket holding the percentile, max for the overflow bucket
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds, 0 without observations
+        """
+        rank = self.count * percentile / 100
+        seen = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bucket
+
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Histogram with cumulative bucket counts keyed by upper bound"""
+        cumulative: dict = {}
+        seen = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[bucket] = seen
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "buckets": {**cumulative, "+Inf": self.count},
+        }
+
+
+class _EndpointMetrics:  # pylint: disable=too-many-instance-attributes
+    """Aggregated metrics of a host or route"""
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.ttfb = LatencyHistogram(buckets)
+        self.total = LatencyHistogram(buckets)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.reused = 0
+        self.new_connections = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses: dict = {}
+
+    def observe(self, timing: RequestTiming) -> None:
+        """Add a finished request"""
+        self.requests += 1
+        self.retries += int(timing.retries > 0)
+        self.request_bytes += timing.request_bytes
+        self.response_bytes += timing.response_bytes
+        if timing.reused is not None:
+            self.reused += int(timing.reused)
+            self.new_connections += int(not timing.reused)
+        if timing.error:
+            self.errors += 1
+        if timing.status is not None:
+            self.statuses[timing.status] = self.statuses.get(timing.status, 0) + 1
+        if timing.ttfb is not None:
+            self.ttfb.observe(timing.ttfb)
+        if timing.total is not None:
+            self.total.observe(timing.total)
+
+    def to_dict(self) -> dict:
+        """Aggregated metrics as a dict"""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "reused_connections": self.reused,
+            "new_connections": self.new_connections,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "statuses": dict(self.statuses),
+            "ttfb": self.ttfb.to_dict(),
+            "total": self.total.to_dict(),
+        }
+
+
+class RequestMetrics:
+    """Request metrics registry
+
+    Records a RequestTiming for every request attempt sent by a WebClient, passes it
+    to the registered hooks and aggregates it per host and per route. Routes are
+    configured URL prefixes, the longest matching prefix is used and requests not
+    matching any route are only aggregated per host.
+    """
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        routes: Iterable[str] = (),
+        hooks: Iterable[Callable[[RequestTiming], Any]] = (),
+    ) -> None:
+        """Init function for request metrics
+
+        Args:
+            buckets (Iterable[float], optional): Histogram bucket upper bounds in seconds.
+                Defaults to 5ms to 10s.
+            routes (Iterable[str], optional): URL prefixes aggregated as routes
+            hooks (Iterable[Callable], optional): Callables receiving every RequestTiming
+        """
+        self.buckets = tuple(buckets)
+        self.routes = sorted(routes, key=len, reverse=True)
+        self._hooks = list(hooks)
+        self._hosts: dict = {}
+        self._routes: dict = {}
+        self._sockets: weakref.WeakSet = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[RequestTiming], Any]) -> None:
+        """Register a callable receiving every RequestTiming"""
+        self._hooks.append(hook)
+
+    def route(self, url: str) -> Optional[str]:
+        """Route of a URL, None if no route prefix matches"""
+        return next((route for route in self.routes if url.startswith(route)), None)
+
+    def connection_reused(self, response: Any) -> Optional[bool]:
+        """Check if a response was received on a previously used connection
+
+        Must be called before the response body is read and the connection is released,
+        e.g. from a requests response hook.
+
+        Args:
+            response (Any): requests response
+
+        Returns:
+            bool|None: True if reused, None if the connection can not be inspected
+        """
+        connection = getattr(getattr(response, "raw", None), "_connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is None:
+            return None
+
+        with self._lock:
+            if sock in self._sockets:
+                return True
+            self._sockets.add(sock)
+
+        return False
+
+    def record(self, timing: RequestTiming) -> None:
+        """Aggregate a timing and pass it to the hooks
+
+        Args:
+            timing (RequestTiming): Timing of a request attempt
+        """
+        host = urlparse(timing.url).netloc
+        route = self.route(timing.url)
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _EndpointMetrics(self.buckets)
+            self._hosts[host].observe(timing)
+            if route is not None:
+                if route not in self._routes:
+                    self._routes[route] = _EndpointMetrics(self.buckets)
+                self._routes[route].observe(timing)
+
+        for hook in self._hooks:
+            try:
+                hook(timing)
+            except Exception as error:  # pylint: disable=broad-except
+                log.warning("Request timing hook %s failed: %s", hook, error)
+
+    @property
+    def stats(self) -> dict:
+        """Aggregated metrics per host and per route"""
+        with self._lock:
+            return {
+                "hosts": {host: metrics.to_dict() for host, metrics in self._hosts.items()},
+                "routes": {route: metrics.to_dict() for route, metrics in self._routes.items()},
+            }
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""
+pywrapid web client pagination
+
+Pagination schemes used by WebClient.paginate: RFC 5988 Link headers,
+cursor tokens in the json body and offset/limit query parameters.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+from urllib.parse import urljoin
+
+from .decoding import response_json
+from .exceptions import ClientError
+
+log = logging.getLogger(__name__)
+
+
+def json_path(data: Any, path: str) -> Any:
+    """Get a value from json data by dotted path
+
+    Args:
+        data (Any): Parsed json data
+        path (str): Dotted key path, e.g. "meta.next_cursor". Empty for data itself.
+
+    Returns:
+        Any: Value at the path, None if it does not exist
+    """
+    for key in path.split(".") if path else []:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+
+    return data
+
+
+class Paginator(ABC):
+    """Pagination scheme base class
+
+    Requests are dicts of WebClient.call() arguments. A paginator prepares the first
+    request, extracts items from each page and builds the request for the next page.
+    """
+
+    def __init__(self, items_key: str = "") -> None:
+        """Init function for paginators
+
+        Args:
+            items_key (str, optional): Dotted path to the item list in the json body.
+                Defaults to the body itself being the list.
+        """
+        self.items_key = items_key
+
+    def first_request(self, request: dict) -> dict:
+        """Request for the first page"""
+        return request
+
+    def items(self, response: Any) -> list:
+        """Items of a page
+
+        Raises:
+            ClientError: Page body does not hold a list of items
+        """
+        try:
+            items = json_path(response_json(response), self.items_key)
+        except ValueError as error:
+            raise ClientError(f"Unable to decode page: {error}") from error
+        if items is None:
+            return []
+        if not isinstance(items, list):
+            raise ClientError(f"Page items at '{self.items_key}' is not a list")
+
+        return items
+
+    @abstractmethod
+    def next_request(self, request: dict, response: Any) -> Optional[dict]:
+        """Request for the page after response, None on the last page"""
+
+
+class LinkHeaderPaginator(Paginator):
+    """Pagination following the rel="next" URL of RFC 5988 Link headers
+
+    Relative next URLs are resolved against the URL of the page they were found on.
+    """
+
+    def next_request(self, request: dict, response: Any) -> Optional[dict]:
+        next_link = response.links.get("next", {}).get("url")
+        if not next_link:
+            return None
+
+        # Relative links resolve against the URL the page was served from
+        url = urljoin(response.url or request["url"], next_link)
+        # The next link carries the query, drop params of the previous request
+        return {**{k: v for k, v in request.items() if k != "params"}, "url": url}
+
+
+class CursorPaginator(Paginator):
+    """Pagination passing a cursor token from the json body as query parameter"""
+
+    def __init__(
+        self, items_key: str = "", cursor_key: str = "next_cursor", cursor_param: str = "cursor"
+    ) -> None:
+        """Init function for cursor pagination
+
+        Args:
+            items_key (str, optional): Dotted path to the item list in the json body
+            cursor_key (str, optional): Dotted path to the next cursor in the json body.
+                Defaults to "next_cursor".
+            cursor_param (str, optional): Query parameter to send the cursor in.
+                Defaults to "cursor".
+        """
+        super().__init__(items_key)
+        self.cursor_key = cursor_key
+        self.cursor_param = cursor_param
+
+    def next_request(self, request: dict, response: Any) -> Optional[dict]:
+        cursor = json_path(response_json(response), self.cursor_key)
+        if not cursor or not self.items(response):
+            return None
+
+        return {**request, "params": {**request.get("params", {}), self.cursor_param: cursor}}
+
+
+class OffsetPaginator(Paginator):
+    """Pagination with offset and limit query parameters
+
+    Stops at the first page holding fewer items than the limit.
+    """
+
+    def __init__(
+        self,
+        items_key: str = "",
+        limit: int = 100,
+        offset_param: str = "offset",
+        limit_param: str = "limit",
+    ) -> None:
+        """Init function for offset pagination
+
+        Args:
+            items_key (str, optional): Dotted path to the item list in the json body
+            limit (int, optional): Page size. Defaults to 100.
+            offset_param (str, optional): Offset query parameter. Defaults to "offset".
+            limit_param (str, optional): Limit query parameter. Defaults to "limit".
+        """
+        super().__init__(items_key)
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+
+    def first_request(self, request: dict) -> dict:
+        params = {self.offset_param: 0, self.limit_param: self.limit}
+        return {**request, "params": {**request.get("params", {}), **params}}
+
+    def next_request(self, request: dict, response: Any) -> Optional[dict]:
+        if len(self.items(response)) < self.limit:
+            return None
+
+        params = request["params"]
+        return {
+            **request,
+            "params": {**params, self.offset_param: params[self.offset_param] + self.limit},
+        }
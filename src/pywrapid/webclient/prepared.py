@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""
+pywrapid web client prepared endpoints
+
+Reusable endpoints for frequently called URLs, holding merged request options and
+swapping in the authorization header only when the access token changes.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+from string import Formatter
+from typing import TYPE_CHECKING, Any, Optional, Union
+from urllib.parse import quote, urlparse
+
+from .deadline import Deadline
+from .exceptions import ClientURLError
+
+if TYPE_CHECKING:
+    from requests import Response
+
+    from .web import WebClient
+
+log = logging.getLogger(__name__)
+
+
+class PreparedEndpoint:  # pylint: disable=too-many-instance-attributes
+    """Prepared endpoint created by WebClient.prepare()
+
+    Calling the endpoint sends a request like WebClient.call(). Path parameters fill the
+    fields of the URL template and are URL quoted, request options passed to the call
+    take precedence over the prepared defaults the same way they do over client_options.
+    Headers passed to the call are merged with the prepared headers.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        client: "WebClient",
+        method: str,
+        url_template: str,
+        raise_for_status: bool = False,
+        skip_authentication: bool = False,
+        **defaults: Any,
+    ) -> None:
+        """Init function for prepared endpoints
+
+        Args:
+            client (WebClient): Client sending the requests
+            method (str): Method of the HTTP requests
+            url_template (str): URL with optional {name} path parameter fields
+            raise_for_status (bool, optional): Raise for non 2xx repsonses
+            skip_authentication (bool, optional): Skip authentication and token refresh
+            **defaults (dict): request options for every call
+
+        Raises:
+            ClientURLError
+        """
+        try:
+            self.fields = tuple(
+                field for _, field, _, _ in Formatter().parse(url_template) if field is not None
+            )
+        except ValueError as error:
+            raise ClientURLError(f"Invalid URL template {url_template}: {error}") from error
+        parsed = urlparse(url_template)
+        if not parsed.scheme or not parsed.netloc:
+            raise ClientURLError(f"URL template is not an absolute URL: {url_template}")
+
+        self.method = method.upper()
+        self.url_template = url_template
+        self.base_url = f"{parsed.scheme}://{parsed.netloc}"
+        self.raise_for_status = raise_for_status
+        self.skip_authentication = skip_authentication
+        self._client = client
+        config = client.get_config
+        client_options = {
+            key: value
+            for key, value in (
+                config["client_options"] if "client_options" in config else {}
+            ).items()
+            if key not in client._session_option_keys  # pylint: disable=protected-access
+        }
+        self._options = {**client_options, **defaults}
+        self._headers = self._options.pop("headers", {})
+        self._authorized: tuple = (None, self._headers)
+
+    def url(self, **path: Any) -> str:
+        """URL for path parameters
+
+        Raises:
+            ClientURLError
+        """
+        if not self.fields:
+            return self.url_template
+        try:
+            return self.url_template.format(
+                **{name: quote(str(value), safe="") for name, value in path.items()}
+            )
+        except (KeyError, IndexError) as error:
+            raise ClientURLError(
+                f"Missing path parameter {error} for {self.url_template}"
+            ) from error
+
+    def _current_headers(self) -> dict:
+        """Prepared headers with the authorization header of the current token"""
+        token, headers = self._authorized
+        current = self._client._access_token  # pylint: disable=protected-access
+        if token != current:
+            # pylint: disable-next=protected-access
+            authorization = self._client._authorization_header()
+            headers = {**authorization, **self._headers}
+            # Replaced as a pair, a token renewed meanwhile is picked up on the next call
+            self._authorized = (current, headers)
+
+        return headers
+
+    def __call__(
+        self,
+        path: Optional[dict] = None,
+        deadline: Union[float, Deadline, None] = None,
+        **options: Any,
+    ) -> "Response":
+        """Send a request to the endpoint
+
+        Args:
+            path (dict, optional): Path parameters for the URL template
+            deadline (float|Deadline, optional): Seconds the call may take including
+                authentication, retries and backoff, or a Deadline shared with other calls
+            **options (dict): request options overriding the prepared defaults, headers
+                are merged with the prepared headers
+
+        Raises:
+            ClientHTTPError
+            ClientTimeout
+            ClientConnectionError
+            ClientException
+            ClientAuthenticationError
+            ClientURLError
+
+        Returns:
+            Response: requests.Response object
+        """
+        client = self._client
+        if isinstance(deadline, (int, float)):
+            deadline = Deadline(deadline)
+        if not self.skip_authentication:
+            client._ensure_session(deadline)  # pylint: disable=protected-access
+
+        request = {**self._options, **options}
+        # Merged like the session merges headers, a None value drops a prepared header
+        request["headers"] = {**self._current_headers(), **(options.get("headers") or {})}
+
+        return client._call(  # pylint: disable=protected-access
+            self.method, self.url(**(path or {})), request, self.raise_for_status, deadline
+        )
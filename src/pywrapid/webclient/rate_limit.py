@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+pywrapid web client rate limiter
+
+Client side token bucket rate limiting per host and per route, shared by all threads
+and tasks using a client.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+import threading
+from time import monotonic
+from typing import Optional
+from urllib.parse import urlparse
+
+from .exceptions import ClientError
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """Token bucket
+
+    Holds up to burst tokens, refilled at rate tokens per second. Not thread safe on
+    its own, the RateLimiter serializes access.
+    """
+
+    def __init__(self, rate: float, burst: float = 0) -> None:
+        """Init function for token bucket
+
+        Args:
+            rate (float): Tokens added per second
+            burst (float, optional): Bucket capacity. Defaults to rate, minimum 1.
+
+        Raises:
+            ClientError
+        """
+        if rate <= 0:
+            raise ClientError(f"Rate limit rate must be positive, got {rate}")
+
+        self.rate = float(rate)
+        self.burst = float(max(burst or rate, 1))
+        self.tokens = self.burst
+        self._updated = monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill"""
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:  # pylint: disable=too-few-public-methods
+    """Rate limiter for web clients
+
+    Applies a token bucket per configured host, per configured route (URL prefix)
+    and optionally a default bucket for every other host. A request consumes one token
+    from each bucket that applies to it.
+
+    Configured from a dict such as::
+
+        {
+            "block": True,
+            "default": {"rate": 50, "burst": 100},
+            "hosts": {"api.example.com": {"rate": 10}},
+            "routes": {"https://api.example.com/v1/search": {"rate": 2, "burst": 5}},
+        }
+    """
+
+    def __init__(
+        self,
+        hosts: Optional[dict] = None,
+        routes: Optional[dict] = None,
+        default: Optional[dict] = None,
+        block: bool = True,
+    ) -> None:
+        """Init function for rate limiter
+
+        Args:
+            hosts (dict, optional): Bucket settings (rate, burst) per host name
+            routes (dict, optional): Bucket settings (rate, burst) per URL prefix
+            default (dict, optional): Bucket settings for hosts not in hosts
+            block (bool, optional): Wait for tokens instead of failing fast.
+                Defaults to True.
+        """
+        self.block = block
+        self._default = default or {}
+        self._hosts = {host: TokenBucket(**bucket) for host, bucket in (hosts or {}).items()}
+        self._routes = {route: TokenBucket(**bucket) for route, bucket in (routes or {}).items()}
+        self._lock = threading.Lock()
+
+    def _buckets(self, url: str) -> list:
+        """Buckets applying to a URL, caller must hold the lock"""
+        host = urlparse(url).hostname or ""
+        if host not in self._hosts and self._default:
+            self._hosts[host] = TokenBucket(**self._default)
+
+        buckets = [bucket for route, bucket in self._routes.items() if url.startswith(route)]
+        if host in self._hosts:
+            buckets.append(self._hosts[host])
+
+        return buckets
+
+    def reserve(
+        self, url: str, block: Optional[bool] = None, max_wait: Optional[float] = None
+    ) -> Optional[float]:
+        """Take a token from every bucket applying to the URL
+
+        When blocking, tokens are taken ahead of time and the caller must wait the
+        returned time before sending. Nothing is taken when that wait is max_wait or
+        longer, the caller can not wait for them. When failing fast, nothing is taken
+        unless all buckets have a token available.
+
+        Args:
+            url (str): URL of the request
+            block (bool, optional): Override the limiters block setting
+            max_wait (float, optional): Seconds the caller is able to wait
+
+        Returns:
+            float|None: Seconds to wait before sending, None if failing fast without tokens
+        """
+        block = self.block if block is None else block
+        with self._lock:
+            buckets = self._buckets(url)
+            now = monotonic()
+            for bucket in buckets:
+                bucket.refill(now)
+
+            if not block and any(bucket.tokens < 1 for bucket in buckets):
+                return None
+
+            wait = max(
+                ((1 - bucket.tokens) / bucket.rate for bucket in buckets if bucket.tokens < 1),
+                default=0.0,
+            )
+            if max_wait is not None and wait >= max_wait:
+                return wait
+
+            for bucket in buckets:
+                bucket.tokens -= 1
+
+        return wait
@@ -0,0 +1,307 @@
+#!/usr/bin/python3
+"""
+pywrapid web client record and replay transport
+
+Transport recording request and response exchanges of another transport to a cassette
+file and replaying them without network access, with optional simulated latency.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import base64
+import gzip
+import hashlib
+import io
+import json as jsonlib
+import logging
+import threading
+from time import sleep
+from typing import IO, Any, Optional, Union
+
+from requests import ConnectionError as RequestsConnectionError
+from requests import ReadTimeout, Request, Response, Session
+from requests.hooks import dispatch_hook
+
+from .exceptions import ClientError
+from .transport import Transport, _split_timeout, build_response, prepared_request
+
+log = logging.getLogger(__name__)
+
+REPLAY_MODES = ("record", "replay")
+
+# Recorded bodies are decoded, headers describing the encoding on the wire are dropped
+_UNRECORDED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _open_cassette(path: str, mode: str) -> IO[str]:
+    """Open a cassette file, gzip compressed when the name ends with .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def request_key(
+    method: str, url: str, params: Any = None, data: Any = None, json: Any = None
+) -> tuple:
+    """Key matching a request to recorded exchanges
+
+    Args:
+        method (str): Method of the HTTP request
+        url (str): URL of the request
+        params (Any, optional): Query parameters
+        data (Any, optional): Request body, streamed bodies are not matched
+        json (Any, optional): Json request body
+
+    Returns:
+        tuple: Method, URL including the query and sha256 digest of the body or None
+    """
+    prepared = Request(
+        method=method.upper(),
+        url=url,
+        params=params,
+        data=data if isinstance(data, (bytes, str, dict, list, tuple)) else None,
+        json=json,
+    ).prepare()
+    body = prepared.body.encode() if isinstance(prepared.body, str) else prepared.body
+    digest = hashlib.sha256(body).hexdigest() if isinstance(body, bytes) else None
+
+    return prepared.method, prepared.url, digest
+
+
+class ReplayTransport(Transport):  # pylint: disable=too-many-instance-attributes
+    """Record and replay transport
+
+    In record mode requests are sent with the wrapped transport and every exchange is
+    appended to the cassette, one compact json document per line. In replay mode
+    requests are answered from the cassette, no connections are made. Requests are
+    matched by method and URL including the query, and by body with match_body. The
+    responses recorded for a request are replayed in order and, with repeat, start
+    over when used up. A request without a recorded response raises a requests
+    ConnectionError.
+
+    Replayed responses are delayed by latency seconds, or by the recorded response time
+    with latency "recorded". A delay longer than the read timeout raises ReadTimeout
+    after the timeout. Bodies are stored decoded, text as is and binary as base64.
+    """
+
+    name = "replay"
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        cassette: str,
+        mode: str = "replay",
+        latency: Union[float, str, None] = None,
+        match_body: bool = False,
+        repeat: bool = True,
+        transport: Union[Session, Transport, None] = None,
+    ) -> None:
+        """Init function for the record and replay transport
+
+        Args:
+            cassette (str): Cassette file path, gzip compressed when ending with .gz
+            mode (str, optional): record or replay. Defaults to "replay".
+            latency (float|str, optional): Seconds replayed responses are delayed, or
+                "recorded" for the recorded response times. Defaults to no delay.
+            match_body (bool, optional): Tell requests apart by body. Defaults to False.
+            repeat (bool, optional): Start over with the first response recorded for a
+                request once all were replayed. Defaults to True.
+            transport (Session|Transport, optional): Transport sending recorded requests,
+                required in record mode
+
+        Raises:
+            ClientError
+        """
+        if mode not in REPLAY_MODES:
+            raise ClientError(f"Unknown replay mode {mode}, expected one of {REPLAY_MODES}")
+        if mode == "record" and transport is None:
+            raise ClientError("Record mode requires a transport to send requests with")
+        if isinstance(latency, str) and latency != "recorded":
+            raise ClientError(f"Unknown replay latency {latency}, expected seconds or recorded")
+
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self.match_body = match_body
+        self.repeat = repeat
+        self.transport = transport
+        self._exchanges: dict = {}
+        self._turns: dict = {}
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+        if mode == "record":
+            self._file = _open_cassette(cassette, "w")
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        """Read the recorded exchanges from the cassette
+
+        Raises:
+            ClientError
+        """
+        try:
+            with _open_cassette(self.cassette, "r") as cassette:
+                for line in cassette:
+                    if not line.strip():
+                        continue
+                    exchange = jsonlib.loads(line)
+                    key = (
+                        exchange["method"],
+                        exchange["url"],
+                        exchange["body"] if self.match_body else None,
+                    )
+                    self._exchanges.setdefault(key, []).append(exchange)
+        except (OSError, ValueError, KeyError) as error:
+            raise ClientError(f"Unable to load cassette {self.cassette}: {error}") from error
+
+        log.debug("Loaded %s requests from cassette %s", len(self._exchanges), self.cassette)
+
+    def _key(self, method: str, url: str, params: Any, data: Any, json: Any) -> tuple:
+        """Cassette key of a request, recorded with and replayed by body digest"""
+        method, url, digest = request_key(method, url, params, data, json)
+
+        return method, url, digest if self.mode == "record" or self.match_body else None
+
+    def _record(self, key: tuple, response: Response) -> None:
+        """Append an exchange to the cassette"""
+        content = response.content or b""
+        try:
+            body, encoding = content.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        exchange = {
+            "method": key[0],
+            "url": key[1],
+            "body": key[2],
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": [
+                [name, value]
+                for name, value in response.headers.items()
+                if name.lower() not in _UNRECORDED_HEADERS
+            ],
+            "content": body,
+            "encoding": encoding,
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        line = jsonlib.dumps(exchange, separators=(",", ":"))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def _next(self, key: tuple) -> dict:
+        """Recorded exchange to replay for a request
+
+        Raises:
+            ConnectionError: No recorded response left for the request
+        """
+        with self._lock:
+            exchanges = self._exchanges.get(key, [])
+            turn = self._turns.get(key, 0)
+            if turn >= len(exchanges) and self.repeat:
+                turn = 0
+            if turn >= len(exchanges):
+                raise RequestsConnectionError(
+                    f"No recorded response for {key[0]} {key[1]} in {self.cassette}"
+                )
+            self._turns[key] = turn + 1
+
+            return exchanges[turn]
+
+    def _delay(self, exchange: dict, timeout: Any) -> float:
+        """Wait the simulated latency of a replayed response
+
+        Raises:
+            ReadTimeout: Latency exceeds the read timeout
+        """
+        if self.latency is None:
+            return 0.0
+        delay = exchange["elapsed"] if self.latency == "recorded" else float(self.latency)
+        _, read = _split_timeout(timeout)
+        if read is not None and delay > read:
+            sleep(read)
+            raise ReadTimeout(f"Replayed response not received within {read}s")
+        sleep(delay)
+
+        return delay
+
+    def request(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        data: Any = None,
+        headers: Optional[dict] = None,
+        cookies: Any = None,
+        files: Any = None,
+        auth: Any = None,
+        timeout: Any = None,
+        allow_redirects: bool = True,
+        proxies: Any = None,
+        hooks: Any = None,
+        stream: bool = False,
+        verify: Any = True,
+        cert: Any = None,
+        json: Any = None,
+    ) -> Response:
+        key = self._key(method, url, params, data, json)
+        if self.mode == "record":
+            response = self.transport.request(  # type: ignore[union-attr]
+                method,
+                url,
+                params=params,
+                data=data,
+                headers=headers,
+                cookies=cookies,
+                files=files,
+                auth=auth,
+                timeout=timeout,
+                allow_redirects=allow_redirects,
+                proxies=proxies,
+                hooks=hooks,
+                stream=stream,
+                verify=verify,
+                cert=cert,
+                json=json,
+            )
+            self._record(key, response)
+            return response
+
+        exchange = self._next(key)
+        elapsed = self._delay(exchange, timeout)
+        content = (
+            base64.b64decode(exchange["content"])
+            if exchange["encoding"] == "base64"
+            else exchange["content"].encode("utf-8")
+        )
+        body = data if isinstance(data, (bytes, str)) else None
+        response = build_response(
+            prepared_request(method, key[1], headers, body),
+            exchange["status"],
+            exchange["headers"],
+            key[1],
+            exchange["reason"],
+            elapsed,
+            content=None if stream else content,
+            raw=io.BytesIO(content) if stream else None,
+        )
+
+        return dispatch_hook("response", hooks or {}, response)
+
+    def close(self) -> None:
+        """Close the cassette and the wrapped transport"""
+        with self._lock:
+            cassette, self._file = self._file, None
+        if cassette is not None:
+            cassette.close()
+        if self.transport is not None:
+            self.transport.close()
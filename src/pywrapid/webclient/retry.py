@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""
+pywrapid web client retry policy
+
+Decides if and when failed requests are retried, using exponential backoff with full
+jitter and the Retry-After header of 429/503 responses.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+from requests import ConnectionError as RequestsConnectionError
+from requests import Timeout
+
+log = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE")
+RETRY_STATUSES = (429, 502, 503, 504)
+RETRY_AFTER_STATUSES = (429, 503)
+
+
+class RetryPolicy:  # pylint: disable=too-many-instance-attributes
+    """Retry policy for web clients
+
+    The default policy makes a single attempt. Only idempotent methods are retried
+    unless retry_methods says otherwise.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        max_attempts: int = 1,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        retry_statuses: tuple = RETRY_STATUSES,
+        retry_methods: tuple = IDEMPOTENT_METHODS,
+        retry_exceptions: tuple = (RequestsConnectionError, Timeout),
+        respect_retry_after: bool = True,
+        max_retry_after: float = 60,
+    ) -> None:
+        """Init function for retry policy
+
+        Args:
+            max_attempts (int, optional): Attempts including the first. Defaults to 1.
+            backoff_factor (float, optional): Backoff base in seconds, the backoff ceiling
+                doubles per attempt. Defaults to 0.5.
+            max_backoff (float, optional): Backoff ceiling in seconds. Defaults to 30.
+            retry_statuses (tuple, optional): Response status codes to retry.
+                Defaults to 429, 502, 503 and 504.
+            retry_methods (tuple, optional): HTTP methods allowed to be retried.
+                Defaults to idempotent methods.
+            retry_exceptions (tuple, optional): Request exception classes to retry.
+                Defaults to connection errors and timeouts.
+            respect_retry_after (bool, optional): Wait as told by Retry-After on 429 and
+                503 responses. Defaults to True.
+            max_retry_after (float, optional): Give up instead of waiting longer than this
+                for Retry-After. Defaults to 60.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = tuple(retry_statuses)
+        self.retry_methods = tuple(method.upper() for method in retry_methods)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+    def retry_error(self, method: str, attempt: int, error: Exception) -> bool:
+        """Check if a request that raised an exception should be retried
+
+        Args:
+            method (str): HTTP method of the request
+            attempt (int): Number of the attempt that failed, starting at 1
+            error (Exception): Raised exception
+
+        Returns:
+            bool: True if the request should be retried
+        """
+        return (
+            attempt < self.max_attempts
+            and method.upper() in self.retry_methods
+            and isinstance(error, self.retry_exceptions)
+        )
+
+    def retry_response(self, method: str, attempt: int, response: Any) -> bool:
+        """Check if a request should be retried based on its response
+
+        Args:
+            method (str): HTTP method of the request
+            attempt (int): Number of the attempt, starting at 1
+            response (Any): Response of the attempt
+
+        Returns:
+            bool: True if the request should be retried
+        """
+        if (
+            attempt >= self.max_attempts
+            or method.upper() not in self.retry_methods
+            or response.status_code not in self.retry_statuses
+        ):
+            return False
+
+        retry_after = self.retry_after(response)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            log.debug("Not retrying, Retry-After %s exceeds max_retry_after", retry_after)
+            return False
+
+        return True
+
+    def retry_after(self, response: Any) -> Optional[float]:
+        """Seconds to wait according to the responses Retry-After header
+
+        Args:
+            response (Any): Response to read Retry-After from
+
+        Returns:
+            float|None: Seconds to wait, None if not applicable
+        """
+        if (
+            not self.respect_retry_after
+            or response is None
+            or response.status_code not in RETRY_AFTER_STATUSES
+            or not response.headers.get("Retry-After")
+        ):
+            return None
+
+        value = response.headers["Retry-After"].strip()
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+    def backoff(self, attempt: int, response: Any = None) -> float:
+        """Seconds to wait before the next attempt
+
+        Uses Retry-After when given, otherwise full jitter: a random delay between zero
+        and backoff_factor * 2 ** (attempt - 1), capped at max_backoff.
+
+        Args:
+            attempt (int): Number of the attempt that failed, starting at 1
+            response (Any, optional): Response of the failed attempt
+
+        Returns:
+            float: Seconds to wait
+        """
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return retry_after
+
+        ceiling = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+
+        return random.uniform(0, ceiling)  # nosec
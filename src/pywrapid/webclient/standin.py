@@ -0,0 +1,278 @@
+#!/usr/bin/python3
+"""
+pywrapid web client stand-in server
+
+Local HTTP server standing in for an authenticated API: a login endpoint, an OAuth2
+token endpoint with refresh token grants and data endpoints requiring a JWT bearer
+token. Meant for tests and benchmarks of clients without network access.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import base64
+import json
+import logging
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep, time
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+
+log = logging.getLogger(__name__)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Request handler of the stand-in server"""
+
+    protocol_version = "HTTP/1.1"
+    server: "_StandInHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        log.debug("Stand-in %s - %s", self.address_string(), format % args)
+
+    def _respond(self, status: int, document: Any, headers: Optional[dict] = None) -> None:
+        """Send a json response"""
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _form(self) -> dict:
+        """Form or json request body fields"""
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if not body:
+            return {}
+        if "json" in self.headers.get("Content-Type", ""):
+            try:
+                document = json.loads(body)
+            except ValueError:
+                return {}
+            return document if isinstance(document, dict) else {}
+
+        return {name: values[0] for name, values in parse_qs(body.decode()).items()}
+
+    def _handle(self) -> None:
+        stand_in = self.server.stand_in
+        path = urlparse(self.path).path
+        fields = self._form()
+        if stand_in.latency:
+            sleep(stand_in.latency)
+
+        if path in (stand_in.login_path, stand_in.token_path) and self.command == "POST":
+            status, document = stand_in.authenticate(
+                fields, self.headers.get("Authorization", ""), path == stand_in.token_path
+            )
+            headers = (
+                {"Authorization": f"Bearer {document['access_token']}"} if status == 200 else None
+            )
+            self._respond(status, document, headers)
+            return
+
+        if not stand_in.authorized(self.headers.get("Authorization", "")):
+            self._respond(401, {"error": "invalid_token"}, {"WWW-Authenticate": "Bearer"})
+            return
+
+        self._respond(200, stand_in.payload(self.command, self.path))
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    """Threading HTTP server with a reference to its stand-in"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, stand_in: "StandInServer") -> None:
+        self.stand_in = stand_in
+        super().__init__(address, _StandInHandler)
+
+
+class StandInServer:  # pylint: disable=too-many-instance-attributes
+    """Local stand-in server for authenticated APIs
+
+    POST login_path authenticates with basic auth or username and password form or
+    json fields and POST token_path also takes the refresh_token grant. Both answer
+    with a JWT access token in the Authorization header and an OAuth2 token response
+    body (access_token, expires_in and refresh_token), which covers the BASIC, JWT and
+    OAUTH2 authorization types of the WebClient. Every other path requires a valid
+    bearer token and answers with payload, or with the method and path when no payload
+    is set. Without a username any credentials are accepted. Refresh tokens are single
+    use and revoke() invalidates every token issued so far.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        username: str = "",
+        password: str = "",
+        token_ttl: float = 3600,
+        latency: float = 0,
+        payload: Any = None,
+        login_path: str = "/login",
+        token_path: str = "/token",
+    ) -> None:
+        """Init function for the stand-in server
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, 0 for any free port. Defaults to 0.
+            username (str, optional): Accepted username, empty accepts any credentials
+            password (str, optional): Accepted password
+            token_ttl (float, optional): Access token lifetime in seconds. Defaults to 3600.
+            latency (float, optional): Seconds every response is delayed. Defaults to 0.
+            payload (Any, optional): Json document returned by data endpoints
+            login_path (str, optional): Login endpoint path. Defaults to "/login".
+            token_path (str, optional): Token endpoint path. Defaults to "/token".
+        """
+        self.username = username
+        self.password = password
+        self.token_ttl = token_ttl
+        self.latency = latency
+        self.login_path = login_path
+        self.token_path = token_path
+        self._payload = payload
+        self._secret = secrets.token_hex(32)
+        self._generation = 0
+        self._refresh_tokens: set = set()
+        self._lock = threading.Lock()
+        self._stats = {"logins": 0, "refreshes": 0, "requests": 0, "rejected": 0}
+        self._server = _StandInHTTPServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def stats(self) -> dict:
+        """Logins, refresh token grants, authorized requests and rejected requests"""
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> None:
+        """Serve requests in a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="pywrapid-stand-in", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def revoke(self) -> None:
+        """Invalidate all access and refresh tokens issued so far"""
+        with self._lock:
+            self._generation += 1
+            self._refresh_tokens.clear()
+
+    def _valid_credentials(self, fields: dict, authorization: str) -> bool:
+        """Check basic auth or form credentials against the configured user"""
+        if not self.username:
+            return True
+        if authorization.startswith("Basic "):
+            try:
+                decoded = base64.b64decode(authorization[len("Basic ") :]).decode()
+            except ValueError:
+                return False
+            return decoded == f"{self.username}:{self.password}"
+
+        return fields.get("username") == self.username and fields.get("password") == self.password
+
+    def _issue(self, subject: str) -> dict:
+        """Issue an access and refresh token, caller must hold the lock"""
+        access_token = jwt.encode(
+            {
+                "sub": subject,
+                "exp": int(time() + self.token_ttl),
+                "gen": self._generation,
+                "jti": secrets.token_hex(8),
+            },
+            self._secret,
+            algorithm="HS256",
+        )
+        refresh_token = secrets.token_urlsafe(24)
+        self._refresh_tokens.add(refresh_token)
+
+        return {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": self.token_ttl,
+            "refresh_token": refresh_token,
+        }
+
+    def authenticate(self, fields: dict, authorization: str, token_endpoint: bool) -> tuple:
+        """Answer a login or token request
+
+        Args:
+            fields (dict): Form or json body fields
+            authorization (str): Authorization request header
+            token_endpoint (bool): Request to the token endpoint
+
+        Returns:
+            tuple: Status code and response document
+        """
+        with self._lock:
+            if token_endpoint and fields.get("grant_type") == "refresh_token":
+                if fields.get("refresh_token") not in self._refresh_tokens:
+                    return 400, {"error": "invalid_grant"}
+                self._refresh_tokens.discard(fields["refresh_token"])
+                self._stats["refreshes"] += 1
+                return 200, self._issue(fields.get("username", self.username))
+
+            if not self._valid_credentials(fields, authorization):
+                self._stats["rejected"] += 1
+                return 401, {"error": "invalid_client"}
+            self._stats["logins"] += 1
+
+            return 200, self._issue(fields.get("username", self.username))
+
+    def authorized(self, authorization: str) -> bool:
+        """Check the bearer token of a data request, counting the outcome"""
+        token = authorization[len("Bearer ") :] if authorization.startswith("Bearer ") else ""
+        try:
+            claims = jwt.decode(token, self._secret, algorithms=["HS256"]) if token else {}
+        except jwt.InvalidTokenError:
+            claims = {}
+        with self._lock:
+            valid = claims.get("gen") == self._generation
+            self._stats["requests" if valid else "rejected"] += 1
+
+        return valid
+
+    def payload(self, method: str, path: str) -> Any:
+        """Document returned by a data endpoint"""
+        if self._payload is not None:
+            return self._payload
+
+        return {"method": method, "path": path}
@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+"""
+pywrapid web client TLS contexts
+
+SSLContexts per client certificate set, loaded once and shared by pooled connections,
+resuming TLS sessions and reloaded when the certificate, key or CA files change.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import logging
+import os
+import ssl
+import threading
+import weakref
+from time import monotonic
+from typing import Any, Optional
+
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class _ResumableSocket(ssl.SSLSocket):  # pylint: disable=abstract-method
+    """SSLSocket handing its TLS session to its context when closed
+
+    TLS 1.3 session tickets arrive after the handshake, the session is taken again on
+    close so the next connection can resume it. close() always runs before the TLS
+    connection is shut down, also when files made by makefile() keep it open. dup()
+    and the msg methods stay unsupported as on every SSLSocket.
+    """
+
+    def close(self) -> None:
+        """Close the socket, handing its TLS session to the context first"""
+        if isinstance(self.context, ResumingSSLContext):
+            self.context.remember(self)
+        super().close()
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """Client SSLContext resuming TLS sessions
+
+    The last session per server hostname is offered when a new connection is wrapped,
+    letting the server skip the full, certificate exchanging handshake.
+    """
+
+    sslsocket_class = _ResumableSocket
+
+    def __init__(  # pylint: disable=unused-argument
+        self, protocol: int = ssl.PROTOCOL_TLS_CLIENT
+    ) -> None:
+        # The protocol is taken by ssl.SSLContext.__new__
+        super().__init__()
+        self._sessions: dict = {}
+        self._session_lock = threading.Lock()
+
+    def remember(self, tls: Any) -> None:
+        """Keep the session of a TLS socket or object for its server hostname
+
+        Args:
+            tls (Any): ssl.SSLSocket or ssl.SSLObject
+        """
+        if not tls.server_hostname:
+            return
+        # asyncio SSLObjects have no close to take the session on, the latest one is kept
+        reference = tls if isinstance(tls, ssl.SSLObject) else weakref.ref(tls)
+        with self._session_lock:
+            _, session = self._sessions.get(tls.server_hostname, (None, None))
+            self._sessions[tls.server_hostname] = (reference, tls.session or session)
+
+    def session(self, server_hostname: str) -> Optional[ssl.SSLSession]:
+        """Latest session for a server hostname, None if there is none to resume"""
+        with self._session_lock:
+            reference, session = self._sessions.get(server_hostname, (None, None))
+        tls = reference() if isinstance(reference, weakref.ref) else reference
+        if tls is not None and tls.session is not None:
+            session = tls.session
+
+        return session
+
+    def wrap_socket(  # type: ignore[override]  # pylint: disable=too-many-arguments
+        self,
+        sock: Any,
+        server_side: bool = False,
+        do_handshake_on_connect: bool = True,
+        suppress_ragged_eofs: bool = True,
+        server_hostname: Optional[str] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLSocket:
+        if session is None and not server_side and server_hostname:
+            session = self.session(server_hostname)
+        tls = super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        self.remember(tls)
+
+        return tls
+
+    def wrap_bio(  # type: ignore[override]  # pylint: disable=too-many-arguments
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: Optional[str] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLObject:
+        if session is None and not server_side and server_hostname:
+            session = self.session(server_hostname)
+        tls = super().wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        self.remember(tls)
+
+        return tls
+
+
+def create_tls_context(cert: Any = None, verify: Any = True) -> ResumingSSLContext:
+    """Create a client SSLContext for requests style cert and verify options
+
+    Args:
+        cert (Any, optional): Client certificate file, or certificate and key file tuple
+        verify (Any, optional): Verify the server certificate against the default CA
+            bundle, a CA bundle file or directory, or not at all. Defaults to True.
+
+    Raises:
+        OSError
+        ssl.SSLError
+
+    Returns:
+        ResumingSSLContext: SSLContext with the CA and client certificate loaded
+    """
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if verify is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str) and os.path.isdir(verify):
+        context.load_verify_locations(capath=verify)
+    else:
+        context.load_verify_locations(
+            cafile=verify if isinstance(verify, str) else DEFAULT_CA_BUNDLE_PATH
+        )
+    if cert:
+        certfile, keyfile = cert if isinstance(cert, (tuple, list)) else (cert, None)
+        context.load_cert_chain(certfile, keyfile)
+
+    return context
+
+
+class _CachedContext:  # pylint: disable=too-few-public-methods
+    """SSLContext with the modification times of its files"""
+
+    def __init__(self, context: ResumingSSLContext, mtimes: tuple, checked: float) -> None:
+        self.context = context
+        self.mtimes = mtimes
+        self.checked = checked
+
+
+class SSLContextCache:  # pylint: disable=too-few-public-methods
+    """SSLContexts per cert and verify combination
+
+    The certificate chain is parsed once per context instead of once per connection.
+    File modification times are checked at most every check_interval seconds, a changed
+    certificate, key or CA file gives a new context for new connections.
+    """
+
+    def __init__(self, check_interval: float = DEFAULT_CHECK_INTERVAL) -> None:
+        """Init function for the SSLContext cache
+
+        Args:
+            check_interval (float, optional): Seconds between file modification checks.
+                Defaults to 1.
+        """
+        self.check_interval = check_interval
+        self._contexts: dict = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _mtimes(cert: Any, verify: Any) -> tuple:
+        """Modification times of the files of a context"""
+        files = list(cert) if isinstance(cert, (tuple, list)) else [cert]
+        if isinstance(verify, str):
+            files.append(verify)
+
+        return tuple(os.stat(file).st_mtime_ns for file in files if file)
+
+    def get(self, cert: Any = None, verify: Any = True) -> ResumingSSLContext:
+        """SSLContext for requests style cert and verify options
+
+        Args:
+            cert (Any, optional): Client certificate file, or certificate and key file tuple
+            verify (Any, optional): True, False or a CA bundle file or directory.
+                Defaults to True.
+
+        Raises:
+            OSError
+            ssl.SSLError
+
+        Returns:
+            ResumingSSLContext: Shared SSLContext
+        """
+        key = (tuple(cert) if isinstance(cert, list) else cert, verify)
+        now = monotonic()
+        with self._lock:
+            cached = self._contexts.get(key)
+            if cached and now < cached.checked + self.check_interval:
+                return cached.context
+
+        mtimes = self._mtimes(cert, verify)
+        with self._lock:
+            cached = self._contexts.get(key)
+            if cached and cached.mtimes == mtimes:
+                cached.checked = now
+                return cached.context
+
+            if cached:
+                log.info("Reloading TLS context after file changes for %s", cert)
+            self._contexts[key] = _CachedContext(create_tls_context(cert, verify), mtimes, now)
+
+            return self._contexts[key].context
@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+"""
+pywrapid web client token stores
+
+Token stores let multiple clients, threads or processes using the same credentials
+share one valid token instead of authenticating on their own.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import errno
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from time import monotonic, sleep
+from typing import ContextManager, Iterator, Optional
+
+from pywrapid.utils import is_directory_writable
+
+from .deadline import hold
+from .exceptions import ClientError, ClientTimeout
+from .keys import token_store_key  # noqa: F401 pylint: disable=unused-import
+
+if sys.platform == "win32":  # pragma: no cover
+    # Imported by name, linters on other platforms can not resolve the module
+    msvcrt = importlib.import_module("msvcrt")
+else:
+    import fcntl
+
+log = logging.getLogger(__name__)
+
+# Seconds between attempts to take a file lock held by another process
+LOCK_POLL_INTERVAL = 0.01
+
+
+def _try_lock_file(file_descriptor: int) -> bool:
+    """Take an exclusive lock on an open file if it is available"""
+    try:
+        if sys.platform == "win32":  # pragma: no cover
+            msvcrt.locking(file_descriptor, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+
+    return True
+
+
+def _lock_file(file_descriptor: int, timeout: Optional[float] = None) -> bool:
+    """Take an exclusive lock on an open file
+
+    Args:
+        file_descriptor (int): Open file
+        timeout (float, optional): Seconds to wait for the lock, None waits indefinitely
+
+    Returns:
+        bool: True if the lock was taken
+    """
+    if timeout is None and sys.platform == "win32":  # pragma: no cover
+        while True:
+            try:
+                msvcrt.locking(file_descriptor, msvcrt.LK_LOCK, 1)
+                return True
+            except OSError as error:
+                # LK_LOCK gives up after 10 attempts a second apart, keep waiting
+                if error.errno != errno.EDEADLOCK:
+                    raise
+    if timeout is None:
+        fcntl.flock(file_descriptor, fcntl.LOCK_EX)
+        return True
+
+    expires = monotonic() + timeout
+    while not _try_lock_file(file_descriptor):
+        if monotonic() >= expires:
+            return False
+        sleep(min(LOCK_POLL_INTERVAL, max(0.0, expires - monotonic())))
+
+    return True
+
+
+def _unlock_file(file_descriptor: int) -> None:
+    """Release a lock taken with _lock_file"""
+    if sys.platform == "win32":  # pragma: no cover
+        os.lseek(file_descriptor, 0, os.SEEK_SET)
+        msvcrt.locking(file_descriptor, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file_descriptor, fcntl.LOCK_UN)
+
+
+class TokenStore(ABC):
+    """Token store base class
+
+    Stores token data dicts by key and provides a lock per key that is held while a
+    client renews the token, so only one holder authenticates at a time.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Get stored token data
+
+        Args:
+            key (str): Token store key
+
+        Returns:
+            dict|None: Token data or None if nothing is stored
+        """
+
+    @abstractmethod
+    def set(self, key: str, tokens: dict) -> None:
+        """Store token data
+
+        Args:
+            key (str): Token store key
+            tokens (dict): Token data
+        """
+
+    @abstractmethod
+    def lock(self, key: str, timeout: Optional[float] = None) -> ContextManager[None]:
+        """Hold the renewal lock for a key
+
+        Args:
+            key (str): Token store key
+            timeout (float, optional): Seconds to wait for the lock, None waits
+                indefinitely
+
+        Raises:
+            ClientTimeout: Lock not acquired within timeout
+
+        Returns:
+            ContextManager: Context holding the lock
+        """
+
+
+class MemoryTokenStore(TokenStore):
+    """In-memory token store
+
+    Shares tokens between clients and threads in one process using the same store instance.
+    """
+
+    def __init__(self) -> None:
+        self._tokens: dict = {}
+        self._locks: dict = {}
+        self._locks_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        tokens = self._tokens.get(key)
+        return dict(tokens) if tokens else None
+
+    def set(self, key: str, tokens: dict) -> None:
+        self._tokens[key] = dict(tokens)
+
+    @contextmanager
+    def lock(self, key: str, timeout: Optional[float] = None) -> Iterator[None]:
+        with self._locks_lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with hold(key_lock, timeout, f"Token store lock not acquired within {timeout}s"):
+            yield
+
+
+class FileTokenStore(TokenStore):
+    """File based token store
+
+    Shares tokens between processes on one host. Each key is stored as a json file
+    readable only by the owner, renewal is serialized with an exclusive file lock.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Init function for file token store
+
+        Args:
+            path (str): Directory to store token files in, created if missing
+
+        Raises:
+            ClientError
+        """
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        if not is_directory_writable(path):
+            raise ClientError(f"Token store directory is not writable: {path}")
+        self.path = path
+
+    def _file(self, key: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{key}.{suffix}")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._file(key, "json"), encoding="utf-8") as token_file:
+                return dict(json.load(token_file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            log.warning("Unable to read token store file for %s: %s", key, error)
+            return None
+
+    def set(self, key: str, tokens: dict) -> None:
+        temp_file = self._file(key, f"{os.getpid()}.{threading.get_ident()}.tmp")
+        file_descriptor = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as token_file:
+            json.dump(tokens, token_file)
+        os.replace(temp_file, self._file(key, "json"))
+
+    @contextmanager
+    def lock(self, key: str, timeout: Optional[float] = None) -> Iterator[None]:
+        file_descriptor = os.open(self._file(key, "lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if not _lock_file(file_descriptor, timeout):
+                raise ClientTimeout(f"Token store lock not acquired within {timeout}s")
+            try:
+                yield
+            finally:
+                _unlock_file(file_descriptor)
+        finally:
+            os.close(file_descriptor)
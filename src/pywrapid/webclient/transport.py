@@ -0,0 +1,677 @@
+#!/usr/bin/python3
+"""
+pywrapid web client transports
+
+Transport backends for the WebClient. The default requests backend is a pooled
+requests Session, httpx (with optional HTTP/2 multiplexing) and aiohttp backends take
+the same request options and return requests responses raising requests exceptions,
+so responses and error mapping are the same whichever backend is used.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from http.cookiejar import DefaultCookiePolicy
+from http.cookies import CookieError, SimpleCookie
+from time import monotonic
+from typing import Any, AsyncIterator, Iterable, Optional, Union
+
+from requests import ConnectionError as RequestsConnectionError
+from requests import (
+    ConnectTimeout,
+    PreparedRequest,
+    ReadTimeout,
+    RequestException,
+    Response,
+    Session,
+    TooManyRedirects,
+)
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from requests.exceptions import InvalidURL
+from requests.hooks import dispatch_hook
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, super_len
+
+from pywrapid.utils.exceptions import DependencyError
+
+from .exceptions import ClientError
+from .tls import ResumingSSLContext, SSLContextCache
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+TRANSPORTS = ("requests", "httpx", "aiohttp")
+
+
+class Transport(ABC):
+    """Transport backend base
+
+    A transport sends requests taking requests style options (params, data, json,
+    headers, cookies, files, auth, timeout, allow_redirects, hooks, stream, verify
+    and cert) and returns requests.Response objects. Failures are raised as requests
+    exceptions so the client maps them the same way for every backend.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def request(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        data: Any = None,
+        headers: Optional[dict] = None,
+        cookies: Any = None,
+        files: Any = None,
+        auth: Any = None,
+        timeout: Any = None,
+        allow_redirects: bool = True,
+        proxies: Any = None,
+        hooks: Any = None,
+        stream: bool = False,
+        verify: Any = True,
+        cert: Any = None,
+        json: Any = None,
+    ) -> Response:
+        """Send a request, options are the same as for requests.Session.request()
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+
+        Raises:
+            RequestException
+
+        Returns:
+            Response: requests.Response object
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release pooled connections"""
+
+
+class ClientCertAdapter(HTTPAdapter):
+    """HTTPAdapter using shared SSLContexts for client certificate requests
+
+    requests hands certificate and CA paths to urllib3, which loads them into a new
+    context for every connection. Here HTTPS requests with a client certificate get a
+    pool per cached SSLContext with the chain loaded once and TLS session resumption.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.tls_contexts = SSLContextCache()
+        super().__init__(*args, **kwargs)
+
+    def build_connection_pool_key_attributes(
+        self, request: PreparedRequest, verify: Any, cert: Any = None
+    ) -> Any:
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(
+            request, verify, cert
+        )
+        if cert and host_params["scheme"] == "https":
+            pool_kwargs = {
+                "cert_reqs": pool_kwargs["cert_reqs"],
+                "ssl_context": self.tls_contexts.get(cert, verify),
+            }
+
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn: Any, url: str, verify: Any, cert: Any) -> None:
+        if isinstance(getattr(conn, "conn_kw", {}).get("ssl_context"), ResumingSSLContext):
+            # CA and client certificate are already loaded in the pools context
+            conn.cert_reqs = "CERT_REQUIRED" if verify else "CERT_NONE"
+            return
+
+        super().cert_verify(conn, url, verify, cert)
+
+
+def cookieless_policy() -> DefaultCookiePolicy:
+    """Cookie policy of pooled clients, keeping no cookies set by responses
+
+    Every call sends only the cookies passed to it, as with a new connection per call,
+    so cookies never carry over between calls, threads or per-call credentials.
+    Responses still carry their cookies.
+    """
+    return DefaultCookiePolicy(allowed_domains=[])
+
+
+def create_transport(client_options: dict) -> Union[Session, Transport]:
+    """Create the transport selected by the transport client option
+
+    Args:
+        client_options (dict): client_options configuration
+
+    Raises:
+        ClientError
+        DependencyError
+
+    Returns:
+        Session|Transport: Pooled requests Session or transport backend
+    """
+    name = client_options.get("transport", "requests")
+    pool_maxsize = client_options.get("pool_maxsize", DEFAULT_POOLSIZE)
+    if name == "requests":
+        adapter = ClientCertAdapter(
+            pool_connections=client_options.get("pool_connections", DEFAULT_POOLSIZE),
+            pool_maxsize=pool_maxsize,
+            pool_block=client_options.get("pool_block", DEFAULT_POOLBLOCK),
+        )
+        session = Session()
+        session.cookies.set_policy(cookieless_policy())
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    if name == "httpx":
+        return HttpxTransport(pool_maxsize, http2=client_options.get("http2", False))
+    if name == "aiohttp":
+        return AiohttpTransport(pool_maxsize)
+
+    raise ClientError(f"Unknown transport {name}, expected one of {', '.join(TRANSPORTS)}")
+
+
+def _set_cookies(response: Response, header: str) -> None:
+    """Add the cookies of a Set-Cookie header to a response"""
+    cookies: SimpleCookie = SimpleCookie()
+    try:
+        cookies.load(header)
+    except CookieError as error:
+        log.debug("Ignoring invalid Set-Cookie header %s: %s", header, error)
+        return
+    for morsel in cookies.values():
+        response.cookies.set(
+            morsel.key, morsel.value, domain=morsel["domain"], path=morsel["path"] or "/"
+        )
+
+
+def build_response(  # pylint: disable=too-many-arguments
+    request: PreparedRequest,
+    status_code: int,
+    headers: Iterable[tuple],
+    url: str,
+    reason: str,
+    elapsed: float,
+    content: Optional[bytes] = None,
+    raw: Any = None,
+) -> Response:
+    """Build a requests response from the response of another backend
+
+    Args:
+        request (PreparedRequest): Request the response belongs to
+        status_code (int): Response status code
+        headers (Iterable[tuple]): Response header name and value pairs
+        url (str): Final URL after redirects
+        reason (str): Status reason phrase
+        elapsed (float): Seconds until the response headers were received
+        content (bytes, optional): Complete (decoded) body
+        raw (Any, optional): File like object with read(amt) and close() for streaming
+
+    Returns:
+        Response: requests.Response object
+    """
+    response = Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict()
+    for name, value in headers:
+        if name in response.headers:
+            response.headers[name] = f"{response.headers[name]}, {value}"
+        else:
+            response.headers[name] = value
+        if name.lower() == "set-cookie":
+            _set_cookies(response, value)
+    response.url = url
+    response.reason = reason
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.elapsed = timedelta(seconds=elapsed)
+    response.request = request
+    response.raw = raw
+    if content is not None:
+        response._content = content  # pylint: disable=protected-access
+        # pylint: disable-next=protected-access
+        response._content_consumed = True  # type: ignore[attr-defined]
+
+    return response
+
+
+def prepared_request(method: str, url: str, headers: Optional[dict], body: Any) -> PreparedRequest:
+    """Request description attached to responses of other backends"""
+    request = PreparedRequest()
+    request.method = method.upper()
+    request.url = url
+    request.headers = CaseInsensitiveDict(headers or {})
+    request.body = body if isinstance(body, (bytes, str)) else None
+
+    return request
+
+
+def _split_timeout(timeout: Any) -> tuple:
+    """Connect and read timeout from a requests timeout value"""
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+def _form_data(data: Any) -> Any:
+    """Form fields as a dict, multiple values for a name as a list"""
+    if isinstance(data, dict) or data is None:
+        return data
+    fields: dict = {}
+    for name, value in data:
+        fields.setdefault(name, []).append(value)
+
+    return {name: values[0] if len(values) == 1 else values for name, values in fields.items()}
+
+
+def _length_header(headers: Optional[dict], body: Any) -> Optional[dict]:
+    """Add Content-Length for streamed bodies of known length, like requests does
+
+    Other backends send iterables with chunked transfer encoding otherwise.
+    """
+    if body is None or isinstance(body, (bytes, str)):
+        return headers
+    length = super_len(body)
+    if not length or "content-length" in (name.lower() for name in headers or {}):
+        return headers
+
+    return {**(headers or {}), "Content-Length": str(length)}
+
+
+def _is_form(data: Any) -> bool:
+    return isinstance(data, dict) or (isinstance(data, list) and bool(data))
+
+
+class _HttpxRaw:
+    """Streamed httpx response body read like a urllib3 response"""
+
+    def __init__(self, response: "httpx.Response") -> None:
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+
+    def read(self, amt: Optional[int] = None, **_kwargs: Any) -> bytes:
+        """Read up to amt bytes, all that is left when amt is None"""
+        try:
+            while amt is None or len(self._buffer) < amt:
+                self._buffer += next(self._chunks)
+        except StopIteration:
+            pass
+        except httpx.HTTPError as error:
+            raise HttpxTransport.map_error(error) from error
+        amt = len(self._buffer) if amt is None else amt
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+
+        return data
+
+    def close(self) -> None:
+        """Close the response, releasing its connection"""
+        self._response.close()
+
+
+class HttpxTransport(Transport):
+    """httpx transport backend
+
+    Uses a pooled httpx.Client, with HTTP/2 many concurrent requests to an origin are
+    multiplexed over a single connection. httpx takes TLS settings per client, so a
+    client is kept per verify and cert combination used in requests. Client certificate
+    clients use a cached SSLContext and are replaced when the certificate files change.
+    """
+
+    name = "httpx"
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOLSIZE, http2: bool = False) -> None:
+        """Init function for the httpx transport
+
+        Args:
+            pool_maxsize (int, optional): Connections kept per client. Defaults to 10.
+            http2 (bool, optional): Negotiate HTTP/2. Defaults to False.
+
+        Raises:
+            DependencyError
+        """
+        if httpx is None:
+            raise DependencyError("httpx transport requires httpx, install pywrapid[httpx]")
+        if http2:
+            try:
+                import h2  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+            except ImportError as error:
+                raise DependencyError(
+                    "HTTP/2 requires the h2 package, install pywrapid[http2]"
+                ) from error
+
+        self.http2 = http2
+        self._limits = httpx.Limits(
+            max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize
+        )
+        self._clients: dict = {}
+        self._replaced: list = []
+        self._tls_contexts = SSLContextCache()
+        self._lock = threading.Lock()
+
+    def _client(self, verify: Any, cert: Any) -> "httpx.Client":
+        """Client for a TLS configuration"""
+        key = (verify, cert)
+        context = self._tls_contexts.get(cert, verify) if cert else verify
+        with self._lock:
+            client_context, client = self._clients.get(key, (None, None))
+            if client is not None and client_context is not context:
+                # Closed with the transport, responses may still be streaming
+                self._replaced.append(client)
+                client = None
+            if client is None:
+                client = httpx.Client(limits=self._limits, http2=self.http2, verify=context)
+                client.cookies.jar.set_policy(cookieless_policy())
+                self._clients[key] = (context, client)
+            return client
+
+    @staticmethod
+    def map_error(error: Exception) -> RequestException:
+        """Map an httpx exception to the matching requests exception"""
+        if isinstance(error, httpx.TimeoutException):
+            if isinstance(error, httpx.ConnectTimeout):
+                return ConnectTimeout(error)
+            return ReadTimeout(error)
+        if isinstance(error, httpx.TooManyRedirects):
+            return TooManyRedirects(error)
+        if isinstance(error, httpx.UnsupportedProtocol):
+            return InvalidURL(error)
+        if isinstance(error, (httpx.NetworkError, httpx.RemoteProtocolError)):
+            return RequestsConnectionError(error)
+
+        return RequestException(error)
+
+    def request(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        data: Any = None,
+        headers: Optional[dict] = None,
+        cookies: Any = None,
+        files: Any = None,
+        auth: Any = None,
+        timeout: Any = None,
+        allow_redirects: bool = True,
+        proxies: Any = None,
+        hooks: Any = None,
+        stream: bool = False,
+        verify: Any = True,
+        cert: Any = None,
+        json: Any = None,
+    ) -> Response:
+        if proxies:
+            log.warning("Per request proxies are not supported by the httpx transport")
+        connect, read = _split_timeout(timeout)
+        client = self._client(verify, cert)
+        content = None if _is_form(data) else data
+        headers = _length_header(headers, content)
+        started = monotonic()
+        try:
+            request = client.build_request(
+                method,
+                url,
+                params=params,
+                data=_form_data(data) if _is_form(data) else None,
+                content=content,
+                files=files,
+                json=json,
+                headers=headers,
+                cookies=cookies,
+                timeout=httpx.Timeout(read, connect=connect),
+            )
+            response = client.send(
+                request, auth=auth, follow_redirects=allow_redirects, stream=True
+            )
+        except httpx.HTTPError as error:
+            raise self.map_error(error) from error
+        elapsed = monotonic() - started
+
+        body = None
+        if not stream:
+            try:
+                body = response.read()
+            except httpx.HTTPError as error:
+                raise self.map_error(error) from error
+            finally:
+                response.close()
+
+        result = build_response(
+            prepared_request(method, str(request.url), dict(request.headers), content),
+            response.status_code,
+            response.headers.multi_items(),
+            str(response.url),
+            response.reason_phrase,
+            elapsed,
+            content=body,
+            raw=_HttpxRaw(response) if stream else None,
+        )
+
+        return dispatch_hook("response", hooks or {}, result)
+
+    def close(self) -> None:
+        with self._lock:
+            clients = [client for _, client in self._clients.values()] + self._replaced
+            self._clients, self._replaced = {}, []
+        for client in clients:
+            client.close()
+
+
+class _AiohttpRaw:
+    """Streamed aiohttp response body read like a urllib3 response"""
+
+    def __init__(self, transport: "AiohttpTransport", response: "aiohttp.ClientResponse") -> None:
+        self._transport = transport
+        self._response = response
+
+    def read(self, amt: Optional[int] = None, **_kwargs: Any) -> bytes:
+        """Read up to amt bytes, all that is left when amt is None"""
+        try:
+            return self._transport.run(self._response.content.read(-1 if amt is None else amt))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise AiohttpTransport.map_error(error) from error
+
+    def close(self) -> None:
+        """Release the response connection on the transport event loop"""
+        self._transport.loop.call_soon_threadsafe(self._response.release)
+
+
+async def _chunks(iterable: Iterable) -> AsyncIterator[bytes]:
+    """Feed a blocking iterable, such as an UploadBody, to aiohttp"""
+    for chunk in iterable:
+        yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+class AiohttpTransport(Transport):
+    """aiohttp transport backend
+
+    Runs an aiohttp session on an event loop in a background thread, blocking callers
+    wait for their requests to complete on that loop.
+    """
+
+    name = "aiohttp"
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOLSIZE) -> None:
+        """Init function for the aiohttp transport
+
+        Args:
+            pool_maxsize (int, optional): Connections kept per host. Defaults to 10.
+
+        Raises:
+            DependencyError
+        """
+        if aiohttp is None:
+            raise DependencyError("aiohttp transport requires aiohttp, install pywrapid[aiohttp]")
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="pywrapid-aiohttp", daemon=True
+        )
+        self._thread.start()
+        self._tls_contexts = SSLContextCache()
+        self._session = self.run(self._create_session(pool_maxsize))
+
+    @staticmethod
+    async def _create_session(pool_maxsize: int) -> "aiohttp.ClientSession":
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=pool_maxsize),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            auto_decompress=True,
+        )
+
+    def run(self, coroutine: Any) -> Any:
+        """Run a coroutine on the transport event loop and wait for the result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def _ssl(self, verify: Any, cert: Any) -> Any:
+        """aiohttp ssl argument for requests style verify and cert options"""
+        if verify is False:
+            return False
+        if verify is True and not cert:
+            return True
+
+        return self._tls_contexts.get(cert, verify)
+
+    @staticmethod
+    def _auth(auth: Any) -> Any:
+        """aiohttp auth argument for requests style basic auth
+
+        Raises:
+            RequestException
+        """
+        if isinstance(auth, HTTPBasicAuth):
+            username, password = (
+                value.decode() if isinstance(value, bytes) else value
+                for value in (auth.username, auth.password)
+            )
+            return aiohttp.BasicAuth(username, password)
+        if isinstance(auth, tuple):
+            return aiohttp.BasicAuth(*auth)
+        if auth is not None:
+            raise RequestException(f"Unsupported auth {type(auth).__name__} for aiohttp transport")
+
+        return None
+
+    @staticmethod
+    def map_error(error: Exception) -> RequestException:
+        """Map an aiohttp exception to the matching requests exception"""
+        if isinstance(error, getattr(aiohttp, "ConnectionTimeoutError", ())):
+            return ConnectTimeout(error)
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ServerTimeoutError)):
+            return ReadTimeout(error)
+        if isinstance(error, aiohttp.TooManyRedirects):
+            return TooManyRedirects(error)
+        if isinstance(error, aiohttp.InvalidURL):
+            return InvalidURL(error)
+        if isinstance(error, aiohttp.ClientConnectionError):
+            return RequestsConnectionError(error)
+
+        return RequestException(error)
+
+    async def _send(  # pylint: disable=too-many-arguments
+        self, method: str, url: str, stream: bool, options: dict
+    ) -> tuple:
+        started = monotonic()
+        response = await self._session.request(method, url, **options)
+        elapsed = monotonic() - started
+        if stream:
+            return response, elapsed, None
+        try:
+            return response, elapsed, await response.read()
+        finally:
+            response.release()
+
+    def request(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        data: Any = None,
+        headers: Optional[dict] = None,
+        cookies: Any = None,
+        files: Any = None,
+        auth: Any = None,
+        timeout: Any = None,
+        allow_redirects: bool = True,
+        proxies: Any = None,
+        hooks: Any = None,
+        stream: bool = False,
+        verify: Any = True,
+        cert: Any = None,
+        json: Any = None,
+    ) -> Response:
+        if proxies:
+            log.warning("Per request proxies are not supported by the aiohttp transport")
+        connect, read = _split_timeout(timeout)
+        body = data
+        if files:
+            body = aiohttp.FormData(_form_data(data) or {})
+            for name, value in files.items():
+                filename, fileobj, *content_type = (
+                    value if isinstance(value, tuple) else (name, value)
+                )
+                body.add_field(
+                    name, fileobj, filename=filename, content_type=(content_type or [None])[0]
+                )
+        elif _is_form(data):
+            body = _form_data(data)
+        elif data is not None and not isinstance(data, (bytes, str)):
+            headers = _length_header(headers, data)
+            if not hasattr(data, "read"):
+                body = _chunks(data)
+        options = {
+            "params": params,
+            "data": body,
+            "json": json,
+            "headers": headers,
+            "cookies": cookies,
+            "auth": self._auth(auth),
+            "allow_redirects": allow_redirects,
+            "ssl": self._ssl(verify, cert),
+            "timeout": aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read),
+        }
+        try:
+            response, elapsed, content = self.run(self._send(method, url, stream, options))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise self.map_error(error) from error
+
+        result = build_response(
+            prepared_request(method, str(response.url), headers, data),
+            response.status,
+            response.headers.items(),
+            str(response.url),
+            response.reason or "",
+            elapsed,
+            content=content,
+            raw=_AiohttpRaw(self, response) if stream else None,
+        )
+
+        return dispatch_hook("response", hooks or {}, result)
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.run(self._session.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+"""
+pywrapid web client streaming uploads
+
+Request bodies read in chunks from bytes, memory-mapped files, file objects or
+generators, and multipart/form-data bodies streaming their parts.
+"""
+# __author__ = "Jonas Werme"
+# __copyright__ = "Copyright (c) 2021 Jonas Werme"
+# __credits__ = ["nsahq"]
+# __license__ = "MIT"
+# __version__ = "0.1.0"
+# __maintainer__ = "Jonas Werme"
+# __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
+# __status__ = "Prototype"
+
+
+import io
+import logging
+import mimetypes
+import os
+import uuid
+from typing import Any, Iterator, Optional, Union
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class UploadBody:
+    """Streamed request body
+
+    Passed as data to WebClient.call() the body is sent in chunks of chunk_size. Bodies
+    of known length are sent with a Content-Length header, others with chunked
+    transfer encoding. Bytes, memory-mapped files and seekable file objects are
+    rewound when a request is retried, generators can only be sent once.
+    """
+
+    def __init__(
+        self, source: Any, length: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        """Init function for upload body
+
+        Args:
+            source (Any): bytes, mmap, binary file object or iterable of bytes
+            length (int, optional): Body length in bytes. Defaults to the length of
+                bytes, mmap and seekable files, unknown for generators.
+            chunk_size (int, optional): Bytes read per chunk. Defaults to 64 KiB.
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.length = length
+        self._buffer = _buffer_size(source)
+        self._start: Optional[int] = None
+        self._sent = False
+
+        if self._buffer is not None:
+            self.length = self._buffer if length is None else length
+        elif hasattr(source, "read"):
+            self._start = _tell(source)
+            if length is None and self._start is not None:
+                self.length = _file_size(source) - self._start
+
+    @property
+    def rewindable(self) -> bool:
+        """True if the body can be sent (again)"""
+        return not self._sent or self._buffer is not None or self._start is not None
+
+    def rewind(self) -> bool:
+        """Prepare the body to be sent again
+
+        Returns:
+            bool: False if the body was already sent and can not be rewound
+        """
+        if self._sent and self._start is not None:
+            self.source.seek(self._start)
+            self._sent = False
+
+        return self.rewindable
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        # requests uses chunked transfer encoding for streams of zero length
+        return self.length or 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        self._sent = True
+        if self._buffer is not None:
+            with memoryview(self.source) as view, view.cast("B") as data:
+                for offset in range(0, len(data), self.chunk_size):
+                    yield bytes(data[offset : offset + self.chunk_size])
+        elif hasattr(self.source, "read"):
+            while True:
+                chunk = self.source.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            for chunk in self.source:
+                yield chunk.encode() if isinstance(chunk, str) else bytes(chunk)
+
+
+class MultipartUpload(UploadBody):
+    """Streamed multipart/form-data request body
+
+    Fields are given as a dict or list of (name, value) pairs. Values are strings or
+    bytes for form fields, or (filename, source) and (filename, source, content_type)
+    tuples for files where source is anything UploadBody accepts. The length is known
+    when the length of every part is known.
+
+    WebClient.call() sets the Content-Type header with the boundary.
+    """
+
+    def __init__(
+        self,
+        fields: Union[dict, list],
+        boundary: str = "",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Init function for multipart upload body
+
+        Args:
+            fields (dict|list): Form fields and files
+            boundary (str, optional): Part boundary. Defaults to a random boundary.
+            chunk_size (int, optional): Bytes read per chunk. Defaults to 64 KiB.
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self._parts: list = []
+        for name, value in fields.items() if isinstance(fields, dict) else fields:
+            self._parts.append(self._part(name, value, chunk_size))
+        self._closing = f"--{self.boundary}--\r\n".encode()
+
+        length: Optional[int] = len(self._closing)
+        for header, body in self._parts:
+            if length is not None:
+                length = None if body.length is None else length + len(header) + body.length + 2
+        super().__init__(b"", length, chunk_size)
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header value"""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def rewindable(self) -> bool:
+        return all(body.rewindable for _, body in self._parts)
+
+    def _part(self, name: str, value: Any, chunk_size: int) -> tuple:
+        """Part header and body"""
+        disposition = f'form-data; name="{name}"'
+        headers = ""
+        if isinstance(value, tuple):
+            filename, source, *content_type = value
+            disposition += f'; filename="{filename}"'
+            if not content_type:
+                content_type = [mimetypes.guess_type(filename)[0] or "application/octet-stream"]
+            headers = f"Content-Type: {content_type[0]}\r\n"
+            value = source
+        elif isinstance(value, str):
+            value = value.encode()
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n{headers}\r\n"
+
+        return header.encode(), UploadBody(value, chunk_size=chunk_size)
+
+    def rewind(self) -> bool:
+        """Rewind every part, False once a part can not be rewound"""
+        return all(body.rewind() for _, body in self._parts)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for header, body in self._parts:
+            yield header
+            yield from body
+            yield b"\r\n"
+        yield self._closing
+
+
+def _buffer_size(source: Any) -> Optional[int]:
+    """Size of objects exposing the buffer protocol such as bytes and mmap, else None"""
+    try:
+        with memoryview(source) as view:
+            return view.nbytes
+    except TypeError:
+        return None
+
+
+def _tell(source: Any) -> Optional[int]:
+    """Current position of a seekable file object, None if not seekable"""
+    try:
+        if hasattr(source, "seekable") and not source.seekable():
+            return None
+        return source.tell()
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+def _file_size(source: Any) -> int:
+    """Size of a seekable file object"""
+    try:
+        return os.fstat(source.fileno()).st_size
+    except (OSError, ValueError, AttributeError, io.UnsupportedOperation):
+        position = source.tell()
+        size = source.seek(0, io.SEEK_END)
+        source.seek(position)
+        return size
@@ -16,36 +16,94 @@ not liable for any missuse.
 # __maintainer__ = "Jonas Werme"
 # __email__ = "jonas[dot]werme[at]hoofbite[dot]com"
 # __status__ = "Prototype"
+# pylint: disable=too-many-lines
 
 
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from enum import Enum
-from time import time
-from typing import Any, Optional, Type, Union
+from itertools import islice
+from time import monotonic, sleep, time
+from typing import Any, Callable, Iterable, Iterator, Optional, Type, Union
 from urllib.parse import urlparse
 
 import jwt
-from requests import HTTPError, RequestException, Response, Timeout, TooManyRedirects, request
+from requests import HTTPError, RequestException, Response, Session, Timeout, TooManyRedirects
+from requests.adapters import DEFAULT_POOLSIZE
 
 from pywrapid.config import ConfigSubSection, WrapidConfig
 from pywrapid.utils import is_file_readable
 
+from .balancer import LoadBalancer
+from .cache import CACHEABLE_METHODS, DEFAULT_CACHE_SIZE, DEFAULT_DISK_CACHE_SIZE, ResponseCache
+from .circuit_breaker import CircuitBreaker, CircuitBreakers
+from .coalesce import RequestCoalescer
+from .compression import DEFAULT_MIN_SIZE, RequestCompressor
+from .deadline import Deadline, hold
+from .decoding import DEFAULT_OFFLOAD_SIZE, JSONDecoder
 from .exceptions import (
     ClientAuthenticationError,
     ClientAuthorizationError,
+    ClientCircuitOpenError,
     ClientConnectionError,
     ClientError,
     ClientHTTPError,
+    ClientRateLimitError,
     ClientTimeout,
     CredentialCertificateFileError,
     CredentialError,
     CredentialKeyFileError,
     CredentialURLError,
 )
+from .hedging import RequestHedger
+from .keys import token_store_key
+from .metrics import RequestMetrics, RequestTiming
+from .pagination import LinkHeaderPaginator, Paginator
+from .prepared import PreparedEndpoint
+from .rate_limit import RateLimiter
+from .replay import ReplayTransport
+from .retry import RetryPolicy
+from .token_store import FileTokenStore, MemoryTokenStore, TokenStore
+from .transport import Transport, create_transport
+from .upload import MultipartUpload, UploadBody
 
 log = logging.getLogger(__name__)
 
+# client_options keys consumed by the connection pool rather than passed on to requests
+SESSION_OPTIONS = ("pool_connections", "pool_maxsize", "pool_block", "transport", "http2")
+
+
+def _body_size(body: Any) -> int:
+    """Size in bytes of a prepared request body, 0 if unknown"""
+    if isinstance(body, str):
+        return len(body.encode())
+    try:
+        return len(body) if body is not None else 0
+    except TypeError:
+        return 0
+
+
+def client_error(error: RequestException) -> ClientError:
+    """Map a requests exception to the matching client exception
+
+    Args:
+        error (RequestException): Exception raised by requests
+
+    Returns:
+        ClientError: Client exception wrapping the error
+    """
+    if isinstance(error, HTTPError):
+        return ClientHTTPError(error)
+    if isinstance(error, Timeout):
+        return ClientTimeout(error)
+    if isinstance(error, TooManyRedirects):
+        return ClientConnectionError(error)
+
+    return ClientError(error)
+
 
 class AuthorizationType(Enum):
     """Auth type enum"""
@@ -275,34 +333,24 @@ class OAuth2Credentials(WebCredentials):
         self.credential_body = self._config.pop("auth_data")
 
 
-class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-arguments
-    """Web Client base
-
-    Generic web client class as base for creating application specific clients
-    or to be used directly as a general use web client. Wraps the request library and
-    adds generic exceptions.
-
-    Passes web calls transparently to requests, meaning you can use any requests
-    option you see fit, such as proxy settings etc by passing them as key word arguments.
-    If a configuration section named client_options is passed to the client,
-    these options will be set for the web communication. Passed arguments will have precedence
-    over configuration items.
-
-    The client allows you to mix and match authetication types with authorization
-    types to fit strange combinations used in some APIs.
-
-    Can be used with a wrapid config or straight up dict config for use in clients
-    extending this class.
+class WebClientBase:  # pylint: disable=too-many-instance-attributes, too-many-arguments
+    """Web Client shared base
 
-    Allows raise of exception on non-2xx responses (optional).
+    Holds configuration, credentials and token state shared by the blocking WebClient
+    and the event loop based AsyncWebClient. Implements everything that does not
+    depend on the HTTP library used for the actual communication.
     """
 
+    # client_options keys consumed by the client session rather than passed on per request
+    _session_option_keys: tuple = ()
+
     def __init__(
         self,
         authorization_type: AuthorizationType = AuthorizationType.NONE,
         credentials: Optional[Type[WebCredentials]] = None,
         dict_config: Optional[dict] = None,
         wrapid_config: Optional[Type[WrapidConfig]] = None,
+        token_store: Optional[TokenStore] = None,
     ):
         """Init function for web client class
 
@@ -320,6 +368,11 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
                 wrapid configuration object to store configuration in the clients
                 config parameter from.
 
+            token_store (TokenStore, optional):
+                store to share tokens through with other clients using the same credentials.
+                Defaults to a FileTokenStore when token_store_path is configured,
+                otherwise a MemoryTokenStore private to the client.
+
         Raises:
             ClientException
         """
@@ -329,11 +382,14 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
         self._credential_options: dict = {}
         self._credential_config: dict = {}
         self._login_url: str = ""
+        self._token_url: str = ""
         self._credential_body: dict = {}
         self._access_token_expiry: datetime = datetime.now()
+        self._access_token_issued: datetime = datetime.now()
         self._refresh_token_expiry: datetime = datetime.now()
         self._access_token: str = ""  # nosec
         self._refresh_token: str = ""  # nosec
+        self._refresh_stats: dict = {"refreshes": 0, "coalesced": 0}
 
         if wrapid_config and dict_config:
             raise ClientError(
@@ -347,6 +403,7 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
         if credentials:
             self._credential_options = {**credentials.options}  # type: ignore[dict-item]
             self._login_url = credentials.config.get("login_url", "")  # type: ignore[attr-defined]
+            self._token_url = credentials.config.get("token_url", "")  # type: ignore[attr-defined]
             self._credential_config = credentials.config  # type: ignore[assignment]
             if isinstance(credentials, OAuth2Credentials):
                 self._credential_body = credentials.credential_body
@@ -355,6 +412,33 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
             AuthorizationType(authorization_type).name
         except ValueError as error:
             raise ClientAuthorizationError(error) from error
+
+        self._rate_limiter: Optional[RateLimiter] = None
+        if "rate_limit" in self._config:
+            self._rate_limiter = RateLimiter(**self._config["rate_limit"])
+
+        self._circuit_breakers: Optional[CircuitBreakers] = None
+        if "circuit_breaker" in self._config:
+            self._circuit_breakers = CircuitBreakers(**self._config["circuit_breaker"])
+
+        if token_store is None:
+            if self._config.get("token_store_path", ""):
+                token_store = FileTokenStore(self._config["token_store_path"])
+            else:
+                token_store = MemoryTokenStore()
+        self._token_store: TokenStore = token_store
+        self._json_decoder = JSONDecoder(
+            self._config.get("json_backend", "auto"),
+            self._config.get("json_offload_size", DEFAULT_OFFLOAD_SIZE),
+        )
+        self._token_key = token_store_key(
+            AuthorizationType(authorization_type).name,
+            self._login_url,
+            self._token_url,
+            self._credential_options,
+            self._credential_body,
+        )
+
         log.debug(
             "Initiating new client with authorization type %s and credential type %s",
             AuthorizationType(authorization_type).name,
@@ -397,48 +481,30 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
 
         return True
 
-    def generate_session(self, method: str = "POST", **options: Any) -> None:
-        """Authenticate and generate new token
+    def _seconds_until_renewal(self) -> float:
+        """Seconds until the access token should be proactively renewed
 
-        Args:
-            method (str, optional): HTTP Method to use. Defaults to "POST".
+        Renewal is due at token_refresh_ratio of the token lifetime, and never later than
+        token_expiry_offset seconds before expiry.
 
-        Raises:
-            ClientAuthenticationError
+        Returns:
+            float: Seconds until renewal, 0 or less if renewal is due
         """
-        # Merge credential options (like auth) with any provided options
-        login_options = {
-            **self._credential_options,
-            **self._config.get("auth_options", {}),
-            **options,
-        }
-
-        if self._credential_body:
-            login_options["data"] = self._credential_body
-
-        response = self.call(
-            method,
-            str(self._login_url),
-            raise_for_status=False,
-            skip_authentication=True,
-            **login_options,
+        if not self._access_token:
+            return 0
+
+        lifetime = (self._access_token_expiry - self._access_token_issued).total_seconds()
+        renew_at = min(
+            self._access_token_issued
+            + timedelta(seconds=lifetime * self._config.get("token_refresh_ratio", 0.8)),
+            self._access_token_expiry
+            - timedelta(seconds=self._config.get("token_expiry_offset", 10)),
         )
 
-        if response.status_code > 299 or response.status_code < 200:
-            log.error(
-                "Unable to generate new session: [%s] %s @ %s",
-                response.status_code,
-                response.content,
-                self._login_url,
-            )
-            raise ClientAuthenticationError(
-                f"Unable to generate new session: [{response.status_code}] {response.content!r}"
-            )
-
-        self._parse_authentication_data(response)
+        return (renew_at - datetime.now()).total_seconds()
 
     def _parse_authentication_data(  # pylint: disable=too-many-branches
-        self, response: Response
+        self, response: Any
     ) -> None:
         # Custom headers or custom bodies are common locations of bearer tokens.
         # We need to make this more dynamic later. Adding response Authorization header
@@ -463,7 +529,7 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
         # Manage JWT data extraction
         if self._authorization_type == AuthorizationType.OAUTH2:
             try:
-                auth_response_data = response.json()
+                auth_response_data = self._json_decoder.decode(response)
                 # Oauth2 implementations differ vastly. Some gives only access_tokens,
                 # some give both at authentication, some give both at every refresh
                 # some give only refresh_tokens for offline scopes. Spliting ifs to handle all.
@@ -517,64 +583,311 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
 
         return expiry
 
-    # flake8: noqa: C901
-    def call(
-        self,
-        method: str,
-        url: str,
-        raise_for_status: bool = False,
-        skip_authentication: bool = False,
-        **options: Any,
-    ) -> Response:
-        """Send web request to the target url
+    @staticmethod
+    def _rate_limit_block(options: dict) -> tuple:
+        """Split the per call rate_limit_block option from the request options
+
+        Args:
+            options (dict): request options
+
+        Returns:
+            tuple: Block setting of the call or None, and the options to send
+        """
+        if "rate_limit_block" not in options:
+            return None, options
+        options = dict(options)
+
+        return options.pop("rate_limit_block"), options
+
+    def _rate_limit_wait(
+        self, url: str, block: Optional[bool] = None, deadline: Optional[Deadline] = None
+    ) -> float:
+        """Reserve rate limiter tokens for a request
 
         Args:
-            method (str): Method of the HTTP request
             url (str): URL of the request
-            raise_for_status (bool): Raise for non 2xx repsonses
-            skip_authentication (bool): Skip authentication and skip token refresh controls
-            **options (dict): request options
+            block (bool, optional): Override the rate limiter block setting for the call
+            deadline (Deadline, optional): Deadline of the call, no tokens are taken
+                when the wait for them would exceed it
 
         Raises:
-            ClientHTTPError
-            ClientTimeout
-            ClientConnectionError
-            ClientException
-            ClientAuthenticationError
+            ClientRateLimitError: Rate limit reached while failing fast
+            ClientTimeout: Rate limit wait exceeds the deadline
 
         Returns:
-            Response: requests.Response object
+            float: Seconds to wait before sending the request
+        """
+        if self._rate_limiter is None:
+            return 0
+
+        max_wait = None if deadline is None else deadline.remaining()
+        delay = self._rate_limiter.reserve(url, block, max_wait)
+        if delay is None:
+            raise ClientRateLimitError(f"Client side rate limit reached for {url}")
+        if max_wait is not None and delay >= max_wait:
+            raise ClientTimeout(f"Deadline exceeded by rate limit wait of {delay:.2f}s")
+
+        return delay
+
+    def _circuit_breaker(self, url: str) -> Optional[CircuitBreaker]:
+        """Get the circuit breaker for a request, failing fast while it is open
+
+        Args:
+            url (str): URL of the request
+
+        Raises:
+            ClientCircuitOpenError: Circuit for the upstream is open
+
+        Returns:
+            CircuitBreaker|None: Breaker to record the outcome in, None if not enabled
+        """
+        if self._circuit_breakers is None:
+            return None
+
+        breaker = self._circuit_breakers.breaker(url)
+        if not breaker.allow():
+            raise ClientCircuitOpenError(
+                f"Circuit open for {self._circuit_breakers.origin(url)}, failing fast"
+            )
+
+        return breaker
+
+    def _circuit_record(
+        self, breaker: Optional[CircuitBreaker], started: float, response: Any = None
+    ) -> None:
+        """Record a request outcome in its circuit breaker
+
+        Args:
+            breaker (CircuitBreaker|None): Breaker returned by _circuit_breaker
+            started (float): monotonic() time the request was sent
+            response (Any, optional): Response, None if the request raised
+        """
+        if breaker is None or self._circuit_breakers is None:
+            return
+
+        failed = response is None or (
+            response.status_code in self._circuit_breakers.failure_statuses
+        )
+        breaker.record(failed, monotonic() - started)
+
+    @staticmethod
+    def _circuit_release(breaker: Optional[CircuitBreaker]) -> None:
+        """Give back the probe slot of a request abandoned without an outcome"""
+        if breaker is not None:
+            breaker.release()
+
+    @contextmanager
+    def _circuit_failures(
+        self, breaker: Optional[CircuitBreaker], started: float
+    ) -> Iterator[None]:
+        """Record a request raising as failed, or release it when abandoned
+
+        Args:
+            breaker (CircuitBreaker|None): Breaker returned by _circuit_breaker
+            started (float): monotonic() time the request was sent
+        """
+        try:
+            yield
+        except Exception:
+            self._circuit_record(breaker, started)
+            raise
+        except BaseException:
+            # Cancelled, e.g. by the call deadline
+            self._circuit_release(breaker)
+            raise
+
+    @property
+    def circuit_stats(self) -> dict:
+        """Circuit breaker state and counters per upstream, empty if not enabled"""
+        return self._circuit_breakers.stats if self._circuit_breakers else {}
+
+    def _login_options(self, **options: Any) -> dict:
+        """Build request options for authentication calls
+
+        Merges credential options (like auth) and auth_options config with passed options.
+
+        Returns:
+            dict: Request options for the login call
+        """
+        login_options = {
+            **self._credential_options,
+            **self._config.get("auth_options", {}),
+            **options,
+        }
+
+        if self._credential_body:
+            login_options["data"] = self._credential_body
+
+        return login_options
+
+    def _refresh_grant_options(self) -> Optional[dict]:
+        """Build request options for an OAuth2 refresh token grant
+
+        Client identification (client_id, client_secret, scope) is copied from the
+        credential auth_data when present.
+
+        Returns:
+            dict|None: Request options for the token_url call, None if no usable
+                refresh token is available
+        """
+        if (
+            self._authorization_type != AuthorizationType.OAUTH2
+            or not self._token_url
+            or not self._refresh_token
+            or self._refresh_token_expiry <= datetime.now()
+        ):
+            return None
+
+        data = {
+            key: value
+            for key, value in self._credential_body.items()
+            if key in ("client_id", "client_secret", "scope")
+        }
+        data.update({"grant_type": "refresh_token", "refresh_token": self._refresh_token})
+
+        return {**self._renewal_options(), "data": data}
+
+    def _renewal_options(self) -> dict:
+        """Credential options and auth_options config for token renewal calls"""
+        return {**self._credential_options, **self._config.get("auth_options", {})}
+
+    def _validate_login_response(self, response: Any) -> None:
+        """Validate authentication response and parse token data from it
+
+        Args:
+            response (Any): requests or httpx response from the login call
+
+        Raises:
+            ClientAuthenticationError
         """
-        if not skip_authentication and self.session_expired():
-            login_options = {**self._credential_options, **self._config.get("auth_options", {})}
-            self.generate_session(**login_options)
+        if response.status_code > 299 or response.status_code < 200:
+            log.error(
+                "Unable to generate new session: [%s] %s @ %s",
+                response.status_code,
+                response.content,
+                self._login_url,
+            )
+            raise ClientAuthenticationError(
+                f"Unable to generate new session: [{response.status_code}] {response.content!r}"
+            )
+
+        self._parse_authentication_data(response)
 
+    def _authorization_header(self) -> dict:
+        """Authorization header for the current access token, empty without one"""
         if self._access_token and self._authorization_type != AuthorizationType.NONE:
+            return {"Authorization": f"Bearer {self._access_token}"}
+
+        return {}
+
+    def _request_options(self, options: dict) -> dict:
+        """Add authorization header and client_options to request options
+
+        Passed options have precedence over client_options configuration.
+
+        Args:
+            options (dict): Request options passed to the call
+
+        Returns:
+            dict: Request options to send
+        """
+        authorization = self._authorization_header()
+        if authorization:
             if "headers" not in options:
-                options["headers"] = {"Authorization": f"Bearer {self._access_token}"}
+                options["headers"] = authorization
             else:
                 if "Authorization" not in options["headers"]:
-                    options["headers"] = {
-                        "Authorization": f"Bearer {self._access_token}",
-                        **options["headers"],
-                    }
+                    options["headers"] = {**authorization, **options["headers"]}
         if "client_options" in self.get_config:
-            options = {**self.get_config["client_options"], **options}
+            client_options = {
+                key: value
+                for key, value in self.get_config["client_options"].items()
+                if key not in self._session_option_keys
+            }
+            options = {**client_options, **options}
+
+        return options
+
+    def _load_tokens(self) -> bool:
+        """Adopt tokens from the token store if they outlive the current access token
+
+        Returns:
+            bool: True if stored tokens were adopted
+        """
+        tokens = self._token_store.get(self._token_key)
+        if not tokens or tokens["access_token_expiry"] <= self._access_token_expiry.timestamp():
+            return False
+
+        self._access_token = tokens["access_token"]
+        self._access_token_expiry = datetime.fromtimestamp(tokens["access_token_expiry"])
+        self._access_token_issued = datetime.fromtimestamp(tokens["access_token_issued"])
+        self._refresh_token = tokens["refresh_token"]
+        self._refresh_token_expiry = datetime.fromtimestamp(tokens["refresh_token_expiry"])
+        log.debug("Access token loaded from token store, expiry: %s", self._access_token_expiry)
+
+        return True
+
+    def _save_tokens(self) -> None:
+        """Publish current tokens to the token store"""
+        self._token_store.set(
+            self._token_key,
+            {
+                "access_token": self._access_token,
+                "access_token_expiry": self._access_token_expiry.timestamp(),
+                "access_token_issued": self._access_token_issued.timestamp(),
+                "refresh_token": self._refresh_token,
+                "refresh_token_expiry": self._refresh_token_expiry.timestamp(),
+            },
+        )
+
+    def _adopt_renewed_tokens(self) -> bool:
+        """Adopt a token renewed while waiting for the renewal locks, caller holds them
+
+        Returns:
+            bool: True if the current token is valid and no renewal is needed
+        """
+        if self.session_expired():
+            self._load_tokens()
+        if self.session_expired():
+            return False
+
+        self._refresh_stats["coalesced"] += 1
+        return True
+
+    def _session_renewed(self) -> None:
+        """Count a renewal and publish the new tokens"""
+        self._refresh_stats["refreshes"] += 1
+        self._save_tokens()
+
+    def _refresh_granted(self, response: Any) -> bool:
+        """Adopt the tokens of a refresh token grant response
+
+        A rejected refresh token is discarded so the next renewal performs a full login.
+
+        Args:
+            response (Any): requests or httpx response from the token endpoint
+
+        Returns:
+            bool: True if the token was renewed, False if a full login is needed
+        """
         try:
-            response = request(method, url, **options)
+            self._validate_login_response(response)
+        except ClientAuthenticationError as error:
+            log.info("Refresh token grant rejected, falling back to login: %s", error)
+            self._refresh_token = ""  # nosec
+            return False
 
-            if raise_for_status:
-                response.raise_for_status()
-        except HTTPError as error:
-            raise ClientHTTPError(error) from error
-        except Timeout as error:
-            raise ClientTimeout(error) from error
-        except TooManyRedirects as error:
-            raise ClientConnectionError(error) from error
-        except RequestException as error:
-            raise ClientError(error) from error
+        return True
 
-        return response
+    @property
+    def refresh_stats(self) -> dict:
+        """Token refresh counters
+
+        Returns:
+            dict: refreshes performed and coalesced refreshes, where a caller waited for
+                another callers refresh instead of authenticating itself
+        """
+        return dict(self._refresh_stats)
 
     @property
     def get_config(self) -> dict:
@@ -613,5 +926,966 @@ class WebClient:  # pylint: disable=too-many-instance-attributes, too-many-argum
     def _set_access_token_expiry(self, access_expiry: float) -> None:
         """Set access token expiry time"""
         self._access_token_expiry = datetime.fromtimestamp(access_expiry)
+        self._access_token_issued = datetime.now()
 
         log.debug("Access token expiry set to: %s", self._access_token_expiry)
+
+
+class WebClient(WebClientBase):  # pylint: disable=too-many-instance-attributes
+    """Web Client base
+
+    Generic web client class as base for creating application specific clients
+    or to be used directly as a general use web client. Wraps the request library and
+    adds generic exceptions.
+
+    Passes web calls transparently to requests, meaning you can use any requests
+    option you see fit, such as proxy settings etc by passing them as key word arguments.
+    If a configuration section named client_options is passed to the client,
+    these options will be set for the web communication. Passed arguments will have precedence
+    over configuration items.
+
+    The client allows you to mix and match authetication types with authorization
+    types to fit strange combinations used in some APIs.
+
+    Can be used with a wrapid config or straight up dict config for use in clients
+    extending this class.
+
+    Allows raise of exception on non-2xx responses (optional).
+
+    Each client owns a long-lived requests session with a keep-alive connection pool,
+    sized through the pool_connections, pool_maxsize and pool_block client_options.
+    Call close() or use the client as a context manager to release pooled connections.
+    """
+
+    _session_option_keys = SESSION_OPTIONS
+
+    def __init__(
+        self,
+        authorization_type: AuthorizationType = AuthorizationType.NONE,
+        credentials: Optional[Type[WebCredentials]] = None,
+        dict_config: Optional[dict] = None,
+        wrapid_config: Optional[Type[WrapidConfig]] = None,
+        token_store: Optional[TokenStore] = None,
+    ):
+        """Init function for web client class
+
+        See WebClientBase for arguments.
+
+        Raises:
+            ClientException
+        """
+        super().__init__(authorization_type, credentials, dict_config, wrapid_config, token_store)
+        self._session: Union[Session, Transport] = self._create_session()
+        self._session_lock = threading.Lock()
+        self._refresh_stop = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._response_cache: Optional[ResponseCache] = None
+        self._retry_policy = RetryPolicy(**self._config.get("retry", {}))
+        self._metrics: Optional[RequestMetrics] = None
+        self._coalescer: Optional[RequestCoalescer] = None
+        self._load_balancer: Optional[LoadBalancer] = None
+        self._hedger: Optional[RequestHedger] = None
+        self._probe_path = ""
+        self._probe_timeout: float = 5
+        self._compressor: Optional[RequestCompressor] = None
+        compression = self._config.get("compression", {})
+        self._accept_encoding = compression.get("accept_encoding", "")
+
+        if compression.get("request_encoding"):
+            self._compressor = RequestCompressor(
+                encoding=compression["request_encoding"],
+                min_size=compression.get("min_size", DEFAULT_MIN_SIZE),
+                level=compression.get("level"),
+            )
+
+        if "metrics" in self._config:
+            self._metrics = RequestMetrics(**self._config["metrics"])
+
+        if "coalescing" in self._config:
+            self._coalescer = RequestCoalescer(**self._config["coalescing"])
+
+        if "hedging" in self._config:
+            self._hedger = RequestHedger(**self._config["hedging"])
+
+        if "load_balancer" in self._config:
+            balancer_config = dict(self._config["load_balancer"])
+            self._probe_path = balancer_config.pop("probe_path", "")
+            self._probe_timeout = balancer_config.pop("probe_timeout", 5)
+            self._load_balancer = LoadBalancer(
+                probe=self._probe_endpoint if self._probe_path else None, **balancer_config
+            )
+
+        if "response_cache" in self._config:
+            self._response_cache = ResponseCache(
+                max_bytes=self._config["response_cache"].get("max_bytes", DEFAULT_CACHE_SIZE),
+                path=self._config["response_cache"].get("path", ""),
+                disk_max_bytes=self._config["response_cache"].get(
+                    "disk_max_bytes", DEFAULT_DISK_CACHE_SIZE
+                ),
+            )
+
+    def __enter__(self) -> "WebClient":
+        if self._config.get("background_token_refresh", False):
+            self.start_token_refresh()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _create_session(self) -> Union[Session, Transport]:
+        """Create the transport selected and sized from client_options
+
+        The default requests transport is a keep-alive session with a connection pool,
+        the httpx and aiohttp transports are created by client_options transport. With a
+        replay section requests are recorded through it or replayed from a cassette.
+
+        Returns:
+            Session|Transport: requests session with pooled adapters or transport backend
+        """
+        client_options = self._config.get("client_options", {})
+        if "replay" in self._config:
+            replay_config = dict(self._config["replay"])
+            if replay_config.get("mode", "replay") == "record":
+                replay_config["transport"] = create_transport(client_options)
+            return ReplayTransport(**replay_config)
+
+        return create_transport(client_options)
+
+    def close(self) -> None:
+        """Close the client session and release pooled connections"""
+        self.stop_token_refresh()
+        if self._load_balancer is not None:
+            self._load_balancer.close()
+        if self._hedger is not None:
+            self._hedger.close()
+        self._session.close()
+
+    def _probe_endpoint(self, url: str) -> bool:
+        """Health probe of a load balanced endpoint, any non 5xx response passes
+
+        Args:
+            url (str): Endpoint base URL
+
+        Returns:
+            bool: True if the endpoint responded
+        """
+        options = {**self._request_options({}), "timeout": self._probe_timeout}
+        try:
+            response = self._session.request("GET", url + self._probe_path, **options)
+        except RequestException as error:
+            log.debug("Probe of %s failed: %s", url, error)
+            return False
+        response.close()
+
+        return response.status_code < 500
+
+    @property
+    def hedge_stats(self) -> dict:
+        """Request hedging counters, empty if hedging is not enabled"""
+        return self._hedger.stats if self._hedger else {}
+
+    @property
+    def endpoint_stats(self) -> dict:
+        """Load balancer state per endpoint, empty if load balancing is not enabled"""
+        return self._load_balancer.stats if self._load_balancer else {}
+
+    @property
+    def cache_stats(self) -> dict:
+        """Response cache counters, empty if the response cache is not enabled"""
+        return self._response_cache.stats if self._response_cache else {}
+
+    @property
+    def coalesce_stats(self) -> dict:
+        """Request coalescing counters, empty if coalescing is not enabled"""
+        return self._coalescer.stats if self._coalescer else {}
+
+    @property
+    def request_stats(self) -> dict:
+        """Request metrics per host and route, empty if metrics are not enabled"""
+        return self._metrics.stats if self._metrics else {}
+
+    def add_timing_hook(self, hook: Callable[[RequestTiming], Any]) -> None:
+        """Register a callable receiving the RequestTiming of every request attempt
+
+        Enables request metrics with default settings if not configured.
+
+        Args:
+            hook (Callable): Callable taking a RequestTiming
+        """
+        if self._metrics is None:
+            self._metrics = RequestMetrics()
+        self._metrics.add_hook(hook)
+
+    def start_token_refresh(self) -> None:
+        """Start renewing the access token in a background thread ahead of expiry
+
+        The thread authenticates right away and then renews the token at
+        token_refresh_ratio of its lifetime, so calls never wait for authentication.
+        Started when entering the client with background_token_refresh set, stopped by
+        stop_token_refresh() or close().
+        """
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        self._refresh_stop.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._background_token_refresh, name="pywrapid-token-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop_token_refresh(self) -> None:
+        """Stop the background token refresh thread"""
+        self._refresh_stop.set()
+        if self._refresh_thread and self._refresh_thread is not threading.current_thread():
+            self._refresh_thread.join()
+        self._refresh_thread = None
+
+    def _background_token_refresh(self) -> None:
+        """Background thread loop renewing the token ahead of expiry"""
+        minimum_delay = 0.0
+        while not self._refresh_stop.wait(max(self._seconds_until_renewal(), minimum_delay)):
+            try:
+                with self._session_lock, self._token_store.lock(self._token_key):
+                    # Another client sharing the token store may have renewed already
+                    if not self._load_tokens() or self._seconds_until_renewal() <= 0:
+                        self._renew_session()
+                minimum_delay = 1.0  # Avoid spinning on tokens without a known lifetime
+            except ClientError as error:
+                log.warning("Background token refresh failed: %s", error)
+                minimum_delay = self._config.get("token_refresh_retry", 10)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Background token refresh failed unexpectedly")
+                minimum_delay = self._config.get("token_refresh_retry", 10)
+
+    def generate_session(
+        self, method: str = "POST", deadline: Optional[Deadline] = None, **options: Any
+    ) -> None:
+        """Authenticate and generate new token
+
+        Args:
+            method (str, optional): HTTP Method to use. Defaults to "POST".
+            deadline (Deadline, optional): Deadline of the call needing the token
+
+        Raises:
+            ClientAuthenticationError
+            ClientTimeout
+        """
+        login_options = self._login_options(**options)
+
+        response = self.call(
+            method,
+            str(self._login_url),
+            raise_for_status=False,
+            skip_authentication=True,
+            deadline=deadline,
+            **login_options,
+        )
+
+        self._validate_login_response(response)
+
+    def _ensure_session(self, deadline: Optional[Deadline] = None) -> None:
+        """Generate a new session if the current one has expired
+
+        Single-flight: one thread authenticates while concurrent callers wait for its token.
+
+        Args:
+            deadline (Deadline, optional): Deadline of the call needing the token
+
+        Raises:
+            ClientTimeout
+        """
+        if not self.session_expired():
+            return
+
+        message = "Deadline exceeded awaiting authentication by another caller"
+        with hold(self._session_lock, self._lock_timeout(deadline), message):
+            with self._token_store.lock(self._token_key, self._lock_timeout(deadline)):
+                if not self._adopt_renewed_tokens():
+                    self._renew_session(deadline)
+
+    @staticmethod
+    def _lock_timeout(deadline: Optional[Deadline]) -> Optional[float]:
+        """Seconds to wait for an authentication lock, None without a deadline"""
+        return None if deadline is None else deadline.check("before authentication")
+
+    def _renew_session(self, deadline: Optional[Deadline] = None) -> None:
+        """Authenticate and replace the current token, caller must hold the session lock"""
+        if not self.refresh_session(deadline):
+            self.generate_session(deadline=deadline, **self._renewal_options())
+        self._session_renewed()
+
+    def refresh_session(self, deadline: Optional[Deadline] = None) -> bool:
+        """Renew the access token with the OAuth2 refresh token grant
+
+        Uses the stored refresh token against the credentials token_url. A rejected
+        refresh token is discarded so the next renewal performs a full login, on
+        timeouts and connection errors it is kept for the next attempt.
+
+        Args:
+            deadline (Deadline, optional): Deadline of the call needing the token
+
+        Raises:
+            ClientTimeout
+            ClientError
+
+        Returns:
+            bool: True if the token was renewed, False if a full login is needed
+        """
+        refresh_options = self._refresh_grant_options()
+        if refresh_options is None:
+            return False
+
+        response = self.call(
+            "POST",
+            self._token_url,
+            raise_for_status=False,
+            skip_authentication=True,
+            deadline=deadline,
+            **refresh_options,
+        )
+
+        return self._refresh_granted(response)
+
+    # flake8: noqa: C901
+    def call(
+        self,
+        method: str,
+        url: str,
+        raise_for_status: bool = False,
+        skip_authentication: bool = False,
+        deadline: Union[float, Deadline, None] = None,
+        **options: Any,
+    ) -> Response:
+        """Send web request to the target url
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request, or a path when load balancing
+            raise_for_status (bool): Raise for non 2xx repsonses
+            skip_authentication (bool): Skip authentication and skip token refresh controls
+            deadline (float|Deadline, optional): Seconds the call may take including
+                authentication, retries and backoff, or a Deadline shared with other calls
+            **options (dict): request options, and rate_limit_block (bool) to wait for
+                rate limiter tokens or fail fast regardless of the rate_limit block setting
+
+        Raises:
+            ClientHTTPError
+            ClientTimeout
+            ClientConnectionError
+            ClientException
+            ClientAuthenticationError
+            ClientRateLimitError
+            ClientCircuitOpenError
+
+        Returns:
+            Response: requests.Response object
+        """
+        if isinstance(deadline, (int, float)):
+            deadline = Deadline(deadline)
+        if not skip_authentication:
+            self._ensure_session(deadline)
+
+        return self._call(method, url, self._request_options(options), raise_for_status, deadline)
+
+    def _call(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        options: dict,
+        raise_for_status: bool,
+        deadline: Optional[Deadline] = None,
+    ) -> Response:
+        """Send web request with complete request options, mapping request exceptions
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options including authorization and client_options
+            raise_for_status (bool): Raise for non 2xx repsonses
+            deadline (Deadline, optional): Deadline of the call
+
+        Returns:
+            Response: requests.Response object
+        """
+        if isinstance(options.get("data"), MultipartUpload):
+            content_type = {"Content-Type": options["data"].content_type}
+            options["headers"] = {**content_type, **options.get("headers", {})}
+        if self._accept_encoding:
+            options["headers"] = {
+                "Accept-Encoding": self._accept_encoding,
+                **options.get("headers", {}),
+            }
+        if self._compressor is not None:
+            options = self._compressor.apply(options)
+        try:
+            coalescer = self._coalescer
+            if coalescer is not None and coalescer.coalescable(method, options):
+                response = coalescer.send(
+                    coalescer.key(
+                        method,
+                        url,
+                        options,
+                        self._token_key,
+                        self._authorization_header().get("Authorization", ""),
+                    ),
+                    lambda: self._send_with_retry(method, url, options, deadline),
+                    deadline,
+                )
+            else:
+                response = self._send_with_retry(method, url, options, deadline)
+
+            if raise_for_status:
+                response.raise_for_status()
+        except RequestException as error:
+            raise client_error(error) from error
+
+        return response
+
+    def prepare(
+        self,
+        method: str,
+        url_template: str,
+        raise_for_status: bool = False,
+        skip_authentication: bool = False,
+        **defaults: Any,
+    ) -> PreparedEndpoint:
+        """Prepare a reusable endpoint for frequent calls
+
+        client_options and defaults are merged once and the authorization header is only
+        rebuilt when the access token changes. The URL template is formatted with the
+        path parameters of each call, e.g. "https://example.com/items/{item_id}".
+
+        Args:
+            method (str): Method of the HTTP requests
+            url_template (str): URL with optional {name} path parameter fields
+            raise_for_status (bool): Raise for non 2xx repsonses
+            skip_authentication (bool): Skip authentication and skip token refresh controls
+            **defaults (dict): request options for every call
+
+        Raises:
+            ClientURLError
+
+        Returns:
+            PreparedEndpoint: Callable endpoint
+        """
+        return PreparedEndpoint(
+            self, method, url_template, raise_for_status, skip_authentication, **defaults
+        )
+
+    def json(self, response: Response) -> Any:
+        """Decoded json body of a response using the configured json backend
+
+        The body is decoded once, later calls and paginators reuse the result.
+
+        Args:
+            response (Response): Response to decode
+
+        Raises:
+            ClientError
+
+        Returns:
+            Any: Decoded json
+        """
+        try:
+            return self._json_decoder.decode(response)
+        except ValueError as error:
+            raise ClientError(f"Unable to decode json response: {error}") from error
+
+    def stream(
+        self,
+        method: str,
+        url: str,
+        mode: str = "chunks",
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+        skip_authentication: bool = False,
+        **options: Any,
+    ) -> Iterator[Any]:
+        """Send web request and iterate over the response body as it arrives
+
+        The request is sent like call() with stream=True when iteration starts. The
+        connection is released back to the pool when iteration ends or the iterator
+        is closed.
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            mode (str): "chunks" for bytes, "lines" for decoded lines or "ndjson" for one
+                parsed json record per line. Defaults to "chunks".
+            chunk_size (int): Bytes read at a time. Defaults to 64 KiB.
+            raise_for_status (bool): Raise for non 2xx repsonses. Defaults to True.
+            skip_authentication (bool): Skip authentication and skip token refresh controls
+            **options (dict): request options
+
+        Raises:
+            ClientHTTPError
+            ClientTimeout
+            ClientConnectionError
+            ClientException
+            ClientAuthenticationError
+
+        Yields:
+            bytes|str|Any: Chunks, lines or json records
+        """
+        if mode not in ("chunks", "lines", "ndjson"):
+            raise ClientError(f"Unknown stream mode: {mode}")
+
+        response = self.call(
+            method,
+            url,
+            raise_for_status=raise_for_status,
+            skip_authentication=skip_authentication,
+            stream=True,
+            **options,
+        )
+        try:
+            if mode == "chunks":
+                yield from response.iter_content(chunk_size)
+                return
+
+            if response.encoding is None:
+                response.encoding = "utf-8"
+            for line in response.iter_lines(chunk_size, decode_unicode=True):
+                if mode == "lines":
+                    yield line
+                elif line.strip():
+                    yield self._json_decoder.loads(line)
+        except RequestException as error:
+            raise client_error(error) from error
+        except ValueError as error:
+            raise ClientError(f"Invalid ndjson record: {error}") from error
+        finally:
+            response.close()
+
+    def paginate(
+        self,
+        url: str,
+        paginator: Optional[Paginator] = None,
+        method: str = "GET",
+        prefetch: bool = True,
+        **options: Any,
+    ) -> Iterator[Any]:
+        """Iterate over the items of a paginated resource
+
+        Pages are requested with call() and raise for non 2xx responses. With prefetch
+        the next page is requested in the background while the items of the current
+        page are consumed.
+
+        Args:
+            url (str): URL of the first page
+            paginator (Paginator, optional): Pagination scheme.
+                Defaults to LinkHeaderPaginator.
+            method (str, optional): Method of the HTTP requests. Defaults to "GET".
+            prefetch (bool, optional): Fetch the next page ahead. Defaults to True.
+            **options (dict): call() options for the first page
+
+        Raises:
+            ClientHTTPError
+            ClientTimeout
+            ClientConnectionError
+            ClientException
+            ClientAuthenticationError
+
+        Yields:
+            Any: Items of the pages
+        """
+        paginator = paginator or LinkHeaderPaginator()
+        request: Any = paginator.first_request(
+            {"raise_for_status": True, **options, "method": method, "url": url}
+        )
+
+        if not prefetch:
+            while request:
+                response = self.call(**request)
+                request = paginator.next_request(request, response)
+                yield from paginator.items(response)
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page: Optional[Future] = executor.submit(self._fetch_page, request)
+            while page:
+                response = page.result()
+                request = paginator.next_request(request, response)
+                page = executor.submit(self._fetch_page, request) if request else None
+                yield from paginator.items(response)
+
+    def _fetch_page(self, request: dict) -> Response:
+        """Request a page and decode its json body, in the prefetch thread
+
+        Decode errors are left for the paginator to raise when the page is used.
+        """
+        response = self.call(**request)
+        try:
+            self._json_decoder.decode(response)
+        except ValueError:
+            pass
+
+        return response
+
+    def _send_with_retry(
+        self, method: str, url: str, options: dict, deadline: Optional[Deadline] = None
+    ) -> Response:
+        """Send request, retrying failed attempts according to the retry policy
+
+        With a deadline every attempt gets a timeout limited to the time left, and no
+        retry is made when its backoff would end after the deadline.
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options
+            deadline (Deadline, optional): Deadline of the call
+
+        Raises:
+            ClientTimeout
+
+        Returns:
+            Response: requests.Response object of the last attempt
+        """
+        attempt = 1
+        while True:
+            attempt_options = options
+            if deadline is not None:
+                attempt_options = {**options, "timeout": deadline.timeout(options.get("timeout"))}
+            try:
+                response = self._send(method, url, attempt_options, attempt, deadline)
+            except RequestException as error:
+                if not self._retry_policy.retry_error(method, attempt, error) or not self._rewind(
+                    options
+                ):
+                    raise
+                delay = self._retry_policy.backoff(attempt)
+                if deadline is not None and not deadline.allows(delay):
+                    raise
+                log.debug("Retrying %s %s in %.2fs after error: %s", method, url, delay, error)
+            else:
+                if not self._retry_policy.retry_response(
+                    method, attempt, response
+                ) or not self._rewind(options):
+                    return response
+                delay = self._retry_policy.backoff(attempt, response)
+                if deadline is not None and not deadline.allows(delay):
+                    return response
+                log.debug(
+                    "Retrying %s %s in %.2fs after status %s",
+                    method,
+                    url,
+                    delay,
+                    response.status_code,
+                )
+                response.close()
+
+            sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _rewind(options: dict) -> bool:
+        """Rewind a streamed request body for a retry
+
+        Args:
+            options (dict): request options
+
+        Returns:
+            bool: False if the body was consumed and can not be sent again
+        """
+        data = options.get("data")
+        if isinstance(data, UploadBody):
+            return data.rewind()
+        if hasattr(data, "read") or hasattr(data, "__next__"):
+            log.debug("Not retrying request with a consumed %s body", type(data).__name__)
+            return False
+
+        return True
+
+    def _request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        options: dict,
+        attempt: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> Response:
+        """Send request, hedged when hedging is enabled and the request is idempotent
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options
+            attempt (int, optional): Attempt number for request metrics
+            deadline (Deadline, optional): Deadline of the call
+
+        Returns:
+            Response: requests.Response object
+        """
+        hedger = self._hedger
+        if hedger is None or not hedger.hedgeable(method, options):
+            return self._balanced_request(method, url, options, attempt, deadline)
+
+        def send() -> Response:
+            # Hedges start later than the first request, their timeout is limited again
+            send_options = (
+                options
+                if deadline is None
+                else {**options, "timeout": deadline.timeout(options.get("timeout"))}
+            )
+            return self._balanced_request(method, url, send_options, attempt, deadline)
+
+        return hedger.send(url, send, deadline)
+
+    def _balanced_request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        options: dict,
+        attempt: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> Response:
+        """Send request, to an endpoint picked by the load balancer for balanced URLs
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options
+            attempt (int, optional): Attempt number for request metrics
+            deadline (Deadline, optional): Deadline of the call
+
+        Returns:
+            Response: requests.Response object
+        """
+        balancer = self._load_balancer
+        if balancer is None or not balancer.balances(url):
+            return self._upstream_request(method, url, options, attempt, deadline)
+
+        endpoint = balancer.acquire()
+        started = monotonic()
+        try:
+            response = self._upstream_request(
+                method, balancer.url(url, endpoint), options, attempt, deadline
+            )
+        except (RequestException, ClientCircuitOpenError):
+            balancer.release(endpoint, monotonic() - started, True)
+            raise
+        except BaseException:
+            # Not sent, e.g. rate limited or out of deadline, there is no outcome to record
+            balancer.cancel(endpoint)
+            raise
+        balancer.release(
+            endpoint, monotonic() - started, response.status_code in balancer.failure_statuses
+        )
+
+        return response
+
+    def _upstream_request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        options: dict,
+        attempt: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> Response:
+        """Send request on the session, paced by the rate limiter and circuit breaker
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options
+            attempt (int, optional): Attempt number for request metrics
+            deadline (Deadline, optional): Deadline of the call
+
+        Raises:
+            ClientTimeout
+
+        Returns:
+            Response: requests.Response object
+        """
+        block, options = self._rate_limit_block(options)
+        delay = self._rate_limit_wait(url, block, deadline)
+        if delay:
+            sleep(delay)
+
+        breaker = self._circuit_breaker(url)
+        if self._metrics is not None:
+            return self._timed_request(method, url, options, attempt, breaker)
+
+        started = monotonic()
+        with self._circuit_failures(breaker, started):
+            response = self._session.request(method, url, **options)
+        self._circuit_record(breaker, started, response)
+
+        return response
+
+    def _timed_request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        options: dict,
+        attempt: int,
+        breaker: Optional[CircuitBreaker],
+    ) -> Response:
+        """Send request on the session recording a RequestTiming
+
+        Time to first byte and connection reuse are taken in a response hook, which
+        requests runs after the headers are received and before the body is read.
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options
+            attempt (int): Attempt number
+            breaker (CircuitBreaker|None): Circuit breaker of the upstream
+
+        Returns:
+            Response: requests.Response object
+        """
+        metrics: RequestMetrics = self._metrics  # type: ignore[assignment]
+        timing = RequestTiming(method, url, attempt)
+
+        def timing_hook(response: Response, **_kwargs: Any) -> None:
+            timing.ttfb = monotonic() - started
+            timing.reused = metrics.connection_reused(response)
+
+        hooks = dict(options.get("hooks") or {})
+        response_hooks = hooks.get("response", [])
+        if callable(response_hooks):
+            response_hooks = [response_hooks]
+        hooks["response"] = [timing_hook, *response_hooks]
+
+        started = monotonic()
+        try:
+            response = self._session.request(method, url, **{**options, "hooks": hooks})
+        except Exception as error:
+            timing.total = monotonic() - started
+            timing.error = type(error).__name__
+            self._circuit_record(breaker, started)
+            metrics.record(timing)
+            raise
+        except BaseException:
+            self._circuit_release(breaker)
+            raise
+        timing.total = monotonic() - started
+        self._circuit_record(breaker, started, response)
+
+        timing.status = response.status_code
+        timing.request_bytes = _body_size(response.request.body)
+        if options.get("stream"):
+            timing.response_bytes = int(response.headers.get("Content-Length", 0) or 0)
+        else:
+            timing.response_bytes = len(response.content)
+        metrics.record(timing)
+
+        return response
+
+    def _send(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        options: dict,
+        attempt: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> Response:
+        """Send request, through the response cache when enabled
+
+        GET and HEAD responses are served from the cache while fresh according to
+        Cache-Control max-age, and revalidated with If-None-Match/If-Modified-Since
+        when stale. Streamed requests bypass the cache.
+
+        Args:
+            method (str): Method of the HTTP request
+            url (str): URL of the request
+            options (dict): request options
+            attempt (int, optional): Attempt number for request metrics
+            deadline (Deadline, optional): Deadline of the call
+
+        Returns:
+            Response: requests.Response object
+        """
+        cache = self._response_cache
+        if cache is None or method.upper() not in CACHEABLE_METHODS or options.get("stream"):
+            return self._request(method, url, options, attempt, deadline)
+
+        key = cache.key(
+            method,
+            url,
+            options,
+            self._token_key,
+            self._authorization_header().get("Authorization", ""),
+        )
+        cached = cache.get(key)
+        if cached and cached.fresh:
+            cache.count("hits")
+            return cached.response()
+        if cached and cached.validators:
+            options = {**options, "headers": {**cached.validators, **options.get("headers", {})}}
+
+        response = self._request(method, url, options, attempt, deadline)
+
+        if cached and response.status_code == 304:
+            cache.count("revalidations")
+            cached = cached.revalidated(response)
+            cache.set(key, cached)
+            return cached.response()
+
+        cache.count("misses")
+        cache.store(key, response)
+
+        return response
+
+    def call_many(
+        self,
+        calls: Iterable[dict],
+        max_workers: int = 0,
+        raise_for_status: bool = False,
+        skip_authentication: bool = False,
+    ) -> Iterator[tuple[dict, Union[Response, Exception]]]:
+        """Send many web requests concurrently with bounded parallelism
+
+        Each call is a dict of call() arguments, e.g. {"method": "GET", "url": url, "params": {}}.
+        Method defaults to GET and raise_for_status/skip_authentication default to the values
+        passed here. Calls share the client session, connection pool and token.
+
+        Calls are read lazily from the iterable and at most max_workers are in flight at
+        any time, so huge or endless iterables are consumed at the pace results are used.
+
+        Args:
+            calls (Iterable[dict]): call() arguments for each request
+            max_workers (int, optional): Concurrent requests. Defaults to pool_maxsize.
+            raise_for_status (bool): Raise for non 2xx repsonses
+            skip_authentication (bool): Skip authentication and skip token refresh controls
+
+        Yields:
+            tuple[dict, Response|Exception]: Call and its response or the exception it
+                raised, usually a ClientError, in completion order
+        """
+        max_workers = max_workers or self.get_config.get("client_options", {}).get(
+            "pool_maxsize", DEFAULT_POOLSIZE
+        )
+        defaults = {
+            "method": "GET",
+            "raise_for_status": raise_for_status,
+            "skip_authentication": skip_authentication,
+        }
+        calls = iter(calls)
+
+        def send(call: dict) -> Response:
+            return self.call(**{**defaults, **call})
+
+        # Authenticate once up front rather than in every worker
+        if not skip_authentication:
+            self._ensure_session()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: dict[Future, dict] = {
+                executor.submit(send, call): call for call in islice(calls, max_workers)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    call = pending.pop(future)
+                    try:
+                        result: Union[Response, Exception] = future.result()
+                    except Exception as error:  # pylint: disable=broad-except
+                        result = error
+                    yield call, result
+
+                for call in islice(calls, len(done)):
+                    pending[executor.submit(send, call)] = call
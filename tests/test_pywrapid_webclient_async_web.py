@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""Pywrapid async webclient tests"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.token_store as module_3
+import pywrapid.webclient.web as module_2
+
+httpx = pytest.importorskip("httpx")
+
+import pywrapid.webclient.async_web as module_0  # noqa: E402
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def mock_session(handler) -> "httpx.AsyncClient":  # type: ignore[no-untyped-def]
+    """httpx client answering requests with handler"""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_case_0() -> None:
+    """AsyncWebClient type and pool limits"""
+    dict_0 = {"client_options": {"max_connections": 2000, "max_keepalive_connections": 50}}
+    async_web_client_0 = module_0.AsyncWebClient(dict_config=dict_0)
+    assert (
+        f"{type(async_web_client_0).__module__}.{type(async_web_client_0).__qualname__}"
+        == "pywrapid.webclient.async_web.AsyncWebClient"
+    )
+    assert isinstance(async_web_client_0, module_2.WebClientBase)
+    assert async_web_client_0._request_options({}) == {}
+
+
+@pytest.mark.asyncio
+async def test_case_1() -> None:
+    """OAuth2 session generated before the request"""
+    token_0 = {"access_token": "abc", "expires_in": 3600, "refresh_token": "def"}
+
+    def handler(request: "httpx.Request") -> "httpx.Response":
+        if request.url.path == "/login":
+            return httpx.Response(200, json=token_0)
+        return httpx.Response(200, json={"auth": request.headers["Authorization"]})
+
+    credentials_0 = module_2.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    async with module_0.AsyncWebClient(
+        authorization_type=module_2.AuthorizationType.OAUTH2, credentials=credentials_0
+    ) as async_web_client_0:
+        await async_web_client_0._session.aclose()
+        async_web_client_0._session = mock_session(handler)
+        assert async_web_client_0.session_expired()
+        response_0 = await async_web_client_0.call("GET", "https://example.com/data")
+        assert json.loads(response_0.content) == {"auth": "Bearer abc"}
+        assert async_web_client_0._refresh_token == "def"
+        assert not async_web_client_0.session_expired()
+        assert async_web_client_0._access_token_expiry.timestamp() > time.time() + 3000
+
+
+@pytest.mark.asyncio
+async def test_case_2() -> None:
+    """Exception mapping"""
+
+    def handler(request: "httpx.Request") -> "httpx.Response":
+        if request.url.path == "/timeout":
+            raise httpx.ReadTimeout("slow", request=request)
+        return httpx.Response(500)
+
+    async with module_0.AsyncWebClient() as async_web_client_0:
+        await async_web_client_0._session.aclose()
+        async_web_client_0._session = mock_session(handler)
+        response_0 = await async_web_client_0.call(
+            "GET", "https://example.com/", skip_authentication=True
+        )
+        assert response_0.status_code == 500
+        with pytest.raises(module_1.ClientHTTPError):
+            await async_web_client_0.call(
+                "GET", "https://example.com/", raise_for_status=True, skip_authentication=True
+            )
+        with pytest.raises(module_1.ClientTimeout):
+            await async_web_client_0.call(
+                "GET", "https://example.com/timeout", skip_authentication=True
+            )
+
+
+@pytest.mark.asyncio
+async def test_case_3() -> None:
+    """Single-flight token refresh across tasks"""
+    logins_0 = []
+
+    async def handler(request: "httpx.Request") -> "httpx.Response":
+        if request.url.path == "/login":
+            logins_0.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"access_token": "abc", "expires_in": 3600})
+        return httpx.Response(200)
+
+    credentials_0 = module_2.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    async with module_0.AsyncWebClient(
+        authorization_type=module_2.AuthorizationType.OAUTH2, credentials=credentials_0
+    ) as async_web_client_0:
+        await async_web_client_0._session.aclose()
+        async_web_client_0._session = mock_session(handler)
+        await asyncio.gather(
+            *(async_web_client_0.call("GET", "https://example.com/data") for _ in range(10))
+        )
+        assert len(logins_0) == 1
+        assert async_web_client_0.refresh_stats == {"refreshes": 1, "coalesced": 9}
+
+
+@pytest.mark.asyncio
+async def test_case_4() -> None:
+    """Background token refresh task ahead of expiry"""
+
+    def handler(request: "httpx.Request") -> "httpx.Response":
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"access_token": "abc", "expires_in": 4})
+        return httpx.Response(200)
+
+    credentials_0 = module_2.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    dict_0 = {
+        "background_token_refresh": True,
+        "token_refresh_ratio": 0.25,
+        "token_expiry_offset": 0,
+    }
+    async_web_client_0 = module_0.AsyncWebClient(
+        authorization_type=module_2.AuthorizationType.OAUTH2,
+        credentials=credentials_0,
+        dict_config=dict_0,
+    )
+    await async_web_client_0._session.aclose()
+    async_web_client_0._session = mock_session(handler)
+    async with async_web_client_0:
+        await asyncio.sleep(0.2)
+        assert async_web_client_0.refresh_stats["refreshes"] == 1
+        await async_web_client_0.call("GET", "https://example.com/data")
+        await asyncio.sleep(1.2)
+        assert async_web_client_0.refresh_stats == {"refreshes": 2, "coalesced": 0}
+    assert async_web_client_0._refresh_task is None
+
+
+class KeyLock:
+    """Lock context not released by garbage collection"""
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self.lock = lock
+
+    def __enter__(self) -> None:
+        self.lock.acquire()  # pylint: disable=consider-using-with
+
+    def __exit__(self, *args: object) -> None:
+        self.lock.release()
+
+
+class KeyLockTokenStore(module_3.MemoryTokenStore):
+    """Memory token store with a single renewal lock"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.key_lock = threading.Lock()
+
+    def lock(self, key: str, timeout: object = None) -> KeyLock:  # type: ignore[override]
+        return KeyLock(self.key_lock)
+
+
+@pytest.mark.asyncio
+async def test_case_5() -> None:
+    """Token store lock taken for a cancelled task is released"""
+    token_store_0 = KeyLockTokenStore()
+    async with module_0.AsyncWebClient(token_store=token_store_0) as async_web_client_0:
+        with token_store_0.lock(""):
+
+            async def hold() -> None:
+                async with async_web_client_0._token_store_lock():
+                    await asyncio.sleep(5)
+
+            task_0 = asyncio.ensure_future(hold())
+            await asyncio.sleep(0.05)
+            task_0.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task_0
+        await asyncio.sleep(0.1)
+        assert token_store_0.key_lock.acquire(timeout=1)
+        token_store_0.key_lock.release()
+
+
+@pytest.mark.asyncio
+async def test_case_6() -> None:
+    """Cookies set by responses are not sent with later calls"""
+
+    def handler(request: "httpx.Request") -> "httpx.Response":
+        return httpx.Response(
+            200,
+            headers={"Set-Cookie": "session=abc; Path=/"},
+            text=request.headers.get("Cookie", ""),
+        )
+
+    async with module_0.AsyncWebClient() as async_web_client_0:
+        async_web_client_0._session._transport = httpx.MockTransport(handler)
+        response_0 = await async_web_client_0.call(
+            "GET", "https://example.com/login", skip_authentication=True
+        )
+        assert response_0.cookies["session"] == "abc"
+        response_1 = await async_web_client_0.call(
+            "GET", "https://example.com/data", skip_authentication=True
+        )
+        assert response_1.text == ""
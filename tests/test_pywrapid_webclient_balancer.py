@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""Pywrapid webclient load balancing tests"""
+
+from time import monotonic, sleep
+
+import pytest
+import responses
+
+import pywrapid.webclient.balancer as module_0
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+ENDPOINTS = ["https://a.example.com", "https://b.example.com/"]
+
+
+def test_case_0() -> None:
+    """Strategies pick endpoints in turn, by requests in flight and by latency"""
+    load_balancer_0 = module_0.LoadBalancer(ENDPOINTS)
+    list_0 = [load_balancer_0.acquire().url for _ in range(4)]
+    assert list_0 == ["https://a.example.com", "https://b.example.com"] * 2
+    assert load_balancer_0.url("/items?a=1", load_balancer_0.endpoints[1]) == (
+        "https://b.example.com/items?a=1"
+    )
+    assert load_balancer_0.url("https://a.example.com/items", load_balancer_0.endpoints[1]) == (
+        "https://b.example.com/items"
+    )
+    assert load_balancer_0.balances("https://b.example.com?a=1")
+    assert not load_balancer_0.balances("https://a.example.com.evil/items")
+
+    load_balancer_1 = module_0.LoadBalancer(ENDPOINTS, strategy="least_outstanding")
+    endpoint_0 = load_balancer_1.acquire()
+    assert load_balancer_1.acquire() is not endpoint_0
+    load_balancer_1.release(endpoint_0, 0.1, False)
+    assert load_balancer_1.acquire() is endpoint_0
+
+    load_balancer_2 = module_0.LoadBalancer(ENDPOINTS, strategy="ewma")
+    endpoint_1, endpoint_2 = load_balancer_2.endpoints
+    endpoint_1.ewma, endpoint_2.ewma = 0.5, 0.1
+    assert {load_balancer_2.acquire().url for _ in range(3)} == {endpoint_2.url}
+    with pytest.raises(module_1.ClientError):
+        module_0.LoadBalancer(ENDPOINTS, strategy="random")
+    with pytest.raises(module_1.ClientError):
+        module_0.LoadBalancer([])
+
+
+def test_case_1() -> None:
+    """Failing endpoints are ejected and return after a successful probe"""
+    list_0 = []
+
+    def probe(url: str) -> bool:
+        list_0.append(url)
+        return len(list_0) > 1
+
+    load_balancer_0 = module_0.LoadBalancer(
+        ENDPOINTS, failure_threshold=1, probe_interval=0.01, probe=probe
+    )
+    endpoint_0 = load_balancer_0.acquire()
+    load_balancer_0.release(endpoint_0, 0.1, True)
+    assert not endpoint_0.healthy
+    assert {load_balancer_0.acquire().url for _ in range(3)} == {"https://b.example.com"}
+    deadline = monotonic() + 5
+    while not endpoint_0.healthy and monotonic() < deadline:
+        sleep(0.01)
+    assert list_0[:2] == ["https://a.example.com"] * 2
+    assert load_balancer_0.stats["https://a.example.com"]["ejections"] == 1
+    assert load_balancer_0.stats["https://a.example.com"]["healthy"]
+    load_balancer_0.close()
+
+
+@responses.activate
+def test_case_2() -> None:
+    """WebClient spreads paths over endpoints and stops using failing ones"""
+    responses.add(responses.GET, "https://a.example.com/items", status=503)
+    responses.add(responses.GET, "https://b.example.com/items", json={"items": []})
+    web_client_0 = module_2.WebClient(
+        dict_config={"load_balancer": {"endpoints": ENDPOINTS, "failure_threshold": 1}}
+    )
+    list_0 = [
+        web_client_0.call("GET", "/items", skip_authentication=True).status_code for _ in range(4)
+    ]
+    assert list_0 == [503, 200, 200, 200]
+    dict_0 = web_client_0.endpoint_stats
+    assert dict_0["https://a.example.com"]["healthy"] is False
+    assert dict_0["https://b.example.com"]["requests"] == 3
+    web_client_0.close()
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Requests stopped before they are sent leave no outcome on the endpoint"""
+    responses.add(responses.GET, "https://a.example.com/items", status=503)
+    web_client_0 = module_2.WebClient(
+        dict_config={
+            "load_balancer": {"endpoints": ENDPOINTS[:1], "failure_threshold": 1},
+            "rate_limit": {"block": False, "default": {"rate": 0.01, "burst": 1}},
+        }
+    )
+    response_0 = web_client_0.call("GET", "/items", skip_authentication=True)
+    assert response_0.status_code == 503
+    dict_0 = web_client_0.endpoint_stats["https://a.example.com"]
+    assert not dict_0["healthy"]
+    with pytest.raises(module_1.ClientRateLimitError):
+        web_client_0.call("GET", "/items", skip_authentication=True)
+    dict_1 = web_client_0.endpoint_stats["https://a.example.com"]
+    assert dict_1 == dict_0
+    assert dict_1["outstanding"] == 0
+    assert dict_1["requests"] == 1
+    web_client_0.close()
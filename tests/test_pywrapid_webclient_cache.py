@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""Pywrapid webclient response cache tests"""
+
+from pathlib import Path
+
+import responses
+
+import pywrapid.webclient.cache as module_0
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Cache-Control parsing"""
+    dict_0 = module_0.cache_control({"Cache-Control": 'public, Max-Age=60, no-cache="x"'})
+    assert dict_0 == {"public": True, "max-age": "60", "no-cache": "x"}
+    assert module_0.cache_control({}) == {}
+
+
+def test_case_1() -> None:
+    """LRU eviction by size"""
+    response_cache_0 = module_0.ResponseCache(max_bytes=250)
+    for str_0 in ("a", "b", "c"):
+        response_cache_0.set(str_0, module_0.CachedResponse(200, {}, b"x" * 100))
+    assert response_cache_0.get("a") is None
+    assert response_cache_0.get("b") is not None
+    response_cache_0.set("d", module_0.CachedResponse(200, {}, b"x" * 100))
+    assert response_cache_0.get("c") is None
+    assert response_cache_0.stats["evictions"] == 2
+    assert response_cache_0.stats["bytes"] == 200
+    response_cache_0.set("e", module_0.CachedResponse(200, {}, b"x" * 300))
+    assert response_cache_0.get("e") is None
+
+
+def test_case_2(tmp_path: Path) -> None:
+    """Disk tier survives the memory tier"""
+    response_cache_0 = module_0.ResponseCache(max_bytes=10, path=str(tmp_path))
+    cached_response_0 = module_0.CachedResponse(
+        200, {"ETag": '"1"'}, b"content", url="https://example.com/", encoding="utf-8"
+    )
+    response_cache_0.set("key", cached_response_0)
+    response_cache_1 = module_0.ResponseCache(path=str(tmp_path))
+    response_0 = response_cache_1.get("key").response()
+    assert response_0.text == "content"
+    assert response_0.headers["etag"] == '"1"'
+    assert response_0.url == "https://example.com/"
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Fresh responses served from cache"""
+    responses.add(
+        responses.GET,
+        "https://example.com/ref",
+        json={"ref": 1},
+        headers={"Cache-Control": "max-age=60"},
+    )
+    responses.add(
+        responses.GET,
+        "https://example.com/live",
+        json={"live": 1},
+        headers={"Cache-Control": "no-store"},
+    )
+    web_client_0 = module_1.WebClient(dict_config={"response_cache": {}})
+    for _ in range(3):
+        response_0 = web_client_0.call("GET", "https://example.com/ref", skip_authentication=True)
+        assert response_0.json() == {"ref": 1}
+        web_client_0.call("GET", "https://example.com/live", skip_authentication=True)
+    web_client_0.call("GET", "https://example.com/ref", params={"a": 1}, skip_authentication=True)
+    assert len(responses.calls) == 5
+    assert web_client_0.cache_stats["hits"] == 2
+    assert web_client_0.cache_stats["misses"] == 5
+    assert web_client_0.cache_stats["stores"] == 2
+
+
+@responses.activate
+def test_case_4() -> None:
+    """Stale responses revalidated with ETag"""
+    responses.add(
+        responses.GET,
+        "https://example.com/ref",
+        json={"ref": 1},
+        headers={"ETag": '"v1"', "Cache-Control": "no-cache"},
+    )
+    responses.add(responses.GET, "https://example.com/ref", status=304)
+    web_client_0 = module_1.WebClient(dict_config={"response_cache": {"max_bytes": 1024}})
+    web_client_0.call("GET", "https://example.com/ref", skip_authentication=True)
+    response_0 = web_client_0.call("GET", "https://example.com/ref", skip_authentication=True)
+    assert response_0.status_code == 200
+    assert response_0.json() == {"ref": 1}
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert web_client_0.cache_stats["revalidations"] == 1
+    assert module_1.WebClient().cache_stats == {}
+
+
+@responses.activate
+def test_case_5() -> None:
+    """Calls with other credentials do not share cached responses"""
+
+    def callback(request):  # type: ignore[no-untyped-def]
+        return 200, {"Cache-Control": "max-age=60"}, request.headers["Authorization"]
+
+    responses.add_callback(responses.GET, "https://example.com/me", callback=callback)
+    web_client_0 = module_1.WebClient(dict_config={"response_cache": {}})
+    for str_0 in ("Bearer alice", "Bearer bob", "Bearer alice"):
+        response_0 = web_client_0.call(
+            "GET",
+            "https://example.com/me",
+            headers={"Authorization": str_0},
+            skip_authentication=True,
+        )
+        assert response_0.text == str_0
+    assert len(responses.calls) == 2
+    str_1 = module_0.ResponseCache.key("GET", "https://example.com/me", {"auth": ("a", "b")})
+    assert str_1 != module_0.ResponseCache.key("GET", "https://example.com/me", {})
+    dict_0 = {"headers": {"Authorization": "Bearer own"}}
+    assert module_0.ResponseCache.key(
+        "GET", "https://example.com/me", dict_0, "id", "Bearer own"
+    ) == (module_0.ResponseCache.key("GET", "https://example.com/me", {}, "id"))
+
+
+def test_case_6(tmp_path: Path) -> None:
+    """Cached responses can be iterated and the disk tier is limited by size"""
+    response_0 = module_0.CachedResponse(200, {}, b"a\nb").response()
+    assert list(response_0.iter_lines()) == [b"a", b"b"]
+    assert b"".join(response_0.iter_content(1)) == b"a\nb"
+    response_cache_0 = module_0.ResponseCache(max_bytes=0, path=str(tmp_path), disk_max_bytes=650)
+    for str_0 in ("a", "b", "c"):
+        response_cache_0.set(str_0, module_0.CachedResponse(200, {}, b"x" * 100))
+    assert response_cache_0.get("a") is not None
+    response_cache_0.set("d", module_0.CachedResponse(200, {}, b"x" * 100))
+    assert response_cache_0.get("b") is None
+    assert response_cache_0.stats["disk_entries"] == 3
+    assert response_cache_0.stats["disk_bytes"] <= 650
+    response_cache_1 = module_0.ResponseCache(path=str(tmp_path), disk_max_bytes=450)
+    assert response_cache_1.stats["disk_entries"] == 2
+    assert response_cache_1.get("c") is None
+    assert response_cache_1.get("a") is not None
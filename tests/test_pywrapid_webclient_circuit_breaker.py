@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""Pywrapid webclient circuit breaker tests"""
+
+import asyncio
+import time
+
+import pytest
+import responses
+
+import pywrapid.webclient.circuit_breaker as module_0
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Error rate opens, probe closes"""
+    circuit_breaker_0 = module_0.CircuitBreaker(
+        failure_rate=0.5, window=4, minimum_calls=4, open_duration=0.05
+    )
+    for bool_0 in (False, True, False, False):
+        assert circuit_breaker_0.allow()
+        circuit_breaker_0.record(bool_0)
+    assert circuit_breaker_0.state == module_0.CircuitState.CLOSED
+    circuit_breaker_0.record(True)
+    assert circuit_breaker_0.state == module_0.CircuitState.OPEN
+    assert not circuit_breaker_0.allow()
+    time.sleep(0.06)
+    assert circuit_breaker_0.state == module_0.CircuitState.HALF_OPEN
+    assert circuit_breaker_0.allow()
+    assert not circuit_breaker_0.allow()
+    circuit_breaker_0.record(False)
+    assert circuit_breaker_0.state == module_0.CircuitState.CLOSED
+    assert circuit_breaker_0.stats == {
+        "state": "CLOSED",
+        "calls": 0,
+        "failed": 0,
+        "slow": 0,
+        "rejected": 2,
+    }
+
+
+def test_case_1() -> None:
+    """Slow calls open, failed probe reopens"""
+    circuit_breaker_0 = module_0.CircuitBreaker(
+        slow_call_duration=1, slow_call_rate=0.5, minimum_calls=2, open_duration=0
+    )
+    circuit_breaker_0.record(False, 2)
+    circuit_breaker_0.record(False, 0.1)
+    assert circuit_breaker_0._state == module_0.CircuitState.OPEN
+    assert circuit_breaker_0.allow()
+    circuit_breaker_0.record(True)
+    assert circuit_breaker_0._state == module_0.CircuitState.OPEN
+
+
+@responses.activate
+def test_case_2() -> None:
+    """Client fails fast while the circuit is open"""
+    responses.add(responses.GET, "https://example.com/data", status=503)
+    responses.add(responses.GET, "https://other.example.com/data")
+    dict_0 = {"circuit_breaker": {"minimum_calls": 2, "open_duration": 60}}
+    web_client_0 = module_2.WebClient(dict_config=dict_0)
+    for _ in range(2):
+        web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    with pytest.raises(module_1.ClientCircuitOpenError):
+        web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    web_client_0.call("GET", "https://other.example.com/data", skip_authentication=True)
+    assert len(responses.calls) == 3
+    assert web_client_0.circuit_stats["https://example.com"]["state"] == "OPEN"
+    assert web_client_0.circuit_stats["https://other.example.com"]["state"] == "CLOSED"
+
+
+@pytest.mark.asyncio
+async def test_case_3() -> None:
+    """Probe slots of cancelled calls are given back"""
+    httpx = pytest.importorskip("httpx")
+    import pywrapid.webclient.async_web as module_3  # pylint: disable=import-outside-toplevel
+
+    async def handler(request: "httpx.Request") -> "httpx.Response":
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    dict_0 = {"circuit_breaker": {"open_duration": 0.01}}
+    async with module_3.AsyncWebClient(dict_config=dict_0) as async_web_client_0:
+        await async_web_client_0._session.aclose()
+        async_web_client_0._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        circuit_breaker_0 = async_web_client_0._circuit_breakers.breaker("https://example.com/")
+        circuit_breaker_0._open()
+        await asyncio.sleep(0.02)
+        for _ in range(2):
+            with pytest.raises(module_1.ClientTimeout):
+                await async_web_client_0.call(
+                    "GET", "https://example.com/", skip_authentication=True, deadline=0.05
+                )
+        assert circuit_breaker_0.state == module_0.CircuitState.HALF_OPEN
+        assert circuit_breaker_0.allow()
+        circuit_breaker_0.release()
+        assert circuit_breaker_0.stats["rejected"] == 0
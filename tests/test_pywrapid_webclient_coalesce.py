@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""Pywrapid webclient request coalescing tests"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+
+import pytest
+import responses
+from requests import Response
+
+import pywrapid.webclient.coalesce as module_0
+import pywrapid.webclient.exceptions as module_2
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def wait_for(condition: object, timeout: float = 5) -> None:
+    """Poll a condition until it holds"""
+    deadline = monotonic() + timeout
+    while not condition() and monotonic() < deadline:  # type: ignore[operator]
+        sleep(0.01)
+
+
+def test_case_0() -> None:
+    """Keys ignore ignored headers and the own token, bodies and streams are not coalesced"""
+    request_coalescer_0 = module_0.RequestCoalescer(ignore_headers=["X-Request-Id"])
+    str_0 = request_coalescer_0.key(
+        "get",
+        "https://example.com",
+        {"headers": {"Authorization": "a", "X-Request-Id": "1"}},
+        "id",
+        "a",
+    )
+    str_1 = request_coalescer_0.key(
+        "GET", "https://example.com", {"headers": {"X-Request-Id": "2"}}, "id", "b"
+    )
+    assert str_0 == str_1
+    assert str_0 != request_coalescer_0.key(
+        "GET", "https://example.com", {"headers": {"authorization": "b"}}, "id", "a"
+    )
+    assert str_0 != request_coalescer_0.key(
+        "GET", "https://example.com", {"cookies": {"session": "1"}}, "id"
+    )
+    assert str_0 != request_coalescer_0.key("GET", "https://example.com", {"params": {"a": 1}})
+    assert str_0 != request_coalescer_0.key("GET", "https://example.com", {}, "other")
+    assert request_coalescer_0.coalescable("GET", {"params": {"a": 1}})
+    assert not request_coalescer_0.coalescable("POST", {})
+    assert not request_coalescer_0.coalescable("GET", {"stream": True})
+    assert not request_coalescer_0.coalescable("GET", {"data": b"body"})
+
+
+def test_case_1() -> None:
+    """Waiting callers get the exception of the shared request"""
+    request_coalescer_0 = module_0.RequestCoalescer()
+    event_0 = threading.Event()
+
+    def request() -> object:
+        event_0.wait(5)
+        raise ConnectionError("refused")
+
+    with ThreadPoolExecutor(max_workers=3) as executor_0:
+        futures_0 = [executor_0.submit(request_coalescer_0.send, "key", request) for _ in range(3)]
+        wait_for(lambda: request_coalescer_0.stats["coalesced"] == 2)
+        event_0.set()
+        for future_0 in futures_0:
+            with pytest.raises(ConnectionError):
+                future_0.result()
+    assert request_coalescer_0.stats == {"requests": 1, "coalesced": 2, "in_flight": 0}
+
+
+@responses.activate
+def test_case_2() -> None:
+    """Concurrent identical calls share one upstream request"""
+    web_client_0 = module_1.WebClient(dict_config={"coalescing": {}})
+    event_0 = threading.Event()
+
+    def callback(request: object) -> tuple:
+        event_0.wait(5)
+        return 200, {"Content-Type": "application/json"}, '{"a": 1}'
+
+    responses.add_callback(responses.GET, "https://example.com/items", callback=callback)
+
+    def call() -> object:
+        return web_client_0.call("GET", "https://example.com/items", skip_authentication=True)
+
+    with ThreadPoolExecutor(max_workers=5) as executor_0:
+        futures_0 = [executor_0.submit(call) for _ in range(5)]
+        wait_for(lambda: web_client_0.coalesce_stats["coalesced"] == 4)
+        event_0.set()
+        list_0 = [future_0.result() for future_0 in futures_0]
+
+    assert len(responses.calls) == 1
+    assert [response_0.json() for response_0 in list_0] == [{"a": 1}] * 5
+    assert len({id(response_0) for response_0 in list_0}) == 5
+    assert len({id(response_0.headers) for response_0 in list_0}) == 5
+    web_client_0.call("GET", "https://example.com/items", skip_authentication=True)
+    assert len(responses.calls) == 2
+    assert module_1.WebClient().coalesce_stats == {}
+
+
+def test_case_3() -> None:
+    """Waiting callers send again when the shared request times out for its sender"""
+    request_coalescer_0 = module_0.RequestCoalescer()
+    event_0 = threading.Event()
+
+    def leader() -> object:
+        event_0.wait(5)
+        raise module_2.ClientTimeout("Deadline of the leader exceeded")
+
+    response_0 = Response()
+    response_0.status_code = 200
+
+    def follower() -> object:
+        return response_0
+
+    with ThreadPoolExecutor(max_workers=2) as executor_0:
+        future_0 = executor_0.submit(request_coalescer_0.send, "key", leader)
+        wait_for(lambda: request_coalescer_0.stats["in_flight"] == 1)
+        future_1 = executor_0.submit(request_coalescer_0.send, "key", follower)
+        wait_for(lambda: request_coalescer_0.stats["coalesced"] == 1)
+        event_0.set()
+        with pytest.raises(module_2.ClientTimeout):
+            future_0.result()
+        assert future_1.result() is response_0
+    assert request_coalescer_0.stats == {"requests": 2, "coalesced": 1, "in_flight": 0}
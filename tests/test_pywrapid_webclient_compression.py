@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Pywrapid webclient request compression tests"""
+
+import gzip
+import io
+import json
+import zlib
+
+import pytest
+import responses
+
+import pywrapid.webclient.compression as module_0
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.upload as module_2
+import pywrapid.webclient.web as module_3
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Bodies above min_size are compressed and small or form bodies are left as is"""
+    request_compressor_0 = module_0.RequestCompressor(min_size=16)
+    bytes_0 = b"a" * 64
+    dict_0 = request_compressor_0.apply({"data": bytes_0, "headers": {"X-Id": "1"}})
+    assert gzip.decompress(dict_0["data"]) == bytes_0
+    assert dict_0["headers"] == {"X-Id": "1", "Content-Encoding": "gzip"}
+    dict_1 = request_compressor_0.apply({"json": {"items": list(range(20))}})
+    assert "json" not in dict_1
+    assert json.loads(gzip.decompress(dict_1["data"])) == {"items": list(range(20))}
+    assert dict_1["headers"]["Content-Type"] == "application/json"
+    dict_2 = {"data": b"small"}
+    assert request_compressor_0.apply(dict_2) is dict_2
+    dict_3 = {"data": {"field": "a" * 64}}
+    assert request_compressor_0.apply(dict_3) is dict_3
+    dict_4 = {"data": bytes_0, "headers": {"content-encoding": "identity"}}
+    assert request_compressor_0.apply(dict_4) is dict_4
+    assert zlib.decompress(module_0.compress(bytes_0, "deflate")) == bytes_0
+    with pytest.raises(module_1.ClientError):
+        module_0.RequestCompressor("lzma")
+
+
+def test_case_1() -> None:
+    """Upload bodies are compressed while streaming and rewind their source"""
+    bytes_0 = b"0123456789" * 1000
+    upload_body_0 = module_2.UploadBody(io.BytesIO(bytes_0), chunk_size=1024)
+    dict_0 = module_0.RequestCompressor(min_size=16).apply({"data": upload_body_0})
+    compressed_body_0 = dict_0["data"]
+    assert isinstance(compressed_body_0, module_0.CompressedBody)
+    assert compressed_body_0.length is None
+    assert gzip.decompress(b"".join(compressed_body_0)) == bytes_0
+    assert compressed_body_0.rewind()
+    assert gzip.decompress(b"".join(compressed_body_0)) == bytes_0
+    dict_1 = {"data": module_2.MultipartUpload({"file": ("a.txt", bytes_0)})}
+    assert module_0.RequestCompressor(min_size=16).apply(dict_1) is dict_1
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_case_2(encoding: str) -> None:
+    """Brotli and zstd compression with the optional codecs installed"""
+    if encoding not in module_0.available_encodings():
+        with pytest.raises(module_0.DependencyError):
+            module_0.RequestCompressor(encoding)
+        return
+    bytes_0 = b"0123456789" * 1000
+    compressed_body_0 = module_0.CompressedBody(
+        module_2.UploadBody(iter([bytes_0[:5000], bytes_0[5000:]])), encoding
+    )
+    bytes_1 = b"".join(compressed_body_0)
+    if encoding == "br":
+        assert module_0.brotli.decompress(bytes_1) == bytes_0
+    else:
+        assert module_0.zstandard.ZstdDecompressor().decompressobj().decompress(bytes_1) == bytes_0
+
+
+@responses.activate
+def test_case_3() -> None:
+    """WebClient compresses request bodies and sends the configured Accept-Encoding"""
+    responses.add(responses.POST, "https://example.com/items", json={})
+    web_client_0 = module_3.WebClient(
+        dict_config={
+            "compression": {
+                "request_encoding": "gzip",
+                "min_size": 16,
+                "accept_encoding": "gzip",
+            }
+        }
+    )
+    web_client_0.call(
+        "POST", "https://example.com/items", json={"a": "b" * 64}, skip_authentication=True
+    )
+    web_client_0.call("POST", "https://example.com/items", data=b"small", skip_authentication=True)
+    request_0 = responses.calls[0].request
+    assert request_0.headers["Content-Encoding"] == "gzip"
+    assert request_0.headers["Accept-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(request_0.body)) == {"a": "b" * 64}
+    request_1 = responses.calls[1].request
+    assert "Content-Encoding" not in request_1.headers
+    assert request_1.body == b"small"
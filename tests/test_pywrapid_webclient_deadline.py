@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""Pywrapid webclient call deadline tests"""
+
+import asyncio
+import json
+import time
+
+import pytest
+import responses
+
+import pywrapid.webclient.deadline as module_0
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.token_store as module_4
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Request timeouts are limited to the time left and expiry raises"""
+    deadline_0 = module_0.Deadline(10)
+    assert 9 < deadline_0.timeout() <= 10
+    assert deadline_0.timeout(2) == 2
+    float_0, float_1 = deadline_0.timeout((1, None))
+    assert float_0 == 1
+    assert 9 < float_1 <= 10
+    assert deadline_0.allows(5)
+    assert not deadline_0.allows(20)
+
+    deadline_1 = module_0.Deadline(0.01)
+    time.sleep(0.02)
+    assert deadline_1.remaining() == 0
+    with pytest.raises(module_1.ClientTimeout):
+        deadline_1.check("in test")
+    with pytest.raises(module_1.ClientTimeout):
+        deadline_1.timeout(5)
+
+
+@responses.activate
+def test_case_1() -> None:
+    """Retries whose backoff would exceed the deadline are not attempted"""
+    responses.add(
+        responses.GET, "https://example.com/data", status=503, headers={"Retry-After": "2"}
+    )
+    web_client_0 = module_2.WebClient(dict_config={"retry": {"max_attempts": 5}})
+    float_0 = time.monotonic()
+    response_0 = web_client_0.call(
+        "GET", "https://example.com/data", skip_authentication=True, deadline=0.5
+    )
+    assert response_0.status_code == 503
+    assert len(responses.calls) == 1
+    assert time.monotonic() - float_0 < 0.5
+
+
+@responses.activate
+def test_case_2() -> None:
+    """Authentication counts against the deadline of the call"""
+
+    def login(request):  # type: ignore[no-untyped-def]
+        time.sleep(0.3)
+        return 200, {}, json.dumps({"access_token": "abc", "expires_in": 3600})
+
+    responses.add_callback(responses.POST, "https://example.com/login", callback=login)
+    responses.add(responses.GET, "https://example.com/data")
+    credentials_0 = module_2.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    web_client_0 = module_2.WebClient(
+        authorization_type=module_2.AuthorizationType.OAUTH2, credentials=credentials_0
+    )
+    with pytest.raises(module_1.ClientTimeout):
+        web_client_0.call("GET", "https://example.com/data", deadline=0.2)
+    assert not [call for call in responses.calls if call.request.url.endswith("/data")]
+    response_0 = web_client_0.call("GET", "https://example.com/data", deadline=5)
+    assert response_0.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_case_3() -> None:
+    """Async calls are cancelled when the deadline is exceeded"""
+    httpx = pytest.importorskip("httpx")
+    import pywrapid.webclient.async_web as module_3  # pylint: disable=import-outside-toplevel
+
+    async def handler(request: "httpx.Request") -> "httpx.Response":
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    async with module_3.AsyncWebClient() as async_web_client_0:
+        await async_web_client_0._session.aclose()
+        async_web_client_0._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with pytest.raises(module_1.ClientTimeout):
+            await async_web_client_0.call(
+                "GET", "https://example.com/data", skip_authentication=True, deadline=0.05
+            )
+
+
+def test_case_4() -> None:
+    """Waiting for a token renewal held by another client is limited by the deadline"""
+    token_store_0 = module_4.MemoryTokenStore()
+    credentials_0 = module_2.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    web_client_0 = module_2.WebClient(
+        authorization_type=module_2.AuthorizationType.OAUTH2,
+        credentials=credentials_0,
+        token_store=token_store_0,
+    )
+    with token_store_0.lock(web_client_0._token_key):
+        float_0 = time.monotonic()
+        with pytest.raises(module_1.ClientTimeout):
+            web_client_0.call("GET", "https://example.com/data", deadline=0.2)
+        assert time.monotonic() - float_0 < 1
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Pywrapid webclient json decoding tests"""
+
+import pytest
+import responses
+from requests import Response
+
+import pywrapid.webclient.decoding as module_0
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def build_response(content: bytes, encoding: str = "utf-8") -> Response:
+    """requests response with a body"""
+    response = Response()
+    response.status_code = 200
+    response._content = content
+    response.encoding = encoding
+    return response
+
+
+def test_case_0() -> None:
+    """Backends resolve by name and auto picks an installed backend"""
+    assert module_0.json_backend("json")[0] == "json"
+    assert module_0.json_backend()[0] in module_0.JSON_BACKENDS
+    with pytest.raises(module_1.ClientError):
+        module_0.json_backend("simplejson")
+
+
+def test_case_1() -> None:
+    """Bodies are decoded once per response"""
+    list_0 = []
+
+    def loads(data: object) -> object:
+        list_0.append(data)
+        return module_0.json.loads(data)
+
+    json_decoder_0 = module_0.JSONDecoder("json")
+    json_decoder_0.loads = loads
+    response_0 = build_response(b'{"a": [1, 2]}')
+    dict_0 = json_decoder_0.decode(response_0)
+    assert json_decoder_0.decode(response_0) is dict_0
+    assert module_0.response_json(response_0) is dict_0
+    assert list_0 == [b'{"a": [1, 2]}']
+    response_1 = build_response('{"a": "å"}'.encode("latin-1"), "ISO-8859-1")
+    assert json_decoder_0.decode(response_1) == {"a": "å"}
+    with pytest.raises(ValueError):
+        json_decoder_0.decode(build_response(b"{"))
+
+
+@pytest.mark.asyncio
+async def test_case_2() -> None:
+    """Large bodies are decoded in a worker thread"""
+    httpx = pytest.importorskip("httpx")
+    json_decoder_0 = module_0.JSONDecoder(offload_size=8)
+    response_0 = httpx.Response(200, content=b'{"items": [1, 2, 3]}')
+    assert await json_decoder_0.decode_async(response_0) == {"items": [1, 2, 3]}
+    assert response_0._pywrapid_json == {"items": [1, 2, 3]}
+    response_1 = httpx.Response(200, content=b"[]")
+    assert await json_decoder_0.decode_async(response_1) == []
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Client decodes with the configured backend"""
+    responses.add(responses.GET, "https://example.com/data", json={"a": 1})
+    responses.add(responses.GET, "https://example.com/text", body="not json")
+    web_client_0 = module_2.WebClient(dict_config={"json_backend": "json"})
+    assert web_client_0._json_decoder.backend == "json"
+    response_0 = web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    assert web_client_0.json(response_0) == {"a": 1}
+    response_1 = web_client_0.call("GET", "https://example.com/text", skip_authentication=True)
+    with pytest.raises(module_1.ClientError):
+        web_client_0.json(response_1)
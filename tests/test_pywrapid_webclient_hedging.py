@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""Pywrapid webclient request hedging tests"""
+
+import threading
+from time import sleep
+
+import pytest
+import responses
+from requests import ConnectionError as RequestsConnectionError
+from requests import Response
+
+import pywrapid.webclient.deadline as module_2
+import pywrapid.webclient.hedging as module_0
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def build_response(status_code: int) -> Response:
+    """requests response with a status"""
+    response = Response()
+    response.status_code = status_code
+    return response
+
+
+def test_case_0() -> None:
+    """Slow requests are hedged and the first response wins"""
+    request_hedger_0 = module_0.RequestHedger(delay=0.05)
+    list_0 = [3, 0]
+    event_0 = threading.Event()
+
+    def request() -> Response:
+        delay = list_0.pop(0)
+        event_0.wait(delay)
+        return build_response(200 if delay == 0 else 504)
+
+    assert request_hedger_0.send("https://example.com/", request).status_code == 200
+    assert request_hedger_0.stats == {"requests": 1, "hedges": 1, "hedge_wins": 1}
+    assert request_hedger_0.hedge_delay("https://example.com/") == 0.05
+    event_0.set()
+    for _ in range(20):
+        request_hedger_0.observe("https://example.com/", 0.02)
+    assert request_hedger_0.hedge_delay("https://example.com/") == 0.025
+    assert request_hedger_0.hedgeable("GET", {"params": {"a": 1}})
+    assert not request_hedger_0.hedgeable("POST", {})
+    assert not request_hedger_0.hedgeable("GET", {"stream": True})
+    request_hedger_0.close()
+
+
+def test_case_1() -> None:
+    """Fast responses are not hedged, failures wait for the hedge or raise"""
+    request_hedger_0 = module_0.RequestHedger(delay=0.05)
+    assert request_hedger_0.send("https://example.com/", lambda: build_response(200)).ok
+    list_0 = ["slow", "fast"]
+
+    def request() -> Response:
+        if list_0.pop(0) == "slow":
+            sleep(0.1)
+            raise RequestsConnectionError("reset")
+        sleep(0.2)
+        return build_response(200)
+
+    assert request_hedger_0.send("https://example.com/", request).ok
+
+    def fail() -> Response:
+        raise RequestsConnectionError("refused")
+
+    with pytest.raises(RequestsConnectionError):
+        request_hedger_0.send("https://example.com/", fail)
+    assert request_hedger_0.stats == {"requests": 3, "hedges": 1, "hedge_wins": 1}
+    request_hedger_0.close()
+
+
+@responses.activate
+def test_case_2() -> None:
+    """WebClient hedges to an alternate load balanced endpoint"""
+    event_0 = threading.Event()
+
+    def slow(request: object) -> tuple:
+        event_0.wait(5)
+        return 200, {}, "slow"
+
+    responses.add_callback(responses.GET, "https://a.example.com/items", callback=slow)
+    responses.add(responses.GET, "https://b.example.com/items", body="fast")
+    web_client_0 = module_1.WebClient(
+        dict_config={
+            "hedging": {"delay": 0.05},
+            "load_balancer": {"endpoints": ["https://a.example.com", "https://b.example.com"]},
+        }
+    )
+    response_0 = web_client_0.call("GET", "/items", skip_authentication=True)
+    assert response_0.text == "fast"
+    assert web_client_0.hedge_stats["hedge_wins"] == 1
+    event_0.set()
+    web_client_0.close()
+    assert web_client_0.endpoint_stats["https://a.example.com"]["outstanding"] == 0
+
+
+def test_case_3() -> None:
+    """Hedging is not limited by the pool and skipped when the deadline is too close"""
+    request_hedger_0 = module_0.RequestHedger(delay=0.5, max_workers=1)
+    event_0 = threading.Event()
+    list_0: list = []
+
+    def request() -> Response:
+        list_0.append(threading.current_thread().name)
+        event_0.wait(5)
+        return build_response(200)
+
+    list_1 = [
+        threading.Thread(target=request_hedger_0.send, args=("https://example.com/", request))
+        for _ in range(3)
+    ]
+    for thread_0 in list_1:
+        thread_0.start()
+    sleep(0.2)
+    assert len(list_0) == 3
+    event_0.set()
+    for thread_0 in list_1:
+        thread_0.join()
+    assert request_hedger_0.stats["hedges"] == 0
+
+    list_0.clear()
+    deadline_0 = module_2.Deadline(0.3)
+    assert request_hedger_0.send("https://example.com/", request, deadline_0).ok
+    assert list_0 == [threading.current_thread().name]
+    assert request_hedger_0.stats == {"requests": 3, "hedges": 0, "hedge_wins": 0}
+    request_hedger_0.close()
@@ -0,0 +1,21 @@
+#!/usr/bin/python3
+"""Pywrapid webclient key tests"""
+
+import pywrapid.webclient.keys as module_0
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Request digests tell credentials apart, ignoring the clients own token"""
+    dict_0 = {"params": {"q": 1}, "headers": {"Authorization": "Bearer own"}}
+    str_0 = module_0.request_digest("get", "https://example.com/", dict_0, "id", "Bearer own")
+    assert str_0 == module_0.request_digest(
+        "GET", "https://example.com/", {"params": {"q": 1}}, "id"
+    )
+    assert str_0 != module_0.request_digest(
+        "GET", "https://example.com/", {**dict_0, "auth": ("u", "p")}, "id", "Bearer own"
+    )
+    assert str_0 != module_0.request_digest("GET", "https://example.com/", dict_0, "id")
+    assert "secret" not in module_0.request_credentials({"cookies": {"session": "secret"}})
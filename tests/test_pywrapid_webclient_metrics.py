@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""Pywrapid webclient request metrics tests"""
+
+import pytest
+import responses
+
+import pywrapid.webclient.metrics as module_0
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Histograms count latencies per bucket"""
+    latency_histogram_0 = module_0.LatencyHistogram((0.1, 1))
+    for float_0 in (0.05, 0.05, 0.5, 2):
+        latency_histogram_0.observe(float_0)
+    assert latency_histogram_0.percentile(50) == 0.1
+    assert latency_histogram_0.percentile(75) == 1
+    assert latency_histogram_0.percentile(99) == 2
+    dict_0 = latency_histogram_0.to_dict()
+    assert dict_0["buckets"] == {0.1: 2, 1: 3, "+Inf": 4}
+    assert dict_0["sum"] == pytest.approx(2.6)
+    assert module_0.LatencyHistogram().percentile(99) == 0
+
+
+def test_case_1() -> None:
+    """Timings are aggregated per host and longest matching route"""
+    request_metrics_0 = module_0.RequestMetrics(
+        routes=["https://example.com/api", "https://example.com/api/v2"]
+    )
+    list_0 = []
+    request_metrics_0.add_hook(list_0.append)
+    request_metrics_0.add_hook(lambda timing: 1 / 0)
+    request_timing_0 = module_0.RequestTiming("get", "https://example.com/api/v2/items", 2)
+    request_timing_0.status = 200
+    request_timing_0.total = 0.2
+    request_timing_0.reused = True
+    request_metrics_0.record(request_timing_0)
+    request_timing_1 = module_0.RequestTiming("GET", "https://example.com/other")
+    request_timing_1.error = "ConnectionError"
+    request_metrics_0.record(request_timing_1)
+    assert list_0 == [request_timing_0, request_timing_1]
+    dict_0 = request_metrics_0.stats
+    assert dict_0["hosts"]["example.com"]["requests"] == 2
+    assert dict_0["hosts"]["example.com"]["errors"] == 1
+    assert dict_0["hosts"]["example.com"]["retries"] == 1
+    assert dict_0["hosts"]["example.com"]["reused_connections"] == 1
+    assert list(dict_0["routes"]) == ["https://example.com/api/v2"]
+    assert dict_0["routes"]["https://example.com/api/v2"]["statuses"] == {200: 1}
+    assert request_timing_0.to_dict()["method"] == "GET"
+
+
+@responses.activate
+def test_case_2() -> None:
+    """Client records a timing per attempt"""
+    responses.add(responses.POST, "https://example.com/items", status=503)
+    responses.add(responses.POST, "https://example.com/items", body="created")
+    web_client_0 = module_1.WebClient(
+        dict_config={
+            "metrics": {"routes": ["https://example.com/items"]},
+            "retry": {"max_attempts": 2, "max_backoff": 0, "retry_methods": ["POST"]},
+        }
+    )
+    list_0 = []
+    web_client_0.add_timing_hook(list_0.append)
+    web_client_0.call(
+        "POST",
+        "https://example.com/items",
+        data="abc",
+        hooks={"response": lambda response, **kwargs: None},
+        skip_authentication=True,
+    )
+    assert [timing.status for timing in list_0] == [503, 200]
+    assert [timing.retries for timing in list_0] == [0, 1]
+    assert list_0[1].request_bytes == 3
+    assert list_0[1].response_bytes == 7
+    assert 0 <= list_0[1].ttfb <= list_0[1].total
+    dict_0 = web_client_0.request_stats
+    assert dict_0["routes"]["https://example.com/items"]["total"]["count"] == 2
+    assert module_1.WebClient().request_stats == {}
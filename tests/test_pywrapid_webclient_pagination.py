@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""Pywrapid webclient pagination tests"""
+
+from time import monotonic, sleep
+
+import pytest
+import responses
+from responses import matchers
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.pagination as module_0
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+@responses.activate
+def test_case_0() -> None:
+    """Link header pagination follows rel next until the last page"""
+    responses.add(
+        responses.GET,
+        "https://example.com/items",
+        json=[1, 2],
+        headers={"Link": '<https://example.com/items?page=2>; rel="next"'},
+    )
+    responses.add(
+        responses.GET,
+        "https://example.com/items?page=2",
+        json=[3],
+        match=[matchers.query_param_matcher({"page": "2"})],
+    )
+    web_client_0 = module_2.WebClient()
+    list_0 = list(web_client_0.paginate("https://example.com/items", skip_authentication=True))
+    assert list_0 == [1, 2, 3]
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_case_1() -> None:
+    """Cursor pagination passes the cursor from the body"""
+    responses.add(
+        responses.GET,
+        "https://example.com/items",
+        json={"data": [1, 2], "meta": {"next": "abc"}},
+        match=[matchers.query_param_matcher({})],
+    )
+    responses.add(
+        responses.GET,
+        "https://example.com/items",
+        json={"data": [3], "meta": {"next": None}},
+        match=[matchers.query_param_matcher({"cursor": "abc"})],
+    )
+    paginator_0 = module_0.CursorPaginator(items_key="data", cursor_key="meta.next")
+    web_client_0 = module_2.WebClient()
+    list_0 = web_client_0.paginate(
+        "https://example.com/items", paginator_0, prefetch=False, skip_authentication=True
+    )
+    assert list(list_0) == [1, 2, 3]
+
+
+@responses.activate
+def test_case_2() -> None:
+    """Offset pagination stops at a short page"""
+    for int_0, list_0 in ((0, [1, 2]), (2, [3, 4]), (4, [5])):
+        responses.add(
+            responses.GET,
+            "https://example.com/items",
+            json={"items": list_0},
+            match=[matchers.query_param_matcher({"q": "x", "offset": int_0, "limit": 2})],
+        )
+    paginator_0 = module_0.OffsetPaginator(items_key="items", limit=2)
+    web_client_0 = module_2.WebClient()
+    generator_0 = web_client_0.paginate(
+        "https://example.com/items", paginator_0, params={"q": "x"}, skip_authentication=True
+    )
+    assert next(generator_0) == 1
+    float_0 = monotonic() + 2
+    while len(responses.calls) < 2 and monotonic() < float_0:
+        sleep(0.01)
+    assert len(responses.calls) == 2
+    assert list(generator_0) == [2, 3, 4, 5]
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Page errors are raised from the iteration"""
+    responses.add(responses.GET, "https://example.com/items", json={"items": {}})
+    responses.add(responses.GET, "https://example.com/missing", status=404)
+    web_client_0 = module_2.WebClient()
+    paginator_0 = module_0.OffsetPaginator(items_key="items")
+    with pytest.raises(module_1.ClientError):
+        list(
+            web_client_0.paginate(
+                "https://example.com/items", paginator_0, skip_authentication=True
+            )
+        )
+    with pytest.raises(module_1.ClientHTTPError):
+        list(web_client_0.paginate("https://example.com/missing", skip_authentication=True))
+    assert module_0.json_path({"a": {"b": 1}}, "a.b") == 1
+    assert module_0.json_path({"a": 1}, "a.b") is None
+
+
+@responses.activate
+def test_case_4() -> None:
+    """Relative Link header URLs resolve against the page URL"""
+    responses.add(
+        responses.GET,
+        "https://example.com/api/items",
+        json=[1],
+        headers={"Link": '</api/items?page=2>; rel="next"'},
+        match=[matchers.query_param_matcher({})],
+    )
+    responses.add(
+        responses.GET,
+        "https://example.com/api/items",
+        json=[2],
+        headers={"Link": '<items?page=3>; rel="next"'},
+        match=[matchers.query_param_matcher({"page": "2"})],
+    )
+    responses.add(
+        responses.GET,
+        "https://example.com/api/items",
+        json=[3],
+        match=[matchers.query_param_matcher({"page": "3"})],
+    )
+    web_client_0 = module_2.WebClient()
+    list_0 = list(web_client_0.paginate("https://example.com/api/items", skip_authentication=True))
+    assert list_0 == [1, 2, 3]
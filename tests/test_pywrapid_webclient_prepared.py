@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Pywrapid webclient prepared endpoint tests"""
+
+import pytest
+import responses
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.web as module_0
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+@responses.activate
+def test_case_0() -> None:
+    """Prepared endpoints fill path parameters and merge defaults"""
+    responses.add(responses.GET, "https://example.com/items/a%2Fb", body="ok")
+    web_client_0 = module_0.WebClient(dict_config={"client_options": {"timeout": 5}})
+    prepared_endpoint_0 = web_client_0.prepare(
+        "get",
+        "https://example.com/items/{item_id}",
+        skip_authentication=True,
+        headers={"Accept": "text/plain"},
+    )
+    assert prepared_endpoint_0.fields == ("item_id",)
+    assert prepared_endpoint_0._options == {"timeout": 5}
+    response_0 = prepared_endpoint_0({"item_id": "a/b"}, params={"x": 1})
+    assert response_0.text == "ok"
+    assert responses.calls[0].request.headers["Accept"] == "text/plain"
+    assert responses.calls[0].request.url == "https://example.com/items/a%2Fb?x=1"
+    with pytest.raises(module_1.ClientURLError):
+        prepared_endpoint_0.url()
+    with pytest.raises(module_1.ClientURLError):
+        web_client_0.prepare("GET", "/items/{item_id}")
+
+
+@responses.activate
+def test_case_1() -> None:
+    """Authorization header is swapped when the token changes"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 3600},
+    )
+    responses.add(responses.GET, "https://example.com/data", status=404)
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    web_client_0 = module_0.WebClient(
+        authorization_type=module_0.AuthorizationType.OAUTH2, credentials=credentials_0
+    )
+    prepared_endpoint_0 = web_client_0.prepare("GET", "https://example.com/data")
+    prepared_endpoint_0()
+    dict_0 = prepared_endpoint_0._authorized[1]
+    prepared_endpoint_0()
+    assert prepared_endpoint_0._authorized[1] is dict_0
+    web_client_0._access_token = "def"
+    prepared_endpoint_0(headers={"X-Trace": "1"})
+    prepared_endpoint_0()
+    list_0 = [call.request.headers.get("Authorization") for call in responses.calls[1:]]
+    assert list_0 == ["Bearer abc", "Bearer abc", "Bearer def", "Bearer def"]
+    assert responses.calls[3].request.headers["X-Trace"] == "1"
+    prepared_endpoint_1 = web_client_0.prepare(
+        "GET", "https://example.com/data", raise_for_status=True
+    )
+    with pytest.raises(module_1.ClientHTTPError):
+        prepared_endpoint_1()
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Headers passed to a call are merged with the prepared headers"""
+    responses.add(responses.GET, "https://example.com/items", body="ok")
+    web_client_0 = module_0.WebClient()
+    prepared_endpoint_0 = web_client_0.prepare(
+        "GET",
+        "https://example.com/items",
+        skip_authentication=True,
+        headers={"Accept": "text/plain", "X-Tenant": "a"},
+    )
+    prepared_endpoint_0(headers={"X-Request-Id": "1", "X-Tenant": None})
+    dict_0 = responses.calls[0].request.headers
+    assert dict_0["Accept"] == "text/plain"
+    assert dict_0["X-Request-Id"] == "1"
+    assert "X-Tenant" not in dict_0
+    assert prepared_endpoint_0._headers == {"Accept": "text/plain", "X-Tenant": "a"}
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""Pywrapid webclient rate limiter tests"""
+
+from time import monotonic
+
+import pytest
+import responses
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.rate_limit as module_0
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Blocking reservations return the wait for the next token"""
+    rate_limiter_0 = module_0.RateLimiter(hosts={"example.com": {"rate": 10, "burst": 2}})
+    assert rate_limiter_0.reserve("https://example.com/a") == 0
+    assert rate_limiter_0.reserve("https://example.com/b") == 0
+    assert 0.09 < rate_limiter_0.reserve("https://example.com/c") <= 0.1
+    assert 0.19 < rate_limiter_0.reserve("https://example.com/d") <= 0.2
+    assert rate_limiter_0.reserve("https://other.example.com/") == 0
+
+
+def test_case_1() -> None:
+    """Fail fast takes nothing without tokens in every bucket"""
+    rate_limiter_0 = module_0.RateLimiter(
+        default={"rate": 1, "burst": 5},
+        routes={"https://example.com/search": {"rate": 1}},
+        block=False,
+    )
+    assert rate_limiter_0.reserve("https://example.com/search?q=1") == 0
+    assert rate_limiter_0.reserve("https://example.com/search?q=2") is None
+    assert rate_limiter_0._hosts["example.com"].tokens == pytest.approx(4, abs=0.01)
+    assert rate_limiter_0.reserve("https://example.com/other") == 0
+    assert rate_limiter_0.reserve("https://example.com/search", block=True) > 0
+    with pytest.raises(module_1.ClientError):
+        module_0.RateLimiter(hosts={"example.com": {"rate": 0}})
+
+
+@responses.activate
+def test_case_2() -> None:
+    """Client paces or fails fast"""
+    responses.add(responses.GET, "https://example.com/data")
+    dict_0 = {"rate_limit": {"hosts": {"example.com": {"rate": 20, "burst": 1}}}}
+    web_client_0 = module_2.WebClient(dict_config=dict_0)
+    float_0 = monotonic()
+    for _ in range(3):
+        web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    assert monotonic() - float_0 >= 0.09
+
+    dict_1 = {"rate_limit": {"block": False, "default": {"rate": 1}}}
+    web_client_1 = module_2.WebClient(dict_config=dict_1)
+    web_client_1.call("GET", "https://example.com/data", skip_authentication=True)
+    with pytest.raises(module_1.ClientRateLimitError):
+        web_client_1.call("GET", "https://example.com/data", skip_authentication=True)
+    assert len(responses.calls) == 4
+
+
+def test_case_3() -> None:
+    """Calls rejected by their deadline take no rate limiter tokens"""
+    dict_0 = {"rate_limit": {"hosts": {"example.com": {"rate": 1, "burst": 1}}}}
+    web_client_0 = module_2.WebClient(dict_config=dict_0)
+    rate_limiter_0 = web_client_0._rate_limiter
+    assert rate_limiter_0.reserve("https://example.com/data") == 0
+    for _ in range(3):
+        with pytest.raises(module_1.ClientTimeout):
+            web_client_0.call(
+                "GET", "https://example.com/data", skip_authentication=True, deadline=0.5
+            )
+    assert rate_limiter_0._hosts["example.com"].tokens == pytest.approx(0, abs=0.1)
+    assert 0.9 < rate_limiter_0.reserve("https://example.com/data", max_wait=2) <= 1
+
+
+@responses.activate
+def test_case_4() -> None:
+    """Calls choose to wait for tokens or fail fast"""
+    responses.add(responses.GET, "https://example.com/data")
+    dict_0 = {"rate_limit": {"hosts": {"example.com": {"rate": 20, "burst": 1}}}}
+    web_client_0 = module_2.WebClient(dict_config=dict_0)
+    web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    with pytest.raises(module_1.ClientRateLimitError):
+        web_client_0.call(
+            "GET", "https://example.com/data", skip_authentication=True, rate_limit_block=False
+        )
+
+    dict_1 = {"rate_limit": {"block": False, "hosts": {"example.com": {"rate": 20, "burst": 1}}}}
+    web_client_1 = module_2.WebClient(dict_config=dict_1)
+    for _ in range(2):
+        web_client_1.call(
+            "GET", "https://example.com/data", skip_authentication=True, rate_limit_block=True
+        )
+    assert len(responses.calls) == 3
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""Pywrapid webclient record and replay transport tests"""
+
+import pytest
+import responses
+from requests import ConnectionError as RequestsConnectionError
+from requests import ReadTimeout, Session
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.replay as module_0
+import pywrapid.webclient.standin as module_2
+import pywrapid.webclient.web as module_3
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Exchanges recorded against the stand-in replay without the server"""
+    str_0 = str(tmp_path / "cassette.jsonl")
+    with module_2.StandInServer() as stand_in_server_0:
+        credentials_0 = module_3.OAuth2Credentials(
+            login_url=stand_in_server_0.url + "/login", auth_data={"username": "u"}
+        )
+        dict_0 = {"replay": {"cassette": str_0, "mode": "record"}}
+        with module_3.WebClient(
+            authorization_type=module_3.AuthorizationType.OAUTH2,
+            credentials=credentials_0,
+            dict_config=dict_0,
+        ) as web_client_0:
+            response_0 = web_client_0.call("GET", stand_in_server_0.url + "/data", params={"a": 1})
+        assert stand_in_server_0.stats["logins"] == 1
+
+    dict_1 = {"replay": {"cassette": str_0, "latency": 0.01, "repeat": False}}
+    with module_3.WebClient(
+        authorization_type=module_3.AuthorizationType.OAUTH2,
+        credentials=credentials_0,
+        dict_config=dict_1,
+    ) as web_client_1:
+        response_1 = web_client_1.call("GET", stand_in_server_0.url + "/data?a=1")
+        assert response_1.json() == response_0.json() == {"method": "GET", "path": "/data?a=1"}
+        assert response_1.elapsed.total_seconds() == 0.01
+        assert web_client_1._access_token == web_client_0._access_token
+        with pytest.raises(module_1.ClientError):
+            web_client_1.call("GET", stand_in_server_0.url + "/data?a=1")
+
+
+@responses.activate
+def test_case_1(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Bodies are matched, binary bodies kept and recorded latency replayed"""
+    str_0 = str(tmp_path / "cassette.jsonl.gz")
+    responses.add(responses.POST, "https://example.com/blob", body=b"\xff\x00")
+    responses.add(responses.POST, "https://example.com/blob", body=b"\x01")
+    replay_transport_0 = module_0.ReplayTransport(str_0, mode="record", transport=Session())
+    replay_transport_0.request("POST", "https://example.com/blob", data=b"first")
+    replay_transport_0.request("POST", "https://example.com/blob", data=b"second")
+    replay_transport_0.close()
+
+    replay_transport_1 = module_0.ReplayTransport(str_0, match_body=True, latency="recorded")
+    response_0 = replay_transport_1.request("POST", "https://example.com/blob", data=b"second")
+    assert response_0.content == b"\x01"
+    assert replay_transport_1.request(
+        "POST", "https://example.com/blob", data=b"first"
+    ).content == (b"\xff\x00")
+    with pytest.raises(RequestsConnectionError):
+        replay_transport_1.request("POST", "https://example.com/blob", data=b"third")
+    replay_transport_2 = module_0.ReplayTransport(str_0, latency=1)
+    with pytest.raises(ReadTimeout):
+        replay_transport_2.request("POST", "https://example.com/blob", timeout=0.01)
+    with pytest.raises(module_1.ClientError):
+        module_0.ReplayTransport(str_0, mode="record")
+    with pytest.raises(module_1.ClientError):
+        module_0.ReplayTransport(str(tmp_path / "missing.jsonl"))
+
+
+@responses.activate
+def test_case_2(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Recorded responses are streamed in replay mode"""
+    str_0 = str(tmp_path / "cassette.jsonl")
+    responses.add(responses.GET, "https://example.com/events", body='{"id": 1}\n{"id": 2}\n')
+    with module_3.WebClient(
+        dict_config={"replay": {"cassette": str_0, "mode": "record"}}
+    ) as web_client_0:
+        list_0 = list(
+            web_client_0.stream(
+                "GET", "https://example.com/events", mode="ndjson", skip_authentication=True
+            )
+        )
+    with module_3.WebClient(dict_config={"replay": {"cassette": str_0}}) as web_client_1:
+        list_1 = list(
+            web_client_1.stream(
+                "GET", "https://example.com/events", mode="ndjson", skip_authentication=True
+            )
+        )
+    assert list_0 == list_1 == [{"id": 1}, {"id": 2}]
+    assert len(responses.calls) == 1
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""Pywrapid webclient retry policy tests"""
+
+from email.utils import formatdate
+from time import time
+
+import pytest
+import requests
+import responses
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.retry as module_0
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Full jitter backoff stays under the ceiling"""
+    retry_policy_0 = module_0.RetryPolicy(max_attempts=5, backoff_factor=1, max_backoff=3)
+    for _ in range(50):
+        assert 0 <= retry_policy_0.backoff(1) <= 1
+        assert 0 <= retry_policy_0.backoff(2) <= 2
+        assert 0 <= retry_policy_0.backoff(4) <= 3
+
+
+def test_case_1() -> None:
+    """Retry-After in seconds and as HTTP date"""
+    retry_policy_0 = module_0.RetryPolicy(max_attempts=3, max_retry_after=30)
+    response_0 = requests.Response()
+    response_0.status_code = 429
+    response_0.headers["Retry-After"] = "7"
+    assert retry_policy_0.backoff(1, response_0) == 7
+    response_0.headers["Retry-After"] = formatdate(time() + 20, usegmt=True)
+    assert 15 < retry_policy_0.retry_after(response_0) <= 20
+    assert retry_policy_0.retry_response("GET", 1, response_0)
+    response_0.headers["Retry-After"] = "120"
+    assert not retry_policy_0.retry_response("GET", 1, response_0)
+    response_0.status_code = 502
+    assert retry_policy_0.retry_after(response_0) is None
+
+
+def test_case_2() -> None:
+    """Idempotency and attempt limits"""
+    retry_policy_0 = module_0.RetryPolicy(max_attempts=2)
+    error_0 = requests.ConnectionError()
+    assert retry_policy_0.retry_error("get", 1, error_0)
+    assert not retry_policy_0.retry_error("GET", 2, error_0)
+    assert not retry_policy_0.retry_error("POST", 1, error_0)
+    assert not retry_policy_0.retry_error("GET", 1, requests.TooManyRedirects())
+    assert module_0.RetryPolicy(max_attempts=2, retry_methods=("POST",)).retry_error(
+        "POST", 1, error_0
+    )
+    assert not module_0.RetryPolicy().retry_error("GET", 1, error_0)
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Client retries transient failures"""
+    responses.add(responses.GET, "https://example.com/data", status=503)
+    responses.add(responses.GET, "https://example.com/data", body=requests.ConnectionError())
+    responses.add(responses.GET, "https://example.com/data", json={"ok": True})
+    responses.add(responses.POST, "https://example.com/data", status=503)
+    dict_0 = {"retry": {"max_attempts": 3, "backoff_factor": 0}}
+    web_client_0 = module_2.WebClient(dict_config=dict_0)
+    response_0 = web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    assert response_0.json() == {"ok": True}
+    assert len(responses.calls) == 3
+    with pytest.raises(module_1.ClientHTTPError):
+        web_client_0.call(
+            "POST", "https://example.com/data", raise_for_status=True, skip_authentication=True
+        )
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_case_4() -> None:
+    """Exhausted retries surface the mapped error"""
+    responses.add(responses.GET, "https://example.com/data", body=requests.ConnectTimeout())
+    dict_0 = {"retry": {"max_attempts": 2, "backoff_factor": 0}}
+    web_client_0 = module_2.WebClient(dict_config=dict_0)
+    with pytest.raises(module_1.ClientTimeout):
+        web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    assert len(responses.calls) == 2
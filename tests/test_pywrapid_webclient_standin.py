@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Pywrapid webclient stand-in server tests"""
+
+import pytest
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.standin as module_0
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """OAuth2 login and refresh token grants against the stand-in"""
+    with module_0.StandInServer(username="u", password="p", token_ttl=5) as stand_in_server_0:
+        credentials_0 = module_2.OAuth2Credentials(
+            login_url=stand_in_server_0.url + "/login",
+            token_url=stand_in_server_0.url + "/token",
+            auth_data={"username": "u", "password": "p"},
+        )
+        # Tokens outlived by the expiry offset are renewed on every call
+        web_client_0 = module_2.WebClient(
+            authorization_type=module_2.AuthorizationType.OAUTH2,
+            credentials=credentials_0,
+            dict_config={"token_expiry_offset": 10},
+        )
+        for _ in range(3):
+            response_0 = web_client_0.call("GET", stand_in_server_0.url + "/data?page=1")
+            assert response_0.json() == {"method": "GET", "path": "/data?page=1"}
+        assert stand_in_server_0.stats == {
+            "logins": 1,
+            "refreshes": 2,
+            "requests": 3,
+            "rejected": 0,
+        }
+        web_client_0.close()
+
+        credentials_1 = module_2.OAuth2Credentials(
+            login_url=stand_in_server_0.url + "/login", auth_data={"username": "u"}
+        )
+        web_client_1 = module_2.WebClient(
+            authorization_type=module_2.AuthorizationType.OAUTH2, credentials=credentials_1
+        )
+        with pytest.raises(module_1.ClientAuthenticationError):
+            web_client_1.call("GET", stand_in_server_0.url + "/data")
+        web_client_1.close()
+
+
+def test_case_1() -> None:
+    """JWT from a basic auth login, revoked tokens are rejected"""
+    with module_0.StandInServer(
+        username="u", password="p", payload={"items": [1, 2]}
+    ) as stand_in_server_0:
+        credentials_0 = module_2.BasicAuthCredentials(
+            username="u", password="p", login_url=stand_in_server_0.url + "/login"
+        )
+        web_client_0 = module_2.WebClient(
+            authorization_type=module_2.AuthorizationType.JWT, credentials=credentials_0
+        )
+        assert web_client_0.call("GET", stand_in_server_0.url + "/items").json() == {
+            "items": [1, 2]
+        }
+        assert not web_client_0.session_expired()
+        stand_in_server_0.revoke()
+        assert web_client_0.call("GET", stand_in_server_0.url + "/items").status_code == 401
+        response_0 = web_client_0.call(
+            "GET", stand_in_server_0.url + "/items", skip_authentication=True
+        )
+        assert response_0.headers["WWW-Authenticate"] == "Bearer"
+        assert stand_in_server_0.stats["rejected"] == 2
+        web_client_0.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+"""Pywrapid webclient TLS context tests"""
+
+import http.server
+import json
+import os
+import shutil
+import ssl
+import subprocess  # nosec
+import threading
+from typing import Iterator
+
+import pytest
+
+import pywrapid.webclient.tls as module_0
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+@pytest.fixture(name="certificate")
+def fixture_certificate(tmp_path: object) -> tuple:
+    """Self signed localhost certificate and key files"""
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is not available")
+    cert_file = os.path.join(str(tmp_path), "cert.pem")
+    key_file = os.path.join(str(tmp_path), "key.pem")
+    subprocess.run(  # nosec
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            key_file,
+            "-out",
+            cert_file,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert_file, key_file
+
+
+@pytest.fixture(name="server")
+def fixture_server(certificate: tuple) -> Iterator[str]:
+    """HTTPS server requiring the client certificate"""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """Responds with the client certificate subject and TLS session reuse"""
+
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            subject = dict(pair[0] for pair in self.connection.getpeercert()["subject"])
+            body = json.dumps(
+                {"subject": subject, "reused": self.connection.session_reused}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(*certificate)
+    context.load_verify_locations(certificate[0])
+    context.verify_mode = ssl.CERT_REQUIRED
+    server = http.server.ThreadingHTTPServer(("localhost", 0), Handler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"https://localhost:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_case_0(certificate: tuple) -> None:
+    """Contexts are shared per credential set and reloaded when files change"""
+    ssl_context_cache_0 = module_0.SSLContextCache(check_interval=0)
+    resuming_ssl_context_0 = ssl_context_cache_0.get(certificate, certificate[0])
+    assert ssl_context_cache_0.get(certificate, certificate[0]) is resuming_ssl_context_0
+    assert ssl_context_cache_0.get(certificate, False) is not resuming_ssl_context_0
+    assert ssl_context_cache_0.get(certificate, False).verify_mode == ssl.CERT_NONE
+    stat_0 = os.stat(certificate[1])
+    os.utime(certificate[1], ns=(stat_0.st_atime_ns, stat_0.st_mtime_ns + 10**9))
+    assert ssl_context_cache_0.get(certificate, certificate[0]) is not resuming_ssl_context_0
+    with pytest.raises(OSError):
+        ssl_context_cache_0.get(("missing.pem", "missing.key"))
+
+
+def test_case_1(certificate: tuple, server: str) -> None:
+    """Client certificate connections share one context and resume TLS sessions"""
+    web_client_0 = module_1.WebClient(dict_config={"client_options": {"verify": certificate[0]}})
+    list_0 = [
+        web_client_0.call("GET", server, skip_authentication=True, cert=certificate).json()
+        for _ in range(3)
+    ]
+    assert list_0[0] == {"subject": {"commonName": "localhost"}, "reused": False}
+    assert list_0[2] == {"subject": {"commonName": "localhost"}, "reused": True}
+    adapter_0 = web_client_0._session.get_adapter(server)
+    assert len(adapter_0.tls_contexts._contexts) == 1
+    assert len(adapter_0.poolmanager.pools) == 1
+    web_client_0.close()
+
+
+@pytest.mark.asyncio
+async def test_case_2(certificate: tuple, server: str) -> None:
+    """Async client certificate files changed on disk are reloaded"""
+    pytest.importorskip("httpx")
+    import pywrapid.webclient.async_web as module_2  # pylint: disable=import-outside-toplevel
+
+    dict_0 = {"client_options": {"verify": certificate[0], "cert": certificate}}
+    async with module_2.AsyncWebClient(dict_config=dict_0) as async_web_client_0:
+        async_web_client_0._tls_contexts.check_interval = 0
+        response_0 = await async_web_client_0.call("GET", server, skip_authentication=True)
+        assert response_0.json()["subject"] == {"commonName": "localhost"}
+        await async_web_client_0.call("GET", server, skip_authentication=True)
+        assert not async_web_client_0._replaced_sessions
+
+        stat_0 = os.stat(certificate[1])
+        os.utime(certificate[1], ns=(stat_0.st_atime_ns, stat_0.st_mtime_ns + 10**9))
+        response_1 = await async_web_client_0.call("GET", server, skip_authentication=True)
+        assert response_1.json()["subject"] == {"commonName": "localhost"}
+        assert len(async_web_client_0._replaced_sessions) == 1
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Pywrapid webclient token store tests"""
+
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import responses
+
+import pywrapid.webclient.exceptions as module_2
+import pywrapid.webclient.token_store as module_0
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Keys are hashed and stable"""
+    str_0 = module_0.token_store_key("https://example.com/login", {"password": "secret"})
+    assert str_0 == module_0.token_store_key("https://example.com/login", {"password": "secret"})
+    assert str_0 != module_0.token_store_key("https://example.com/login", {"password": "other"})
+    assert "secret" not in str_0
+    assert len(str_0) == 64
+
+
+def test_case_1() -> None:
+    """Memory token store"""
+    memory_token_store_0 = module_0.MemoryTokenStore()
+    assert memory_token_store_0.get("key") is None
+    memory_token_store_0.set("key", {"access_token": "abc"})
+    with memory_token_store_0.lock("key"):
+        assert memory_token_store_0.get("key") == {"access_token": "abc"}
+
+
+def test_case_2(tmp_path: Path) -> None:
+    """File token store is private to the owner"""
+    file_token_store_0 = module_0.FileTokenStore(str(tmp_path / "tokens"))
+    assert file_token_store_0.get("key") is None
+    with file_token_store_0.lock("key"):
+        file_token_store_0.set("key", {"access_token": "abc"})
+    assert file_token_store_0.get("key") == {"access_token": "abc"}
+    mode_0 = os.stat(tmp_path / "tokens" / "key.json").st_mode
+    assert stat.S_IMODE(mode_0) == 0o600
+    (tmp_path / "tokens" / "broken.json").write_text("{")
+    assert file_token_store_0.get("broken") is None
+
+
+@responses.activate
+def test_case_3(tmp_path: Path) -> None:
+    """Clients sharing a file token store authenticate once"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 3600, "refresh_token": "ref"},
+    )
+    responses.add(responses.GET, "https://example.com/data")
+    dict_0 = {"token_store_path": str(tmp_path)}
+    web_clients_0 = [
+        module_1.WebClient(
+            authorization_type=module_1.AuthorizationType.OAUTH2,
+            credentials=module_1.OAuth2Credentials(
+                login_url="https://example.com/login", auth_data={"user": "u"}
+            ),
+            dict_config=dict_0,
+        )
+        for _ in range(3)
+    ]
+    for web_client_0 in web_clients_0:
+        web_client_0.call("GET", "https://example.com/data")
+        assert web_client_0._access_token == "abc"
+        assert web_client_0._refresh_token == "ref"
+    login_calls_0 = [call for call in responses.calls if call.request.url.endswith("/login")]
+    assert len(login_calls_0) == 1
+    assert web_clients_0[1].refresh_stats == {"refreshes": 0, "coalesced": 1}
+
+
+def test_case_4(tmp_path: Path) -> None:
+    """Waiting for a renewal lock held elsewhere is limited by the timeout"""
+    memory_token_store_0 = module_0.MemoryTokenStore()
+    file_token_store_0 = module_0.FileTokenStore(str(tmp_path / "tokens"))
+    for token_store_0 in (memory_token_store_0, file_token_store_0):
+        lock_0 = token_store_0.lock("key")
+        thread_0 = threading.Thread(target=lock_0.__enter__)
+        thread_0.start()
+        thread_0.join()
+        float_0 = time.monotonic()
+        with pytest.raises(module_2.ClientTimeout):
+            with token_store_0.lock("key", timeout=0.1):
+                pass
+        assert 0.1 <= time.monotonic() - float_0 < 1
+        with token_store_0.lock("other", timeout=0.1):
+            pass
+        lock_0.__exit__(None, None, None)
+        with token_store_0.lock("key", timeout=0.1):
+            pass
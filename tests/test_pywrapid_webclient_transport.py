@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+"""Pywrapid webclient transport tests"""
+
+import http.server
+import threading
+
+import pytest
+
+import pywrapid.webclient.exceptions as module_1
+import pywrapid.webclient.transport as module_0
+import pywrapid.webclient.web as module_2
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def mock_client(handler) -> object:  # type: ignore[no-untyped-def]
+    """httpx client answering requests with a handler"""
+    httpx = pytest.importorskip("httpx")
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_case_0() -> None:
+    """httpx transport returns requests responses and runs response hooks"""
+    httpx = pytest.importorskip("httpx")
+    list_0 = []
+
+    def handler(request):  # type: ignore[no-untyped-def]
+        list_0.append(request)
+        return httpx.Response(
+            200,
+            headers=[("Set-Cookie", "a=1"), ("Set-Cookie", "b=2")],
+            content=b'{"id": 1}\n{"id": 2}\n',
+        )
+
+    web_client_0 = module_2.WebClient(dict_config={"client_options": {"transport": "httpx"}})
+    web_client_0._session._clients[(True, None)] = (True, mock_client(handler))
+    list_1 = []
+    response_0 = web_client_0.call(
+        "POST",
+        "https://example.com/items",
+        params={"q": "x"},
+        data={"name": "value"},
+        hooks={"response": lambda response, **kwargs: list_1.append(response.status_code)},
+        skip_authentication=True,
+    )
+    assert response_0.status_code == 200
+    assert response_0.headers["set-cookie"] == "a=1, b=2"
+    assert b"".join(response_0.iter_content(4)) == b'{"id": 1}\n{"id": 2}\n'
+    assert list_1 == [200]
+    assert str(list_0[0].url) == "https://example.com/items?q=x"
+    assert list_0[0].content == b"name=value"
+    list_2 = web_client_0.stream(
+        "GET", "https://example.com/items", mode="ndjson", skip_authentication=True
+    )
+    assert list(list_2) == [{"id": 1}, {"id": 2}]
+    web_client_0.close()
+    assert web_client_0._session._clients == {}
+
+
+def test_case_1() -> None:
+    """httpx errors are mapped like requests errors"""
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):  # type: ignore[no-untyped-def]
+        if request.url.path == "/slow":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if request.url.path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        if request.url.path == "/unreachable":
+            raise httpx.ConnectTimeout("timed out", request=request)
+        return httpx.Response(404)
+
+    web_client_0 = module_2.WebClient(dict_config={"client_options": {"transport": "httpx"}})
+    web_client_0._session._clients[(True, None)] = (True, mock_client(handler))
+    with pytest.raises(module_1.ClientTimeout):
+        web_client_0.call("GET", "https://example.com/slow", skip_authentication=True)
+    with pytest.raises(module_1.ClientError) as error_0:
+        web_client_0.call("GET", "https://example.com/down", skip_authentication=True)
+    assert isinstance(error_0.value.__cause__, module_0.RequestsConnectionError)
+    with pytest.raises(module_1.ClientTimeout):
+        web_client_0.call("GET", "https://example.com/unreachable", skip_authentication=True)
+    with pytest.raises(module_1.ClientHTTPError):
+        web_client_0.call(
+            "GET", "https://example.com/missing", raise_for_status=True, skip_authentication=True
+        )
+    with pytest.raises(module_1.ClientError):
+        module_2.WebClient(dict_config={"client_options": {"transport": "curl"}})
+
+
+def test_case_2() -> None:
+    """aiohttp transport sends requests on a background event loop"""
+    aiohttp = pytest.importorskip("aiohttp")
+    if hasattr(aiohttp, "ConnectionTimeoutError"):
+        error_0 = module_0.AiohttpTransport.map_error(aiohttp.ConnectionTimeoutError())
+        assert isinstance(error_0, module_0.ConnectTimeout)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """Echo request body length"""
+
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # pylint: disable=invalid-name
+            bytes_0 = self.rfile.read(int(self.headers["Content-Length"]))
+            bytes_1 = str(len(bytes_0)).encode()
+            self.send_response(201)
+            self.send_header("Content-Length", str(len(bytes_1)))
+            self.end_headers()
+            self.wfile.write(bytes_1)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server_0 = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server_0.serve_forever, daemon=True).start()
+    try:
+        with module_2.WebClient(
+            dict_config={"client_options": {"transport": "aiohttp"}}
+        ) as web_client_0:
+            str_0 = f"http://127.0.0.1:{server_0.server_port}/"
+            response_0 = web_client_0.call("POST", str_0, data=b"abc", skip_authentication=True)
+            assert (response_0.status_code, response_0.text) == (201, "3")
+            assert list(response_0.iter_lines()) == [b"3"]
+            with pytest.raises(module_1.ClientError):
+                web_client_0.call("GET", "http://127.0.0.1:1/", skip_authentication=True)
+    finally:
+        server_0.shutdown()
+        server_0.server_close()
+
+
+@pytest.mark.parametrize("transport", ["httpx", "aiohttp"])
+def test_case_3(transport: str) -> None:
+    """Transports keep no cookies set by responses"""
+    pytest.importorskip(transport)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """Set a cookie or echo the Cookie header"""
+
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            bytes_0 = self.headers.get("Cookie", "").encode()
+            self.send_response(200)
+            if self.path == "/login":
+                self.send_header("Set-Cookie", "session=abc; Path=/")
+            self.send_header("Content-Length", str(len(bytes_0)))
+            self.end_headers()
+            self.wfile.write(bytes_0)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server_0 = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server_0.serve_forever, daemon=True).start()
+    try:
+        with module_2.WebClient(
+            dict_config={"client_options": {"transport": transport}}
+        ) as web_client_0:
+            str_0 = f"http://127.0.0.1:{server_0.server_port}"
+            response_0 = web_client_0.call("GET", f"{str_0}/login", skip_authentication=True)
+            assert response_0.cookies["session"] == "abc"
+            response_1 = web_client_0.call("GET", f"{str_0}/data", skip_authentication=True)
+            assert response_1.text == ""
+            response_2 = web_client_0.call(
+                "GET", f"{str_0}/data", cookies={"a": "1"}, skip_authentication=True
+            )
+            assert response_2.text == "a=1"
+    finally:
+        server_0.shutdown()
+        server_0.server_close()
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""Pywrapid webclient streaming upload tests"""
+
+import io
+import mmap
+
+import responses
+
+import pywrapid.webclient.upload as module_0
+import pywrapid.webclient.web as module_1
+
+# flake8: ignore=F841
+# pylint: disable=protected-access
+
+
+def test_case_0() -> None:
+    """Bodies of bytes, mmap and files have a length and rewind"""
+    upload_body_0 = module_0.UploadBody(b"abcdefg", chunk_size=3)
+    assert len(upload_body_0) == 7
+    assert list(upload_body_0) == [b"abc", b"def", b"g"]
+    assert upload_body_0.rewind()
+    with mmap.mmap(-1, 5) as mmap_0:
+        mmap_0.write(b"12345")
+        upload_body_1 = module_0.UploadBody(mmap_0, chunk_size=2)
+        assert len(upload_body_1) == 5
+        assert b"".join(upload_body_1) == b"12345"
+    bytes_io_0 = io.BytesIO(b"xxhello")
+    bytes_io_0.read(2)
+    upload_body_2 = module_0.UploadBody(bytes_io_0, chunk_size=2)
+    assert len(upload_body_2) == 5
+    assert b"".join(upload_body_2) == b"hello"
+    assert upload_body_2.rewind()
+    assert b"".join(upload_body_2) == b"hello"
+
+
+def test_case_1() -> None:
+    """Generator bodies have no length and can only be sent once"""
+    upload_body_0 = module_0.UploadBody(chunk for chunk in (b"a", "b"))
+    assert len(upload_body_0) == 0
+    assert upload_body_0.rewindable
+    assert list(upload_body_0) == [b"a", b"b"]
+    assert not upload_body_0.rewind()
+    assert len(module_0.UploadBody(iter([b"a"]), length=1)) == 1
+
+
+def test_case_2() -> None:
+    """Multipart bodies stream their parts"""
+    multipart_upload_0 = module_0.MultipartUpload(
+        {"name": "value", "file": ("data.json", io.BytesIO(b"{}"))}, boundary="xyz"
+    )
+    bytes_0 = (
+        b'--xyz\r\nContent-Disposition: form-data; name="name"\r\n\r\nvalue\r\n'
+        b'--xyz\r\nContent-Disposition: form-data; name="file"; filename="data.json"\r\n'
+        b"Content-Type: application/json\r\n\r\n{}\r\n--xyz--\r\n"
+    )
+    assert b"".join(multipart_upload_0) == bytes_0
+    assert len(multipart_upload_0) == len(bytes_0)
+    assert multipart_upload_0.content_type == "multipart/form-data; boundary=xyz"
+    multipart_upload_1 = module_0.MultipartUpload([("file", ("a", iter([b"1"]), "text/plain"))])
+    assert len(multipart_upload_1) == 0
+
+
+@responses.activate
+def test_case_3() -> None:
+    """Uploads are sent with Content-Length or chunked and rewound on retries"""
+    list_0 = []
+
+    def callback(request: object) -> tuple:
+        list_0.append((dict(request.headers), b"".join(request.body)))
+        return (503 if len(list_0) == 1 else 200, {}, "")
+
+    responses.add_callback(responses.PUT, "https://example.com/upload", callback=callback)
+    web_client_0 = module_1.WebClient(dict_config={"retry": {"max_attempts": 2, "max_backoff": 0}})
+    multipart_upload_0 = module_0.MultipartUpload({"file": ("a.bin", io.BytesIO(b"abc"))})
+    response_0 = web_client_0.call(
+        "PUT", "https://example.com/upload", data=multipart_upload_0, skip_authentication=True
+    )
+    assert response_0.status_code == 200
+    assert list_0[0][1] == list_0[1][1]
+    assert list_0[1][0]["Content-Type"] == multipart_upload_0.content_type
+    assert list_0[1][0]["Content-Length"] == str(len(multipart_upload_0))
+    list_0.clear()
+    response_1 = web_client_0.call(
+        "PUT",
+        "https://example.com/upload",
+        data=module_0.UploadBody(iter([b"a", b"b"])),
+        skip_authentication=True,
+    )
+    assert response_1.status_code == 503
+    assert len(list_0) == 1
+    assert list_0[0][0]["Transfer-Encoding"] == "chunked"
@@ -1,10 +1,15 @@
 #!/usr/bin/python3
 """Pywrapid webclient tests"""
 
+import json
 import locale as module_3
 import os
+import threading
+import time
 
 import pytest
+import requests as module_4
+import responses
 
 import pywrapid.config.exceptions as module_2
 import pywrapid.webclient.exceptions as module_1
@@ -207,3 +212,331 @@ def test_case_14() -> None:
         module_0.X509Credentials(file, str_0, str_0)
     with pytest.raises(module_1.CredentialError):
         module_0.X509Credentials(str_0, file, str_0)
+
+
+def test_case_15() -> None:
+    """Connection pool sized from client_options"""
+    dict_0 = {"client_options": {"pool_connections": 3, "pool_maxsize": 25, "timeout": 5}}
+    web_client_0 = module_0.WebClient(dict_config=dict_0)
+    adapter_0 = web_client_0._session.get_adapter("https://example.com")
+    assert adapter_0._pool_connections == 3
+    assert adapter_0._pool_maxsize == 25
+    assert web_client_0._session.get_adapter("http://example.com") is adapter_0
+    web_client_0.close()
+
+
+@responses.activate
+def test_case_16() -> None:
+    """Calls reuse the client session and strip pool options"""
+    responses.add(responses.GET, "https://example.com/data", json={"ok": True})
+    dict_0 = {"client_options": {"pool_maxsize": 4, "timeout": 5}}
+    with module_0.WebClient(dict_config=dict_0) as web_client_0:
+        session_0 = web_client_0._session
+        response_0 = web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+        response_1 = web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+        assert response_0.json() == {"ok": True}
+        assert response_1.status_code == 200
+        assert web_client_0._session is session_0
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_case_17() -> None:
+    """Concurrent calls with per call errors"""
+    responses.add(responses.GET, "https://example.com/ok", json={"ok": True})
+    responses.add(responses.POST, "https://example.com/fail", status=500)
+    calls_0 = [{"url": "https://example.com/ok", "params": {"i": i}} for i in range(10)]
+    calls_0.append({"method": "POST", "url": "https://example.com/fail"})
+    web_client_0 = module_0.WebClient()
+    results_0 = list(
+        web_client_0.call_many(
+            calls_0, max_workers=3, raise_for_status=True, skip_authentication=True
+        )
+    )
+    assert len(results_0) == 11
+    errors_0 = [call for call, result in results_0 if isinstance(result, module_1.ClientError)]
+    assert errors_0 == [{"method": "POST", "url": "https://example.com/fail"}]
+    assert all(result.status_code == 200 for call, result in results_0 if call not in errors_0)
+
+
+@responses.activate
+def test_case_18() -> None:
+    """Calls are consumed lazily"""
+    responses.add(responses.GET, "https://example.com/ok")
+    consumed_0 = []
+
+    def calls_0():  # type: ignore[no-untyped-def]
+        for i in range(1000):
+            consumed_0.append(i)
+            yield {"url": "https://example.com/ok"}
+
+    web_client_0 = module_0.WebClient()
+    results_0 = web_client_0.call_many(calls_0(), max_workers=2, skip_authentication=True)
+    next(results_0)
+    results_0.close()
+    assert len(consumed_0) <= 4
+
+
+@responses.activate
+def test_case_19() -> None:
+    """Single-flight token refresh across threads"""
+
+    def login(request):  # type: ignore[no-untyped-def]
+        time.sleep(0.2)
+        return 200, {}, json.dumps({"access_token": "abc", "expires_in": 3600})
+
+    responses.add_callback(responses.POST, "https://example.com/login", callback=login)
+    responses.add(responses.GET, "https://example.com/data")
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    web_client_0 = module_0.WebClient(
+        authorization_type=module_0.AuthorizationType.OAUTH2, credentials=credentials_0
+    )
+    threads_0 = [
+        threading.Thread(target=web_client_0.call, args=("GET", "https://example.com/data"))
+        for _ in range(8)
+    ]
+    for thread_0 in threads_0:
+        thread_0.start()
+    for thread_0 in threads_0:
+        thread_0.join()
+    login_calls_0 = [call for call in responses.calls if call.request.url.endswith("/login")]
+    assert len(login_calls_0) == 1
+    assert web_client_0.refresh_stats["refreshes"] == 1
+    assert web_client_0.refresh_stats["coalesced"] <= 7
+    assert web_client_0._access_token == "abc"
+
+
+@responses.activate
+def test_case_20() -> None:
+    """Background token refresh ahead of expiry"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 4},
+    )
+    responses.add(responses.GET, "https://example.com/data")
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    dict_0 = {
+        "background_token_refresh": True,
+        "token_refresh_ratio": 0.25,
+        "token_expiry_offset": 0,
+    }
+    with module_0.WebClient(
+        authorization_type=module_0.AuthorizationType.OAUTH2,
+        credentials=credentials_0,
+        dict_config=dict_0,
+    ) as web_client_0:
+        time.sleep(0.2)
+        assert web_client_0.refresh_stats["refreshes"] == 1
+        assert 0 < web_client_0._seconds_until_renewal() <= 1
+        web_client_0.call("GET", "https://example.com/data")
+        time.sleep(1.2)
+        assert web_client_0.refresh_stats == {"refreshes": 2, "coalesced": 0}
+    assert web_client_0._refresh_thread is None
+
+
+@responses.activate
+def test_case_21() -> None:
+    """Refresh token grant instead of full login"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 0, "refresh_token": "ref"},
+    )
+    responses.add(
+        responses.POST,
+        "https://example.com/token",
+        json={"access_token": "def", "expires_in": 3600},
+    )
+    responses.add(responses.GET, "https://example.com/data")
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login",
+        token_url="https://example.com/token",
+        auth_data={"client_id": "cid", "username": "u"},
+    )
+    web_client_0 = module_0.WebClient(
+        authorization_type=module_0.AuthorizationType.OAUTH2, credentials=credentials_0
+    )
+    web_client_0.call("GET", "https://example.com/data")
+    web_client_0.call("GET", "https://example.com/data")
+    urls_0 = [call.request.url for call in responses.calls]
+    assert urls_0.count("https://example.com/login") == 1
+    assert urls_0.count("https://example.com/token") == 1
+    assert (
+        responses.calls[2].request.body
+        == "client_id=cid&grant_type=refresh_token&refresh_token=ref"
+    )
+    assert web_client_0._access_token == "def"
+    assert web_client_0._refresh_token == "ref"
+
+
+@responses.activate
+def test_case_22() -> None:
+    """Rejected refresh token falls back to full login"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 0, "refresh_token": "ref"},
+    )
+    responses.add(responses.POST, "https://example.com/token", status=400)
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login",
+        token_url="https://example.com/token",
+        auth_data={"username": "u"},
+    )
+    web_client_0 = module_0.WebClient(
+        authorization_type=module_0.AuthorizationType.OAUTH2, credentials=credentials_0
+    )
+    web_client_0._ensure_session()
+    assert web_client_0.refresh_session() is False
+    assert web_client_0._refresh_token == ""
+    assert web_client_0.refresh_session() is False
+    web_client_0._ensure_session()
+    urls_0 = [call.request.url for call in responses.calls]
+    assert urls_0.count("https://example.com/login") == 2
+    assert urls_0.count("https://example.com/token") == 1
+
+
+@responses.activate
+def test_case_23() -> None:
+    """Streaming chunks, lines and ndjson records"""
+    str_0 = '{"id": 1}\n\n{"id": 2}\n'
+    responses.add(responses.GET, "https://example.com/export", body=str_0)
+    web_client_0 = module_0.WebClient()
+    list_0 = list(
+        web_client_0.stream(
+            "GET", "https://example.com/export", chunk_size=4, skip_authentication=True
+        )
+    )
+    assert b"".join(list_0) == str_0.encode()
+    assert len(list_0) == 6
+    list_1 = web_client_0.stream(
+        "GET", "https://example.com/export", mode="lines", skip_authentication=True
+    )
+    assert list(list_1) == ['{"id": 1}', "", '{"id": 2}']
+    list_2 = web_client_0.stream(
+        "GET", "https://example.com/export", mode="ndjson", skip_authentication=True
+    )
+    assert list(list_2) == [{"id": 1}, {"id": 2}]
+    with pytest.raises(module_1.ClientError):
+        next(web_client_0.stream("GET", "https://example.com/export", mode="xml"))
+
+
+@responses.activate
+def test_case_24() -> None:
+    """Streaming errors are mapped and connections released"""
+    responses.add(responses.GET, "https://example.com/missing", status=404)
+    responses.add(responses.GET, "https://example.com/broken", body="not json\n")
+    web_client_0 = module_0.WebClient()
+    with pytest.raises(module_1.ClientHTTPError):
+        next(web_client_0.stream("GET", "https://example.com/missing", skip_authentication=True))
+    with pytest.raises(module_1.ClientError):
+        list(
+            web_client_0.stream(
+                "GET", "https://example.com/broken", mode="ndjson", skip_authentication=True
+            )
+        )
+    assert module_0.client_error(module_0.Timeout()).__class__ is module_1.ClientTimeout
+
+
+@responses.activate
+def test_case_25() -> None:
+    """Cookies set by responses are not sent with later calls"""
+    responses.add(
+        responses.GET, "https://example.com/login", headers={"Set-Cookie": "session=abc; Path=/"}
+    )
+    responses.add(responses.GET, "https://example.com/data")
+    web_client_0 = module_0.WebClient()
+    response_0 = web_client_0.call("GET", "https://example.com/login", skip_authentication=True)
+    assert response_0.cookies["session"] == "abc"
+    web_client_0.call("GET", "https://example.com/data", skip_authentication=True)
+    assert "Cookie" not in responses.calls[1].request.headers
+    web_client_0.call(
+        "GET", "https://example.com/data", skip_authentication=True, cookies={"a": "1"}
+    )
+    assert responses.calls[2].request.headers["Cookie"] == "a=1"
+
+
+@responses.activate
+def test_case_26() -> None:
+    """Refresh token is kept when the token endpoint can not be reached"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 0, "refresh_token": "ref"},
+    )
+    responses.add(
+        responses.POST,
+        "https://example.com/token",
+        body=module_4.ConnectionError("unreachable"),
+    )
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login",
+        token_url="https://example.com/token",
+        auth_data={"username": "u"},
+    )
+    web_client_0 = module_0.WebClient(
+        authorization_type=module_0.AuthorizationType.OAUTH2, credentials=credentials_0
+    )
+    web_client_0._ensure_session()
+    with pytest.raises(module_1.ClientError) as error_0:
+        web_client_0.refresh_session()
+    assert not isinstance(error_0.value, module_1.ClientAuthenticationError)
+    assert web_client_0._refresh_token == "ref"
+    urls_0 = [call.request.url for call in responses.calls]
+    assert urls_0.count("https://example.com/login") == 1
+
+
+@responses.activate
+def test_case_27() -> None:
+    """Calls failing with other exceptions do not end the batch"""
+    responses.add(responses.GET, "https://example.com/ok")
+    calls_0 = [{"url": "https://example.com/ok"} for _ in range(5)]
+    calls_0.insert(1, {"url": "https://example.com/ok", "bogus": 1})
+    web_client_0 = module_0.WebClient()
+    results_0 = list(web_client_0.call_many(calls_0, max_workers=2, skip_authentication=True))
+    assert len(results_0) == 6
+    errors_0 = [result for call, result in results_0 if "bogus" in call]
+    assert len(errors_0) == 1
+    assert isinstance(errors_0[0], TypeError)
+    assert len(responses.calls) == 5
+
+
+@responses.activate
+def test_case_28() -> None:
+    """Background token refresh starts with the client block and survives errors"""
+    responses.add(
+        responses.POST,
+        "https://example.com/login",
+        json={"access_token": "abc", "expires_in": 3600},
+    )
+
+    class WebClient0(module_0.WebClient):
+        """Client failing its first login unexpectedly"""
+
+        logins = 0
+
+        def generate_session(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+            self.logins += 1
+            if self.logins == 1:
+                raise ValueError("half built")
+            super().generate_session(*args, **kwargs)
+
+    credentials_0 = module_0.OAuth2Credentials(
+        login_url="https://example.com/login", auth_data={"user": "u"}
+    )
+    web_client_0 = WebClient0(
+        authorization_type=module_0.AuthorizationType.OAUTH2,
+        credentials=credentials_0,
+        dict_config={"background_token_refresh": True, "token_refresh_retry": 0.1},
+    )
+    assert web_client_0._refresh_thread is None
+    with web_client_0:
+        time.sleep(0.5)
+        assert web_client_0._refresh_thread.is_alive()
+        assert web_client_0.logins == 2
+        assert web_client_0.refresh_stats["refreshes"] == 1